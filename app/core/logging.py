@@ -1,13 +1,74 @@
 # app/core/logging.py
+"""Logs estruturados em JSON.
+
+Com LOG_ASYNC, o logger raiz só enfileira os registros (QueueHandler) e uma
+thread (QueueListener) formata e escreve no stdout: a thread que loga paga
+apenas a montagem da mensagem. A serialização usa orjson quando instalado.
+
+`execution_id`/`task_id` (e o trace corrente) são anexados automaticamente a
+partir de contextvars (`bind_log_context`) na thread que loga. Logs por item
+do loop de extração passam por `log_limited` (no máximo
+LOG_ITEM_RATE_PER_SECOND por tipo de mensagem; os suprimidos são contados).
+"""
+import atexit
 import logging
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 from pythonjsonlogger import jsonlogger
 
+from app.core.config import settings
+from app.core.tracing import tracer
+
+try:
+    from pythonjsonlogger.orjson import OrjsonFormatter as _JsonFormatterBase
+    _FORMATTER_OPTIONS: dict[str, Any] = {}
+except ImportError:  # orjson (ou python-json-logger 3+) ausente: encoder json padrão
+    _JsonFormatterBase = jsonlogger.JsonFormatter
+    _FORMATTER_OPTIONS = {"json_ensure_ascii": False}
+
+# Campos vinculados ao contexto (task/execução) anexados a todos os registros
+_log_context: ContextVar[dict[str, Any]] = ContextVar("log_context", default={})
+
+_listener: QueueListener | None = None
+
+
+@contextmanager
+def bind_log_context(**fields):
+    """Anexa os campos (ex.: execution_id, task_id) aos logs emitidos no bloco,
+    inclusive em threads que copiam o contexto.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copia o contexto da thread que loga para o registro (antes de ir para a fila)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
 
-class CustomJsonFormatter(jsonlogger.JsonFormatter):
+        # Correlaciona o log com o span corrente (TRACING_ENABLED)
+        span = tracer.current_span()
+        if span.trace_id:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class CustomJsonFormatter(_JsonFormatterBase):
     """Formatter customizado para logs estruturados em JSON.
     Adiciona campos padrão (timestamp, module) e trata exceções corretamente.
     """
@@ -19,7 +80,7 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         message_dict: dict[str, Any],
     ) -> None:
         """Adiciona campos customizados ao record de log.
-        
+
         Args:
             log_record: Dicionário que será serializado para JSON
             record: LogRecord original do Python
@@ -28,8 +89,8 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         """
         super().add_fields(log_record, record, message_dict)
 
-        # Adiciona timestamp ISO 8601 com timezone
-        log_record["timestamp"] = datetime.now(timezone.utc).isoformat()
+        # Timestamp ISO 8601 do momento do log (não da escrita, que pode ser posterior)
+        log_record["timestamp"] = datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat()
 
         # Adiciona o módulo/logger name
         log_record["module"] = record.name
@@ -49,33 +110,78 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         log_record.pop("asctime", None)
 
 
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enfileira o registro sem formatá-lo; com a fila cheia, descarta e conta."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # O listener roda no mesmo processo: basta fixar a mensagem (args podem mudar
+        # depois); exceção e campos extras seguem para o formatter JSON na outra thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def shutdown_logging() -> None:
+    """Escreve os registros pendentes e encerra a thread de escrita.
+    Roda no atexit; processos multiprocessing precisam chamá-la ao terminar.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # Escreve os registros pendentes
+        _listener = None
+
+
 def configure_logging(level: str = "INFO") -> None:
     """Configura o logger raiz com formato JSON estruturado.
-    
+
     Args:
         level: Nível de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    
+
     Example:
         >>> from app.core.logging import configure_logging
         >>> configure_logging("INFO")
 
     """
-    # Remove handlers existentes
+    global _listener
+
+    # Remove handlers existentes (e encerra o listener de uma configuração anterior)
     root_logger = logging.getLogger()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    shutdown_logging()
 
     # Cria handler para stdout com formato JSON
     stream_handler = logging.StreamHandler(sys.stdout)
     formatter = CustomJsonFormatter(
         fmt="%(timestamp)s %(level)s %(name)s %(message)s",
-        json_ensure_ascii=False,
+        **_FORMATTER_OPTIONS,
     )
     stream_handler.setFormatter(formatter)
 
+    if settings.LOG_ASYNC:
+        # Formatação e escrita na thread do listener
+        queue_handler = _NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        queue_handler.addFilter(ContextFilter())
+        _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        root_handler = queue_handler
+    else:
+        stream_handler.addFilter(ContextFilter())
+        root_handler = stream_handler
+
     # Configura logger raiz
     root_logger.setLevel(getattr(logging, level.upper()))
-    root_logger.addHandler(stream_handler)
+    root_logger.addHandler(root_handler)
 
     # Reduz verbosidade de bibliotecas externas
     logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -83,15 +189,64 @@ def configure_logging(level: str = "INFO") -> None:
     logging.getLogger("google.cloud").setLevel(logging.WARNING)
 
 
+atexit.register(shutdown_logging)
+
+
+class _RateLimiter:
+    """Token bucket por chave; conta os registros suprimidos desde o último emitido."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # chave -> [tokens, último instante, suprimidos]
+        self._buckets: dict[str, list] = {}
+
+    def acquire(self, key: str, rate: float) -> int | None:
+        """Quantidade de suprimidos desde o último registro, ou None se o registro deve ser suprimido."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [rate, now, 0]
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return None
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+            return suppressed
+
+
+_rate_limiter = _RateLimiter()
+
+
+def log_limited(logger: logging.Logger, level: int, key: str, message: str, *args) -> None:
+    """Log de alto volume (por item) limitado a LOG_ITEM_RATE_PER_SECOND por `key`.
+
+    A mensagem só é formatada se o nível estiver habilitado e o registro passar
+    no limite; o registro emitido informa em `suppressed` quantos foram omitidos.
+
+    Example:
+        >>> log_limited(logger, logging.DEBUG, "item_sem_id", "Item sem ID válido: %s", title)
+
+    """
+    if not logger.isEnabledFor(level):
+        return
+    suppressed = _rate_limiter.acquire(key, settings.LOG_ITEM_RATE_PER_SECOND)
+    if suppressed is None:
+        return
+    logger.log(level, message, *args, extra={"suppressed": suppressed} if suppressed else None)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Retorna um logger customizado para um módulo específico.
-    
+
     Args:
         name: Nome do módulo (__name__)
-    
+
     Returns:
         Logger configurado para uso estruturado
-    
+
     Example:
         >>> from app.core.logging import get_logger
         >>> logger = get_logger(__name__)
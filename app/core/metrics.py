@@ -0,0 +1,248 @@
+# app/core/metrics.py
+"""Métricas de execução no formato de texto do Prometheus (GET /metrics).
+
+Implementação enxuta, sem dependências: contadores, gauges e histogramas com
+labels, thread-safe (um lock por métrica). `observe`/`inc` custam um bisect e
+alguns incrementos, o suficiente para ficarem ligados no loop de extração e
+em cada chunk do BigQuery.
+
+A cardinalidade é limitada: cada métrica aceita até `max_series` combinações
+de labels (METRICS_MAX_SERIES) e as combinações novas além do limite são
+somadas na série `other`. O estado é por processo; workers distribuídos em
+outros processos não aparecem no /metrics da API.
+"""
+import bisect
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OVERFLOW_LABEL = "other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expostas em /metrics."""
+
+    def __init__(self):
+        self._metrics: list["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Exposição de texto (formato 0.0.4) de todas as métricas."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        max_series: int | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.max_series = max_series or settings.METRICS_MAX_SERIES
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, ...], object] = {}
+        if not labelnames and self.kind in ("counter", "gauge"):
+            self._series[()] = 0.0  # Série única exposta desde o início
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        """Valores dos labels (chamar com o lock); além do limite, agrega em `other`."""
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        if key not in self._series and len(self._series) >= self.max_series:
+            key = (OVERFLOW_LABEL,) * len(self.labelnames)
+        return key
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if not settings.METRICS_ENABLED or amount <= 0:
+            return
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = list(self._series.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in series]
+
+
+class Gauge(_Metric):
+    """Valor instantâneo; com `callback`, lido no momento da coleta.
+
+    O callback retorna um número (métrica sem labels) ou um dict
+    {tupla de valores dos labels: número}.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, callback: Callable[[], float | dict] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        """Valor atual da série (gauges sem callback)."""
+        with self._lock:
+            return self._series.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        if self.callback is not None:
+            values = self.callback()
+            series = values.items() if isinstance(values, dict) else [((), values)]
+            series = list(series)[:self.max_series]
+        else:
+            with self._lock:
+                series = list(self._series.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in series]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Histograma de durações (segundos) com buckets cumulativos."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = [(k, list(s.counts), s.sum, s.count) for k, s in self._series.items()]
+        lines = []
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# Métricas da aplicação (nomes e labels centralizados aqui)
+FETCH_SECONDS = Histogram(
+    "crawler_fetch_seconds", "Duração das requisições HTTP de páginas", ("marketplace", "status"),
+)
+PARSE_SECONDS = Histogram(
+    "crawler_parse_seconds", "Duração do parse do HTML (árvore + seletores) por página", ("marketplace",),
+)
+VALIDATION_SECONDS = Histogram(
+    "crawler_validation_seconds", "Duração da validação dos produtos (ProductSchema) por página", ("marketplace",),
+)
+DEDUPE_QUERY_SECONDS = Histogram(
+    "bigquery_dedupe_query_seconds", "Duração da consulta de dedupe_keys existentes no BigQuery",
+)
+LOAD_JOB_SECONDS = Histogram(
+    "bigquery_load_job_seconds", "Duração dos LOAD JOBs no BigQuery", ("status",),
+)
+PAGES_TOTAL = Counter(
+    "crawler_pages_total", "Páginas buscadas por classificação", ("marketplace", "status"),
+)
+ITEMS_TOTAL = Counter(
+    "crawler_items_total", "Produtos extraídos", ("marketplace", "source"),
+    max_series=settings.METRICS_MAX_SOURCES,
+)
+RETRIES_TOTAL = Counter(
+    "crawler_retries_total", "Novas tentativas de requisição de página", ("marketplace",),
+)
+BLOCKS_TOTAL = Counter(
+    "crawler_blocks_total", "Páginas de bloqueio e requisições barradas pelo circuito", ("marketplace", "reason"),
+)
+DUPLICATES_TOTAL = Counter(
+    "collect_duplicates_total", "Produtos duplicados descartados", ("stage",),
+)
+TASKS_RUNNING = Gauge("collect_tasks_running", "Tasks de coleta em execução")
+TASKS_QUEUED = Gauge("collect_tasks_queued", "Tasks de coleta agendadas aguardando execução")
@@ -0,0 +1,326 @@
+# app/core/tracing.py
+"""Tracing das etapas da coleta: spans de task, fonte, página, retry, parse e BigQuery.
+
+Implementação enxuta, sem o SDK do OpenTelemetry, mas com o mesmo modelo
+(trace_id/span_id W3C, atributos, eventos, status) e exportação no formato
+OTLP/JSON:
+- file: uma linha `{"resourceSpans": [...]}` por lote em TRACING_PATH, lida
+  pelo receiver `otlpjsonfile` do OpenTelemetry Collector ou por
+  `python -m app.trace_report` (árvore e caminho crítico de um trace)
+- console: as mesmas linhas no stderr
+- otlp: POST em TRACING_OTLP_ENDPOINT (OTLP/HTTP JSON, ex.: Collector, Jaeger, Tempo)
+
+O span corrente vive num ContextVar: threads criadas com
+`contextvars.copy_context()` herdam o trace, e processos (re-extração, workers
+distribuídos) recebem o `traceparent` do span pai. Os spans terminados vão
+para uma fila limitada consumida por uma thread de exportação (spans
+excedentes são descartados); processos worker chamam `tracer.flush()` antes
+de encerrar. Com TRACING_ENABLED desligado, `tracer.span` devolve um span
+vazio sem custo de exportação.
+"""
+import atexit
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import requests
+
+from app.core.config import settings
+
+TRACING_EXPORTERS = ("file", "console", "otlp")
+
+# Códigos de status do OTLP
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL_SECONDS = 1.0
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def parse_traceparent(traceparent: str | None) -> tuple[str, str] | None:
+    """(trace_id, span_id) de um header W3C `traceparent` (None se inválido)."""
+    parts = (traceparent or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    """Operação com início, fim, atributos e eventos (modelo do OpenTelemetry)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "kind", "start_ns", "end_ns",
+                 "attributes", "events", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, kind: int, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.events: list[tuple[str, int, dict]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append((name, time.time_ns(), attributes))
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event("exception", **{"exception.type": type(exc).__name__, "exception.message": str(exc)})
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message} if self.status else {},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = [
+                {"name": name, "timeUnixNano": str(ts), "attributes": _otlp_attributes(attrs)}
+                for name, ts, attrs in self.events
+            ]
+        return span
+
+
+class _NoopSpan:
+    """Span de quando o tracing está desligado (ou fora de qualquer span)."""
+
+    trace_id = None
+    span_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def set_attributes(self, **attributes) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """Linhas OTLP/JSON acrescentadas a um arquivo (uma por lote)."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.TRACING_PATH or os.path.join(settings.DATA_DIR, "traces.jsonl")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+    def export(self, payload: dict) -> None:
+        # Uma escrita por lote em modo append: processos diferentes não intercalam linhas
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+
+class ConsoleSpanExporter:
+    """Linhas OTLP/JSON no stderr (uso local)."""
+
+    def export(self, payload: dict) -> None:
+        sys.stderr.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        sys.stderr.flush()
+
+
+class OtlpHttpSpanExporter:
+    """POST OTLP/HTTP com corpo JSON (ex.: http://collector:4318/v1/traces)."""
+
+    def __init__(self, endpoint: str | None = None):
+        self.endpoint = endpoint or settings.TRACING_OTLP_ENDPOINT
+
+    def export(self, payload: dict) -> None:
+        response = requests.post(self.endpoint, json=payload, timeout=10)
+        response.raise_for_status()
+
+
+def _build_exporter():
+    if settings.TRACING_EXPORTER not in TRACING_EXPORTERS:
+        raise ValueError(
+            f"Exporter de tracing inválido: '{settings.TRACING_EXPORTER}' (use {', '.join(TRACING_EXPORTERS)})"
+        )
+    if settings.TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    if settings.TRACING_EXPORTER == "otlp":
+        return OtlpHttpSpanExporter()
+    return FileSpanExporter()
+
+
+class Tracer:
+    """Cria spans aninhados pelo contexto e exporta os terminados em lotes."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.TRACING_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._exporter = None
+        self.dropped = 0
+
+    @contextmanager
+    def span(self, name: str, parent: str | None = None, kind: int = SPAN_KIND_INTERNAL, **attributes):
+        """Span filho do span corrente (ou do `traceparent` informado, vindo de outro processo)."""
+        if not settings.TRACING_ENABLED:
+            yield NOOP_SPAN
+            return
+
+        remote = parse_traceparent(parent)
+        current = _current_span.get()
+        if remote:
+            trace_id, parent_span_id = remote
+        elif current is not None:
+            trace_id, parent_span_id = current.trace_id, current.span_id
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+
+        span = Span(name, trace_id, parent_span_id, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._enqueue(span)
+
+    def current_span(self) -> "Span | _NoopSpan":
+        return _current_span.get() or NOOP_SPAN
+
+    def traceparent(self) -> str | None:
+        """`traceparent` do span corrente, para continuar o trace em outro processo."""
+        return self.current_span().traceparent
+
+    def _enqueue(self, span: Span) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._exporter = self._exporter or _build_exporter()
+                self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._export(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _export(self, batch: list[Span]) -> None:
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({
+                "service.name": settings.TRACING_SERVICE_NAME,
+                "process.pid": os.getpid(),
+            })},
+            "scopeSpans": [{"scope": {"name": "app"}, "spans": [span.to_otlp() for span in batch]}],
+        }]}
+        # Falha na exportação não pode afetar a coleta
+        try:
+            self._exporter.export(payload)
+        except Exception as e:
+            sys.stderr.write(f"[TRACING] Falha ao exportar {len(batch)} spans: {e}\n")
+
+    def flush(self) -> None:
+        """Aguarda a exportação dos spans já terminados."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+
+tracer = Tracer()
+atexit.register(tracer.flush)
+
+
+def load_spans(path: str, trace_id: str) -> list[dict]:
+    """Spans de um trace num arquivo OTLP/JSON (exporter `file`)."""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    spans.extend(s for s in scope.get("spans", []) if s["traceId"] == trace_id)
+    return spans
+
+
+def critical_path(spans: list[dict]) -> list[dict]:
+    """Cadeia de spans que determina a duração do trace.
+
+    A partir da raiz, desce sempre para o filho que terminou por último: é o
+    trecho que precisaria ficar mais rápido para a task terminar antes.
+    """
+    children: dict[str | None, list[dict]] = {}
+    ids = {s["spanId"] for s in spans}
+    for s in spans:
+        parent = s.get("parentSpanId")
+        children.setdefault(parent if parent in ids else None, []).append(s)
+
+    path = []
+    level = children.get(None, [])
+    while level:
+        last = max(level, key=lambda s: int(s["endTimeUnixNano"]))
+        path.append(last)
+        level = children.get(last["spanId"], [])
+    return path
@@ -1,4 +1,6 @@
 # app/main.py
+import asyncio
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
@@ -6,23 +8,51 @@ from fastapi import FastAPI, HTTPException, status
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
-from app.core.logging import configure_logging, get_logger
+from app.core.logging import configure_logging, get_logger, shutdown_logging
 from app.routes import register_routers
 from app.schemas.api import ErrorResponse
+from app.services.bigquery import get_client
+from app.services.health import health_monitor
 
-# Configura logging estruturado em JSON
-configure_logging(level="INFO")
 logger = get_logger(__name__)
 
 
+def _warm_up() -> None:
+    """Importa as dependências pesadas (adiadas no import da API) e cria o cliente BigQuery."""
+    started = time.perf_counter()
+    try:
+        import bs4  # noqa: F401  (parser dos adaptadores)
+
+        get_client()
+    except Exception as e:
+        logger.warning(f"[WARMUP] Falha no warm-up: {e}")
+        return
+    logger.info(f"[WARMUP] Dependências e clientes prontos em {time.perf_counter() - started:.2f}s")
+
+
+async def _warm_up_in_background() -> None:
+    # Em uma thread: o servidor começa a aceitar conexões sem esperar o warm-up
+    await asyncio.to_thread(_warm_up)
+    # Checks de prontidão em background (probes leem o resultado em cache)
+    health_monitor.start()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
+    # Configura logging estruturado em JSON (no startup, não no import do módulo)
+    configure_logging(level="INFO")
     logger.info("🚀 Iniciando API Coletor de Promoções")
     logger.info(f"📋 Projeto: {settings.PROJECT_NAME}")
     logger.info(f"🗄️  BigQuery: {settings.GCP_PROJECT_ID}.{settings.GCP_DATASET_ID}")
+    if settings.STARTUP_WARMUP:
+        app.state.warm_up = asyncio.create_task(_warm_up_in_background())
+    else:
+        health_monitor.start()
     yield
+    health_monitor.stop()
     logger.info("🛑 Encerrando API Coletor de Promoções")
+    shutdown_logging()
 
 
 # Inicializa FastAPI
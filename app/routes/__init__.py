@@ -4,9 +4,15 @@ Centraliza o registro de todos os routers.
 """
 from fastapi import FastAPI
 
+from .clusters import router as clusters_router
 from .collect import router as collect_router
+from .deals import router as deals_router
+from .events import router as events_router
 from .health import router as health_router
+from .metrics import router as metrics_router
+from .products import router as products_router
 from .root import router as root_router
+from .throttle import router as throttle_router
 
 
 def register_routers(app: FastAPI):
@@ -14,3 +20,9 @@ def register_routers(app: FastAPI):
     app.include_router(root_router, tags=["Root"])
     app.include_router(health_router, tags=["Health Check"])
     app.include_router(collect_router, tags=["Collect"])
+    app.include_router(events_router, tags=["Events"])
+    app.include_router(clusters_router, tags=["Clusters"])
+    app.include_router(deals_router, tags=["Deals"])
+    app.include_router(products_router, tags=["Products"])
+    app.include_router(throttle_router, tags=["Throttle"])
+    app.include_router(metrics_router, tags=["Metrics"])
@@ -0,0 +1,49 @@
+# app/routes/clusters.py
+"""Endpoints de clusters de produtos (anúncios quase duplicados).
+"""
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.core.logging import get_logger
+from app.schemas.api import ClusterCheapestResponse, ClusterOffer
+from app.services.matching import ProductMatcher
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/clusters/{cluster_id}/cheapest",
+    response_model=ClusterCheapestResponse,
+    summary="Oferta Mais Barata do Cluster",
+    description="Retorna a oferta mais barata entre os anúncios do mesmo produto",
+    responses={
+        200: {"description": "Cluster encontrado"},
+        404: {"description": "Cluster não encontrado"},
+    },
+)
+def get_cluster_cheapest(cluster_id: str):
+    """Consulta a oferta mais barata de um cluster de produto.
+    
+    O `product_cluster_id` é atribuído a cada produto durante a coleta e agrupa
+    anúncios de vendedores diferentes com títulos/imagens quase iguais.
+    """
+    offers = ProductMatcher().get_cluster(cluster_id)
+    if not offers:
+        logger.warning("Product cluster not found",
+                      extra={"cluster_id": cluster_id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Cluster {cluster_id} não encontrado.",
+        )
+
+    cheapest = offers[0]
+    return ClusterCheapestResponse(
+        cluster_id=cluster_id,
+        offers_count=len(offers),
+        cheapest=ClusterOffer(
+            **{**cheapest, "updated_at": datetime.fromtimestamp(cheapest["updated_at"], tz=timezone.utc)},
+        ),
+    )
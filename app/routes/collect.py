@@ -2,14 +2,47 @@
 """Endpoints de coleta de produtos.
 """
 import uuid
+from contextlib import nullcontext
 from datetime import datetime, timezone
+from typing import Literal
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import ValidationError
 
-from app.core.logging import get_logger
-from app.schemas.api import CollectRequest, CollectResponse, CollectResult
+from app.core.config import settings
+from app.core.logging import bind_log_context, get_logger
+from app.core.metrics import DUPLICATES_TOTAL, TASKS_QUEUED, TASKS_RUNNING
+from app.core.tracing import tracer
+from app.schemas.api import (
+    BatchCollectRequest,
+    BatchStatusResponse,
+    CollectRequest,
+    CollectResponse,
+    CollectResult,
+    ProfileResponse,
+    ReextractRequest,
+    SourceResult,
+)
 from app.services.bigquery import BigQueryService
+from app.services.checkpoint import CheckpointStore
 from app.services.crawler import CrawlerService
+from app.services.deals_index import deals_index
+from app.services.dedupe import BatchDeduplicator
+from app.services.distributed import DistributedCollector
+from app.services.html_archive import HtmlArchive
+from app.services.known_items import KnownItemsIndex
+from app.services.matching import ProductMatcher
+from app.services.price_history import PriceHistoryService
+from app.services.profiling import (
+    PROFILE_ARTIFACTS,
+    ProfileStore,
+    TaskProfiler,
+    should_profile,
+)
+from app.services.spool import ProductSpool
+from app.services.task_export import TaskExportStore
+from app.services.work_queue import get_work_queue, tenant_budget
 
 logger = get_logger(__name__)
 
@@ -18,16 +51,33 @@ router = APIRouter()
 # Cache em memória para resultados de tarefas (em produção, usar Redis ou similar)
 task_results: dict[str, CollectResult] = {}
 
+# Tasks agendadas ou em execução nesta réplica (uma execução por task_id)
+active_tasks: set[str] = set()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
 
 def run_collection_task(
     task_id: str,
     execution_id: str,
     request: CollectRequest,
+    reextract_from: str | None = None,
 ):
     """Executa a tarefa de coleta em background.
     Armazena o resultado no cache task_results.
+    Com checkpoints habilitados, páginas já coletadas neste execution_id são
+    reaproveitadas e, se a coleta já terminou, só a persistência é refeita.
+    Com reextract_from, os produtos vêm do HTML arquivado daquela execução
+    (extrator atual, sem novas requisições).
     """
     started_at = datetime.now(timezone.utc)
+    checkpoint = CheckpointStore() if settings.CHECKPOINT_ENABLED else None
+    known_items = KnownItemsIndex() if request.incremental else None
+    collector = None
 
     try:
         logger.info("Starting collection task",
@@ -39,77 +89,209 @@ def run_collection_task(
                        "max_pages_per_source": request.max_pages_per_source,
                    })
 
-        # 1. Instancia o crawler
-        crawler = CrawlerService()
-        # Sobrescreve execution_id para manter consistência
-        crawler.execution_id = execution_id
+        # 1-2. Coleta produtos (em um processo ou distribuída entre workers).
+        # As fontes são consumidas uma a uma: produtos únicos vão para o spool e
+        # a memória retida pela task fica limitada ao orçamento configurado.
+        record = checkpoint.get_task(task_id) if checkpoint else None
+        if reextract_from:
+            source_results = HtmlArchive().reextract(
+                reextract_from,
+                execution_id=execution_id,
+                sources=request.sources,
+                workers=request.workers,
+            )
+        elif record and record["crawl_completed"]:
+            logger.info("Crawl already checkpointed, retrying persistence only",
+                       extra={"task_id": task_id, "execution_id": execution_id})
+            source_results = checkpoint.iter_results(execution_id, request.sources, request.limit_per_source)
+        elif request.distributed:
+            collector = DistributedCollector()
+            source_results = collector.iter_sources(
+                execution_id=execution_id,
+                sources=request.sources,
+                limit_per_source=request.limit_per_source,
+                max_pages_per_source=request.max_pages_per_source,
+                delay_between_requests=request.delay_between_requests,
+                workers=request.workers,
+                incremental=request.incremental,
+                unchanged_stop_ratio=request.incremental_stop_ratio,
+                tenant=request.tenant,
+                priority=request.priority,
+                job_id=task_id,  # Permite retomar o job e acompanhar o lote pela fila
+            )
+        else:
+            crawler = collector = CrawlerService()
+            # Sobrescreve execution_id para manter consistência
+            crawler.execution_id = execution_id
 
-        # 2. Coleta produtos
-        results = crawler.fetch_from_sources(
-            sources=request.sources,
-            limit_per_source=request.limit_per_source,
-            max_pages_per_source=request.max_pages_per_source,
-            delay_between_requests=request.delay_between_requests,
+            source_results = crawler.iter_sources(
+                sources=request.sources,
+                limit_per_source=request.limit_per_source,
+                max_pages_per_source=request.max_pages_per_source,
+                delay_between_requests=request.delay_between_requests,
+                checkpoint=checkpoint,
+                known_items=known_items,
+                unchanged_stop_ratio=request.incremental_stop_ratio,
+            )
+
+        # 3. Agrega todos os produtos, removendo duplicados entre fontes/páginas
+        deduplicator = BatchDeduplicator(policy=request.source_policy or settings.DEDUPE_SOURCE_POLICY)
+        spool = ProductSpool(
+            memory_budget_bytes=request.memory_budget_mb * 1024 * 1024 if request.memory_budget_mb else None,
         )
+        total_collected = 0
+        sources_processed = 0
+        per_source: list[SourceResult] = []
+        products_inserted = None
+        products_duplicated = None
+        price_events = 0
+        chunks_total = 0
+        chunks_failed = 0
 
-        # 3. Agrega todos os produtos
-        all_products = []
-        for products in results.values():
-            all_products.extend(products)
+        # Fontes interrompidas (bloqueio, circuito aberto): do coletor ou, ao
+        # reaproveitar a coleta, do checkpoint
+        if collector is not None:
+            failed_sources = collector.failed_sources
+        else:
+            failed_sources = record["failed_sources"] if record else {}
 
-        logger.info("Products collected",
-                   extra={
-                       "task_id": task_id,
-                       "execution_id": execution_id,
-                       "total_products": len(all_products),
-                       "sources_count": len(results),
-                   })
+        with spool:
+            for source, products in source_results:
+                sources_processed += 1
+                total_collected += len(products)
+                failed = source in failed_sources
+                per_source.append(SourceResult(
+                    source=source,
+                    status="failed" if failed else "completed",
+                    products_collected=len(products),
+                    error_message=failed_sources[source] if failed else None,
+                ))
+                for product in deduplicator.unique(products):
+                    spool.append(product)
 
-        # 4. Persiste no BigQuery se solicitado
-        products_inserted = None
-        products_duplicated = None
+            if checkpoint:
+                checkpoint.mark_crawl_completed(task_id, failed_sources=failed_sources)
+            DUPLICATES_TOTAL.inc(deduplicator.duplicates, stage="batch")
+
+            logger.info("Products collected",
+                       extra={
+                           "task_id": task_id,
+                           "execution_id": execution_id,
+                           "total_products": total_collected,
+                           "duplicates_in_batch": deduplicator.duplicates,
+                           "sources_count": sources_processed,
+                           "spilled_to_disk": spool.spilled,
+                       })
+
+            # 4. Processa e persiste em chunks de PERSIST_CHUNK_SIZE
+            matcher = ProductMatcher() if settings.MATCHING_ENABLED else None
+            bq = BigQueryService() if request.persist_to_bigquery and spool.count else None
+            price_history = PriceHistoryService()
+            if bq:
+                products_inserted = 0
+                products_duplicated = 0
+
+            # Produtos da task ficam disponíveis em GET /collect/{task_id}/export
+            export_writer = TaskExportStore().open_writer(task_id) if settings.TASK_EXPORT_ENABLED else None
+
+            with export_writer or nullcontext():
+                for chunk in spool.iter_chunks():
+                    chunks_total += 1
+                    with tracer.span("persist.chunk", products=len(chunk)):
+                        deduplicator.apply_sources(chunk)
+
+                        # Agrupa anúncios quase duplicados do mesmo produto (product_cluster_id)
+                        if matcher:
+                            matcher.assign_clusters(chunk)
+
+                        if export_writer:
+                            export_writer.write(chunk)
 
-        if request.persist_to_bigquery and all_products:
-            try:
-                bq = BigQueryService()
-                insert_result = bq.insert_products(all_products)
-                products_inserted = insert_result["inserted"]
-                products_duplicated = insert_result["duplicates"]
-                logger.info("BigQuery insertion completed",
-                           extra={
-                               "task_id": task_id,
-                               "execution_id": execution_id,
-                               "inserted": products_inserted,
-                               "duplicates": products_duplicated,
-                           })
-            except Exception as e:
-                logger.error("BigQuery insertion failed",
-                            extra={
-                                "task_id": task_id,
-                                "execution_id": execution_id,
-                                "error": str(e),
-                            },
-                            exc_info=True)
-                raise
+                        if bq:
+                            try:
+                                insert_result = bq.insert_products(chunk)
+                            except Exception as e:
+                                logger.error("BigQuery insertion failed",
+                                            extra={
+                                                "task_id": task_id,
+                                                "execution_id": execution_id,
+                                                "error": str(e),
+                                            },
+                                            exc_info=True)
+                                raise
+                            products_inserted += insert_result["inserted"]
+                            products_duplicated += insert_result["duplicates"]
+                            if insert_result["errors"]:
+                                # LOAD JOB falhou (insert_products não propaga o erro): o chunk
+                                # fica fora dos índices e é regravado por POST /collect/{task_id}/resume
+                                chunks_failed += 1
+                                logger.error("BigQuery load failed for chunk, skipping downstream indexes",
+                                            extra={
+                                                "task_id": task_id,
+                                                "execution_id": execution_id,
+                                                "products": len(chunk),
+                                            })
+                                continue
+
+                        # Atualiza o índice incremental só depois da persistência, para que uma
+                        # falha no BigQuery não marque como conhecidos itens que nunca foram gravados
+                        if known_items:
+                            known_items.update(chunk, sources_of=deduplicator.sources_of)
+
+                        # Diff de preços contra o último preço visto (eventos + histórico)
+                        price_events += len(price_history.process(chunk))
+
+                        # Alimenta o índice em memória de ofertas (GET /deals)
+                        deals_index.add(chunk)
+
+        if bq:
+            logger.info("BigQuery insertion completed",
+                       extra={
+                           "task_id": task_id,
+                           "execution_id": execution_id,
+                           "inserted": products_inserted,
+                           "duplicates": products_duplicated,
+                       })
+
+        # Com chunks sem LOAD JOB ou fontes que falharam a task não conta como
+        # persistida: POST /collect/{task_id}/resume regrava a coleta e volta a
+        # coletar as fontes que falharam
+        error_message = None
+        if chunks_failed:
+            final_status = "failed" if chunks_failed == chunks_total else "partial"
+            error_message = (
+                f"{chunks_failed} de {chunks_total} chunks falharam no LOAD JOB do BigQuery; "
+                f"use POST /collect/{task_id}/resume para repetir a persistência"
+            )
+        else:
+            final_status = "completed"
+            if checkpoint and not failed_sources:
+                checkpoint.mark_persisted(task_id)
 
         # 5. Armazena resultado
         completed_at = datetime.now(timezone.utc)
         task_results[task_id] = CollectResult(
             execution_id=execution_id,
-            status="completed",
-            sources_processed=len(results),
-            total_products_collected=len(all_products),
+            status=final_status,
+            sources_processed=sources_processed,
+            total_products_collected=total_collected,
             products_inserted=products_inserted,
             products_duplicated=products_duplicated,
+            products_duplicated_in_batch=deduplicator.duplicates,
+            price_events=price_events,
+            per_source=per_source,
+            trace_id=tracer.current_span().trace_id,
             started_at=started_at,
             completed_at=completed_at,
-            error_message=None,
+            error_message=error_message,
         )
 
         logger.info("Collection task completed",
                    extra={
                        "task_id": task_id,
                        "execution_id": execution_id,
+                       "status": final_status,
+                       "chunks_failed": chunks_failed,
                        "duration_seconds": (completed_at - started_at).total_seconds(),
                    })
 
@@ -121,6 +303,7 @@ def run_collection_task(
                         "error": str(e),
                     },
                     exc_info=True)
+        tracer.current_span().record_exception(e)
 
         # Armazena erro
         task_results[task_id] = CollectResult(
@@ -128,12 +311,43 @@ def run_collection_task(
             status="failed",
             sources_processed=0,
             total_products_collected=0,
+            trace_id=tracer.current_span().trace_id,
             started_at=started_at,
             completed_at=datetime.now(timezone.utc),
             error_message=str(e),
         )
 
 
+def _run_tracked_collection_task(**kwargs) -> None:
+    """run_collection_task refletido nos gauges de tasks agendadas/em execução,
+    dentro do span raiz do trace da task (logs com task_id/execution_id) e, se
+    pedido (ou sorteado por PROFILE_SAMPLE_RATE), sob o profiler.
+    """
+    TASKS_QUEUED.dec()
+    TASKS_RUNNING.inc()
+    profiler = TaskProfiler(kwargs["task_id"]) if should_profile(kwargs["request"].profile) else None
+    task_span = tracer.span(
+        "collect.task",
+        task_id=kwargs["task_id"],
+        execution_id=kwargs["execution_id"],
+        sources=len(kwargs["request"].sources or []),
+        reextract_from=kwargs.get("reextract_from"),
+    )
+    try:
+        with bind_log_context(task_id=kwargs["task_id"], execution_id=kwargs["execution_id"]), task_span, \
+                profiler or nullcontext():
+            run_collection_task(**kwargs)
+    finally:
+        TASKS_RUNNING.dec()
+        active_tasks.discard(kwargs["task_id"])
+
+
+def _add_collection_task(background_tasks: BackgroundTasks, **kwargs) -> None:
+    """Agenda run_collection_task em background (conta como task agendada)."""
+    TASKS_QUEUED.inc()
+    active_tasks.add(kwargs["task_id"])
+    background_tasks.add_task(_run_tracked_collection_task, **kwargs)
+
 
 @router.post(
     "/collect",
@@ -162,6 +376,10 @@ async def collect_products(
     - `max_pages_per_source`: Máximo de páginas por fonte (1-10)
     - `delay_between_requests`: Delay entre requisições (0.5-5.0s)
     - `persist_to_bigquery`: Se deve salvar no BigQuery após coleta
+    - `incremental`: Emite apenas itens novos/alterados e para a paginação cedo
+    - `distributed`: Se deve distribuir as fontes entre workers (fila com lease)
+    - `workers`: Processos worker locais no modo distribuído
+    - `memory_budget_mb`: Memória máxima dos produtos retidos antes do despejo em disco
     
     **Exemplo:**
     ```json
@@ -181,10 +399,16 @@ async def collect_products(
         # Calcula tempo estimado (aproximado)
         total_pages = len(request.sources) * request.max_pages_per_source
         estimated_time = int(total_pages * (request.delay_between_requests + 2))  # +2s para processamento
+        if request.distributed and request.workers > 1:
+            estimated_time //= min(request.workers, len(request.sources))
+
+        # Registra a task para permitir retomada via POST /collect/{task_id}/resume
+        if settings.CHECKPOINT_ENABLED:
+            CheckpointStore().save_task(task_id, execution_id, request.model_dump(mode="json"))
 
         # Inicia task em background
-        background_tasks.add_task(
-            run_collection_task,
+        _add_collection_task(
+            background_tasks,
             task_id=task_id,
             execution_id=execution_id,
             request=request,
@@ -217,6 +441,230 @@ async def collect_products(
         )
 
 
+def _schedule_batch(request: BatchCollectRequest, background_tasks: BackgroundTasks) -> CollectResponse:
+    """Agenda uma coleta em lote: as fontes viram unidades na fila distribuída
+    com o tenant e a prioridade do lote.
+    """
+    if request.priority is None:
+        request.priority = settings.BATCH_DEFAULT_PRIORITY
+    # Prioridade interativa ignora o orçamento do tenant: lotes ficam sempre abaixo dela
+    request.priority = max(0, min(request.priority, settings.INTERACTIVE_PRIORITY - 1))
+
+    task_id = str(uuid.uuid4())
+    execution_id = str(uuid.uuid4())[:8]
+
+    # Concorrência efetiva: workers locais, limitados pelo orçamento do tenant
+    concurrency = max(request.workers, 1)
+    budget = tenant_budget(request.tenant)
+    if budget:
+        concurrency = min(concurrency, budget)
+    total_pages = len(request.sources) * request.max_pages_per_source
+    estimated_time = int(total_pages * (request.delay_between_requests + 2)) // concurrency
+
+    if settings.CHECKPOINT_ENABLED:
+        CheckpointStore().save_task(task_id, execution_id, request.model_dump(mode="json"))
+
+    # Metadados na fila (não em memória): o progresso segue consultável após restart/resume
+    get_work_queue().save_batch(task_id, request.tenant, request.priority, len(request.sources))
+    _add_collection_task(
+        background_tasks,
+        task_id=task_id,
+        execution_id=execution_id,
+        request=request,
+    )
+
+    logger.info("Batch collection scheduled",
+               extra={
+                   "task_id": task_id,
+                   "execution_id": execution_id,
+                   "tenant": request.tenant,
+                   "priority": request.priority,
+                   "sources_count": len(request.sources),
+               })
+
+    return CollectResponse(
+        task_id=task_id,
+        execution_id=execution_id,
+        status="started",
+        message="Lote enfileirado. Acompanhe o progresso em GET /collect/batch/{task_id}.",
+        sources=request.sources,
+        estimated_time_seconds=estimated_time,
+    )
+
+
+@router.post(
+    "/collect/batch",
+    response_model=CollectResponse,
+    summary="Iniciar Coleta em Lote",
+    description="Enfileira milhares de fontes com escalonamento justo entre tenants",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {"description": "Lote enfileirado"},
+        422: {"description": "Parâmetros inválidos"},
+    },
+)
+async def collect_batch(request: BatchCollectRequest, background_tasks: BackgroundTasks):
+    """Inicia uma coleta em lote.
+    
+    Cada fonte vira uma unidade na fila distribuída. Os workers escolhem primeiro
+    a maior prioridade e, dentro dela, o tenant com menos unidades em execução;
+    cada tenant respeita seu orçamento de concorrência (`TENANT_MAX_CONCURRENCY`
+    ou `TENANT_CONCURRENCY_BUDGETS`). Lotes usam `BATCH_DEFAULT_PRIORITY` e o
+    tenant `BATCH_DEFAULT_TENANT` por padrão; a prioridade fica sempre abaixo de
+    `INTERACTIVE_PRIORITY`, cujas unidades não esperam pelo orçamento.
+    
+    **Parâmetros adicionais:**
+    - `tenant`: Dono do lote
+    - `priority`: Prioridade das unidades (0 a INTERACTIVE_PRIORITY - 1)
+    """
+    return _schedule_batch(request, background_tasks)
+
+
+@router.post(
+    "/collect/batch/upload",
+    response_model=CollectResponse,
+    summary="Iniciar Coleta em Lote (arquivo)",
+    description="Como POST /collect/batch, com as fontes em um arquivo texto (uma por linha)",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {"description": "Lote enfileirado"},
+        400: {"description": "Arquivo vazio ou parâmetros inválidos"},
+    },
+)
+async def collect_batch_upload(
+    raw_request: Request,
+    background_tasks: BackgroundTasks,
+    tenant: str = Query(settings.BATCH_DEFAULT_TENANT, description="Dono do lote"),
+    priority: int | None = Query(None, ge=0, le=9, description="Prioridade das unidades (0-9)"),
+    limit_per_source: int = Query(100, ge=1, le=500, description="Máximo de produtos por fonte"),
+    max_pages_per_source: int = Query(3, ge=1, le=10, description="Máximo de páginas por fonte"),
+    persist_to_bigquery: bool = Query(True, description="Se deve salvar no BigQuery após coleta"),
+    workers: int = Query(4, ge=0, le=32, description="Processos worker locais"),
+):
+    """Recebe o corpo da requisição como texto (`text/plain`), uma fonte por linha.
+    Linhas vazias e iniciadas por `#` são ignoradas; fontes repetidas entram uma vez.
+    """
+    body = (await raw_request.body()).decode("utf-8", errors="replace")
+    sources = list(dict.fromkeys(
+        line.strip() for line in body.splitlines() if line.strip() and not line.lstrip().startswith("#")
+    ))
+
+    try:
+        request = BatchCollectRequest(
+            sources=sources,
+            tenant=tenant,
+            priority=priority,
+            limit_per_source=limit_per_source,
+            max_pages_per_source=max_pages_per_source,
+            persist_to_bigquery=persist_to_bigquery,
+            workers=workers,
+        )
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Lote inválido: {errors}",
+        )
+
+    return _schedule_batch(request, background_tasks)
+
+
+@router.post(
+    "/collect/reextract",
+    response_model=CollectResponse,
+    summary="Re-extrair Coleta Arquivada",
+    description="Roda o extrator atual sobre o HTML arquivado de uma execução, sem novas requisições",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {"description": "Re-extração iniciada"},
+        404: {"description": "Nenhuma página arquivada para a execução"},
+    },
+)
+async def reextract_collection(request: ReextractRequest, background_tasks: BackgroundTasks):
+    """Re-emite os produtos de uma coleta a partir do HTML arquivado
+    (`HTML_ARCHIVE_ENABLED`), útil após mudanças de layout ou correções no parser.
+    
+    Os produtos recebem um novo `execution_id` e seguem o mesmo pipeline de uma
+    coleta (deduplicação, matching, BigQuery, export em `GET /collect/{task_id}/export`).
+    """
+    try:
+        archive = HtmlArchive()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    sources = request.sources or archive.sources(request.execution_id)
+    if not sources or not archive.pages(request.execution_id, sources):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Nenhuma página arquivada para a execução {request.execution_id}.",
+        )
+
+    task_id = str(uuid.uuid4())
+    execution_id = str(uuid.uuid4())[:8]
+    collect_request = CollectRequest(
+        sources=sources,
+        persist_to_bigquery=request.persist_to_bigquery,
+        source_policy=request.source_policy,
+        workers=request.workers,
+        profile=request.profile,
+    )
+    _add_collection_task(
+        background_tasks,
+        task_id=task_id,
+        execution_id=execution_id,
+        request=collect_request,
+        reextract_from=request.execution_id,
+    )
+
+    logger.info("Reextraction task scheduled",
+               extra={
+                   "task_id": task_id,
+                   "execution_id": execution_id,
+                   "source_execution_id": request.execution_id,
+                   "sources_count": len(sources),
+               })
+
+    return CollectResponse(
+        task_id=task_id,
+        execution_id=execution_id,
+        status="started",
+        message="Re-extração iniciada. Use o task_id para consultar o resultado.",
+        sources=sources,
+        estimated_time_seconds=0,
+    )
+
+
+@router.get(
+    "/collect/batch/{task_id}",
+    response_model=BatchStatusResponse,
+    summary="Progresso da Coleta em Lote",
+    description="Unidades por status na fila e, ao final, o resultado agregado e por fonte",
+    responses={
+        200: {"description": "Progresso do lote"},
+        404: {"description": "Lote não encontrado"},
+    },
+)
+def get_batch_status(task_id: str):
+    """Consulta o progresso de um lote (enquanto roda, lê a fila distribuída)."""
+    job = get_work_queue().get_batch(task_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lote {task_id} não encontrado.",
+        )
+
+    result = task_results.get(task_id)
+    return BatchStatusResponse(
+        task_id=task_id,
+        tenant=job["tenant"],
+        priority=job["priority"],
+        status=result.status if result else "running",
+        sources_total=job["sources_total"],
+        units=get_work_queue().job_status(task_id),
+        result=result,
+    )
+
+
 @router.get(
     "/collect/{task_id}",
     response_model=CollectResult,
@@ -248,3 +696,162 @@ async def get_collect_result(task_id: str):
                 extra={"task_id": task_id})
     return task_results[task_id]
 
+
+@router.get(
+    "/collect/{task_id}/export",
+    summary="Exportar Produtos da Coleta",
+    description="Download em streaming (NDJSON, CSV ou Parquet) dos produtos coletados pela task",
+    responses={
+        200: {"description": "Arquivo em streaming"},
+        404: {"description": "Export não encontrado (task em execução, inválida ou expirada)"},
+    },
+)
+def export_collect_result(
+    task_id: str,
+    format: Literal["ndjson", "csv", "parquet"] = Query("ndjson", description="Formato do arquivo"),
+    compress: bool = Query(True, description="Comprime NDJSON/CSV com gzip (Parquet já usa zstd)"),
+):
+    """Exporta os produtos da task sem passar pelo BigQuery.
+    
+    Funciona também para coletas com `persist_to_bigquery=false`. Os dados ficam
+    disponíveis por `TASK_EXPORT_TTL_HOURS` após o término da coleta.
+    """
+    store = TaskExportStore()
+    if not store.exists(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Export da task {task_id} não encontrado. Ela pode ainda estar em execução ou ter expirado.",
+        )
+
+    gzipped = compress and format != "parquet"
+    headers = {"Content-Disposition": f'attachment; filename="{task_id}.{format}"'}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+
+    logger.info("Collection export started",
+               extra={"task_id": task_id, "format": format, "compress": gzipped})
+    return StreamingResponse(
+        store.iter_export(task_id, format, compress=gzipped),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@router.get(
+    "/collect/{task_id}/profile",
+    response_model=ProfileResponse,
+    summary="Perfil da Coleta",
+    description="Resumo do profiling da task ou download de um artefato (pilhas, pstats, alocações)",
+    responses={
+        200: {"description": "Resumo (JSON) ou artefato"},
+        404: {"description": "Task sem perfil (não perfilada, em execução ou expirada)"},
+    },
+)
+def get_collect_profile(
+    task_id: str,
+    artifact: Literal["summary", "stacks", "pstats", "allocations"] = Query(
+        "summary",
+        description="summary (JSON), stacks (formato folded p/ flamegraph), pstats (cProfile) ou allocations (tracemalloc)",
+    ),
+):
+    """Retorna o perfil de uma task criada com `profile=true` (ou amostrada por
+    `PROFILE_SAMPLE_RATE`). O perfil é gravado quando a task termina.
+    
+    `stacks` pode ser aberto direto no speedscope ou em `flamegraph.pl`;
+    `pstats` em `python -m pstats` ou snakeviz.
+    """
+    store = ProfileStore()
+    summary = store.load_summary(task_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Perfil da task {task_id} não encontrado. Ela pode não ter sido perfilada, estar em execução ou ter expirado.",
+        )
+
+    if artifact == "summary":
+        return ProfileResponse(**summary)
+
+    path = store.artifact_path(task_id, artifact)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artefato '{artifact}' não disponível para a task {task_id} (modo {summary['mode']}).",
+        )
+    filename, media_type = PROFILE_ARTIFACTS[artifact]
+    return FileResponse(path, media_type=media_type, filename=f"{task_id}-{filename}")
+
+
+@router.post(
+    "/collect/{task_id}/resume",
+    response_model=CollectResponse,
+    summary="Retomar Coleta",
+    description="Retoma uma coleta interrompida a partir dos checkpoints",
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {"description": "Retomada iniciada"},
+        404: {"description": "Checkpoint da task não encontrado"},
+        409: {"description": "Task já concluída ou ainda em execução"},
+    },
+)
+async def resume_collection(task_id: str, background_tasks: BackgroundTasks):
+    """Retoma uma coleta interrompida (restart do container, erro no BigQuery, etc).
+    
+    Páginas (source, page) já coletadas são recuperadas do checkpoint sem novas
+    requisições. Se a coleta inteira já havia terminado, apenas a persistência
+    no BigQuery é refeita.
+    """
+    record = CheckpointStore().get_task(task_id) if settings.CHECKPOINT_ENABLED else None
+    if record is None:
+        logger.warning("Collection checkpoint not found",
+                      extra={"task_id": task_id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Checkpoint da task {task_id} não encontrado.",
+        )
+
+    if record["persisted"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} já foi concluída, nada a retomar.",
+        )
+
+    # Uma segunda execução do mesmo task_id duplicaria os LOAD JOBs e disputaria checkpoint/export
+    if task_id in active_tasks:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} ainda está em execução.",
+        )
+
+    # Lotes voltam como BatchCollectRequest (limite de fontes e padrões do lote)
+    request_model = BatchCollectRequest if get_work_queue().get_batch(task_id) else CollectRequest
+    request = request_model.model_validate(record["request"])
+    execution_id = record["execution_id"]
+
+    # Sem coleta pendente, resta apenas a persistência
+    estimated_time = 0
+    if not record["crawl_completed"]:
+        total_pages = len(request.sources) * request.max_pages_per_source
+        estimated_time = int(total_pages * (request.delay_between_requests + 2))
+
+    _add_collection_task(
+        background_tasks,
+        task_id=task_id,
+        execution_id=execution_id,
+        request=request,
+    )
+
+    logger.info("Collection task resumed",
+               extra={
+                   "task_id": task_id,
+                   "execution_id": execution_id,
+                   "crawl_completed": record["crawl_completed"],
+               })
+
+    return CollectResponse(
+        task_id=task_id,
+        execution_id=execution_id,
+        status="resumed",
+        message="Coleta retomada a partir do checkpoint.",
+        sources=request.sources,
+        estimated_time_seconds=estimated_time,
+    )
@@ -0,0 +1,54 @@
+# app/routes/deals.py
+"""Endpoint de ofertas servido pelo índice em memória (sem BigQuery).
+"""
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from app.core.logging import get_logger
+from app.schemas.api import DealsResponse
+from app.services.deals_index import deals_index
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/deals",
+    response_model=DealsResponse,
+    summary="Melhores Ofertas",
+    description="Consulta as ofertas das coletas recentes a partir do índice em memória",
+)
+async def list_deals(
+    source: str | None = Query(None, description="Filtra pela fonte (termo de busca)"),
+    item_id: str | None = Query(None, description="Busca um item específico"),
+    min_discount: float | None = Query(None, ge=0, le=100, description="Desconto mínimo (%)"),
+    min_price: float | None = Query(None, ge=0, description="Preço mínimo"),
+    max_price: float | None = Query(None, ge=0, description="Preço máximo"),
+    sort: Literal["discount", "price"] = Query("discount", description="Ordenação (maior desconto ou menor preço)"),
+    limit: int = Query(50, ge=1, le=1000, description="Máximo de ofertas retornadas"),
+):
+    """Consulta rápida de ofertas para dashboards.
+    
+    Usa apenas memória local, alimentada a cada coleta concluída; o BigQuery
+    continua sendo o sistema de registro. Itens antigos são removidos do índice.
+    """
+    if item_id is not None:
+        product = deals_index.get(item_id)
+        deals = [product] if product else []
+    elif sort == "price":
+        deals = deals_index.price_range(min_price=min_price, max_price=max_price, source=source, limit=limit)
+        if min_discount is not None:
+            deals = [p for p in deals if (p.discount_percent or 0) >= min_discount]
+    else:
+        deals = deals_index.top_deals(
+            k=limit,
+            source=source,
+            min_discount=min_discount,
+            min_price=min_price,
+            max_price=max_price,
+        )
+
+    logger.debug("Deals retrieved", extra={"count": len(deals), "sort": sort})
+    return DealsResponse(count=len(deals), indexed_items=len(deals_index), deals=deals)
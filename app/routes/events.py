@@ -0,0 +1,45 @@
+# app/routes/events.py
+"""Endpoints de eventos de preço (novo item, preço alterado, volta ao estoque).
+"""
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from app.core.logging import get_logger
+from app.schemas.api import PriceEventsResponse
+from app.services.price_history import PriceHistoryService
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(
+    "/events/prices",
+    response_model=PriceEventsResponse,
+    summary="Eventos de Preço",
+    description="Lista eventos de preço emitidos pelas coletas, do mais recente para o mais antigo",
+)
+def list_price_events(
+    since: datetime | None = Query(None, description="Apenas eventos a partir deste timestamp"),
+    event_type: Literal["new_item", "price_changed", "back_in_stock"] | None = Query(
+        None, description="Filtra pelo tipo de evento",
+    ),
+    item_id: str | None = Query(None, description="Filtra por item (histórico de preço do item)"),
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de eventos retornados"),
+):
+    """Consulta o stream de eventos de preço.
+    
+    Para o histórico de um item específico, use `item_id`. Quedas de preço têm
+    `event_type=price_changed` e `price_delta` negativo.
+    """
+    events = PriceHistoryService().get_events(
+        since=since,
+        event_type=event_type,
+        item_id=item_id,
+        limit=limit,
+    )
+    logger.debug("Price events retrieved",
+                extra={"count": len(events), "event_type": event_type, "item_id": item_id})
+    return PriceEventsResponse(count=len(events), events=events)
@@ -1,61 +1,75 @@
 # app/routes/health.py
-"""Endpoint de health check.
+"""Endpoints de health check.
+
+Os checks de dependências (BigQuery, alcance do marketplace, saturação da
+fila de tasks) rodam numa thread em background (app.services.health); os
+endpoints só leem o último resultado, sem I/O.
 """
+import time
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, status
-
-from app.core.logging import get_logger
-from app.schemas.api import HealthResponse
-from app.services.bigquery import BigQueryService
+from fastapi import APIRouter, Response, status
 
-logger = get_logger(__name__)
+from app.schemas.api import HealthResponse, LivenessResponse, ReadinessResponse
+from app.services.health import STATUS_HEALTHY, health_monitor
 
 router = APIRouter()
 
+_started = time.monotonic()
+
 
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Health Check",
-    description="Verifica o status da API e serviços dependentes",
+    description="Status da API e dos serviços dependentes (último resultado dos checks em background)",
     status_code=status.HTTP_200_OK,
 )
 async def health_check():
     """Endpoint de health check para monitoramento.
-    Verifica conectividade com BigQuery e status geral da aplicação.
+    Resume o último resultado dos checks: degraded se algum serviço falhou.
     """
+    snapshot = health_monitor.snapshot()
     services_status = {
-        "crawler": "healthy",
-        "bigquery": "unknown",
+        name: result["status"] if result["status"] != "unhealthy" else f"unhealthy: {result['detail']}"
+        for name, result in snapshot["checks"].items()
     }
-    overall_status = "healthy"
-
-    # Testa conexão com BigQuery
-    try:
-        bq = BigQueryService()
-        # Tenta uma operação simples para verificar conectividade
-        bq.client.get_dataset(bq.dataset_id)
-        services_status["bigquery"] = "healthy"
-        logger.info("BigQuery health check passed",
-                   extra={"service": "bigquery"})
-    except Exception as e:
-        services_status["bigquery"] = f"unhealthy: {e!s}"
-        overall_status = "degraded"
-        logger.error("BigQuery health check failed",
-                    extra={"service": "bigquery", "error": str(e)},
-                    exc_info=True)
-
-    logger.debug("Health check completed",
-                extra={
-                    "overall_status": overall_status,
-                    "services": services_status,
-                })
+    healthy = all(result["status"] == STATUS_HEALTHY for result in snapshot["checks"].values())
 
     return HealthResponse(
-        status=overall_status,
+        status="healthy" if healthy and not snapshot["stale"] else "degraded",
         timestamp=datetime.now(timezone.utc),
         version="1.0.0",
         services=services_status,
+    )
+
 
+@router.get(
+    "/health/live",
+    response_model=LivenessResponse,
+    summary="Liveness",
+    description="O processo está de pé e o event loop responde",
+)
+async def liveness():
+    """Probe de liveness: não depende de serviços externos."""
+    return LivenessResponse(status="alive", uptime_seconds=round(time.monotonic() - _started, 3))
+
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    summary="Readiness",
+    description="Réplica pronta para receber tráfego (503 se algum check de HEALTH_READY_CHECKS falhou)",
+    responses={503: {"description": "Réplica não pronta", "model": ReadinessResponse}},
+)
+async def readiness(response: Response):
+    """Probe de readiness: lê o resultado em cache dos checks em background."""
+    snapshot = health_monitor.snapshot()
+    if not snapshot["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(
+        status="ready" if snapshot["ready"] else "not_ready",
+        refreshed_at=snapshot["refreshed_at"],
+        stale=snapshot["stale"],
+        checks=snapshot["checks"],
     )
@@ -0,0 +1,56 @@
+# app/routes/metrics.py
+"""Endpoint de métricas no formato Prometheus.
+
+Além das métricas registradas em app.core.metrics (latências por etapa,
+contadores de páginas/itens/bloqueios, tasks), expõe como gauges o estado do
+controle adaptativo, do pool de saídas e dos circuit breakers, lido no momento
+da coleta.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import Gauge, registry
+from app.services.circuit_breaker import STATE_OPEN, CircuitBreaker
+from app.services.egress import egress_pool
+from app.services.throttle import throttle
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _throttle_gauge(field: str):
+    return lambda: {(host,): state[field] or 0.0 for host, state in throttle.snapshot().items()}
+
+
+def _circuits() -> dict:
+    if not settings.BREAKER_ENABLED:
+        return {}
+    return {(host,): float(state["state"] == STATE_OPEN) for host, state in CircuitBreaker().snapshot().items()}
+
+
+Gauge("throttle_rate_per_second", "Taxa permitida pelo controle adaptativo", ("host",),
+      callback=_throttle_gauge("rate_per_second"))
+Gauge("throttle_concurrency_limit", "Limite de requisições simultâneas (taxa x latência)", ("host",),
+      callback=_throttle_gauge("concurrency_limit"))
+Gauge("throttle_in_flight", "Requisições em andamento", ("host",),
+      callback=_throttle_gauge("in_flight"))
+Gauge("egress_score", "Vazão esperada da saída (páginas úteis/s)", ("egress",),
+      callback=lambda: {(egress_id,): s["score"] for egress_id, s in egress_pool.snapshot().items()})
+Gauge("egress_quarantined", "Saída em quarentena (1) ou disponível (0)", ("egress",),
+      callback=lambda: {
+          (egress_id,): float(s["quarantined_seconds"] > 0) for egress_id, s in egress_pool.snapshot().items()
+      })
+Gauge("circuit_open", "Circuito do host aberto (1) ou fechado/half-open (0)", ("host",), callback=_circuits)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Métricas Prometheus",
+    description="Latências por etapa, contadores da coleta e estado do controle de requisições",
+)
+def get_metrics():
+    """Exposição de texto para o scrape do Prometheus (estado do processo da API)."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,105 @@
+# app/routes/products.py
+"""Endpoints de leitura paginada e export em streaming da tabela de produtos.
+"""
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.logging import get_logger
+from app.schemas.api import ProductsPage
+from app.services.bigquery_reader import (
+    COLUMNS,
+    InvalidCursorError,
+    ProductReader,
+    build_row_restriction,
+)
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _parse_columns(columns: str | None) -> list[str] | None:
+    if not columns:
+        return None
+    selected = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in selected if c not in COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Colunas desconhecidas: {', '.join(unknown)}",
+        )
+    return selected
+
+
+@router.get(
+    "/products",
+    response_model=ProductsPage,
+    summary="Listar Produtos",
+    description="Lista produtos do BigQuery com paginação por cursor (Storage Read API)",
+    responses={
+        200: {"description": "Página de produtos"},
+        400: {"description": "Cursor ou colunas inválidos"},
+    },
+)
+def list_products(
+    limit: int = Query(100, ge=1, le=5000, description="Linhas por página"),
+    cursor: str | None = Query(None, description="Cursor retornado pela página anterior"),
+    hours: int | None = Query(None, ge=1, description="Apenas produtos coletados nas últimas X horas"),
+    source: str | None = Query(None, description="Filtra pela fonte (termo de busca)"),
+    min_discount: float | None = Query(None, ge=0, le=100, description="Desconto mínimo (%)"),
+    columns: str | None = Query(None, description="Colunas separadas por vírgula (padrão: todas)"),
+):
+    """Lê uma página de produtos sem materializar a consulta inteira.
+    
+    Os filtros valem na primeira página; as seguintes continuam o mesmo stream
+    de leitura usando `next_cursor`.
+    """
+    try:
+        rows, next_cursor = ProductReader().read_page(
+            limit=limit,
+            cursor=cursor,
+            columns=_parse_columns(columns),
+            row_restriction=build_row_restriction(hours=hours, source=source, min_discount=min_discount),
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    logger.debug("Products page read", extra={"count": len(rows), "has_next": next_cursor is not None})
+    return ProductsPage(count=len(rows), items=rows, next_cursor=next_cursor)
+
+
+@router.get(
+    "/products/export",
+    summary="Exportar Produtos",
+    description="Download em streaming (NDJSON ou Parquet) com memória constante",
+    responses={
+        200: {"description": "Arquivo em streaming"},
+        400: {"description": "Colunas inválidas"},
+    },
+)
+def export_products(
+    format: Literal["ndjson", "parquet"] = Query("ndjson", description="Formato do arquivo"),
+    hours: int | None = Query(None, ge=1, description="Apenas produtos coletados nas últimas X horas"),
+    source: str | None = Query(None, description="Filtra pela fonte (termo de busca)"),
+    min_discount: float | None = Query(None, ge=0, le=100, description="Desconto mínimo (%)"),
+    columns: str | None = Query(None, description="Colunas separadas por vírgula (padrão: todas)"),
+):
+    """Exporta produtos em chunks, um record batch Arrow por vez."""
+    chunks = ProductReader().iter_export(
+        fmt=format,
+        columns=_parse_columns(columns),
+        row_restriction=build_row_restriction(hours=hours, source=source, min_discount=min_discount),
+    )
+    logger.info("Products export started", extra={"format": format, "source": source, "hours": hours})
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
@@ -0,0 +1,35 @@
+# app/routes/throttle.py
+"""Endpoint com o estado do controle adaptativo de requisições (AIMD) e dos
+circuit breakers por host.
+"""
+from fastapi import APIRouter
+
+from app.core.config import settings
+from app.schemas.api import ThrottleResponse
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.egress import egress_pool
+from app.services.throttle import throttle
+
+router = APIRouter()
+
+
+@router.get(
+    "/throttle",
+    response_model=ThrottleResponse,
+    summary="Controle de Requisições",
+    description="Limite de concorrência, taxa e circuit breaker por host e estado do pool de saídas",
+)
+async def get_throttle():
+    """Retorna o estado do controlador adaptativo e dos circuitos por host.
+    
+    Coletas distribuídas rodam em processos worker, cada um com seu próprio
+    controlador; aqui aparece apenas a taxa do processo da API. Os circuitos
+    são compartilhados entre processos.
+    """
+    circuits = CircuitBreaker().snapshot() if settings.BREAKER_ENABLED else {}
+    return ThrottleResponse(
+        enabled=settings.THROTTLE_ENABLED,
+        hosts=throttle.snapshot(),
+        circuits=circuits,
+        egress=egress_pool.snapshot(),
+    )
@@ -1,8 +1,12 @@
 # app/schemas/api.py
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.schemas.product import PriceEvent, ProductSchema
+
 
 class HealthResponse(BaseModel):
     """Resposta do endpoint de health check"""
@@ -13,12 +17,31 @@ class HealthResponse(BaseModel):
     services: dict = Field(..., description="Status dos serviços dependentes")
 
 
+class LivenessResponse(BaseModel):
+    """Resposta do probe de liveness"""
+
+    status: str = Field(..., description="Sempre 'alive' enquanto o processo responde")
+    uptime_seconds: float = Field(..., description="Tempo desde o início do processo")
+
+
+class ReadinessResponse(BaseModel):
+    """Resposta do probe de readiness (último resultado dos checks em background)"""
+
+    status: str = Field(..., description="ready/not_ready")
+    refreshed_at: datetime | None = Field(None, description="Instante da última rodada de checks")
+    stale: bool = Field(..., description="Resultado antigo demais (checks parados ou travados)")
+    checks: dict[str, dict] = Field(..., description="Status, detalhe e latência de cada check")
+
+
 class CollectRequest(BaseModel):
     """Requisição para o endpoint de coleta"""
 
     sources: list[str] = Field(
         ...,
-        description="Lista de termos de busca (ex: ['monitor gamer', 'ps5'])",
+        description=(
+            "Lista de termos de busca (ex: ['monitor gamer', 'ps5']); prefixo opcional "
+            "'marketplace:' escolhe o adaptador (ex: 'mercado_livre:ps5')"
+        ),
         min_length=1,
         examples=[["monitor gamer 144hz", "iphone 16"]],
     )
@@ -44,6 +67,107 @@ class CollectRequest(BaseModel):
         default=True,
         description="Se True, persiste dados no BigQuery após coleta",
     )
+    incremental: bool = Field(
+        default=False,
+        description="Se True, emite apenas itens novos ou com preço alterado e para a paginação cedo",
+    )
+    incremental_stop_ratio: float | None = Field(
+        default=None,
+        gt=0.0,
+        le=1.0,
+        description="Fração de itens inalterados na página que encerra a paginação (padrão: configuração)",
+    )
+    source_policy: Literal["keep_first", "merge_sources"] | None = Field(
+        default=None,
+        description="Atribuição de fonte para itens repetidos no job (padrão: configuração)",
+    )
+    distributed: bool = Field(
+        default=False,
+        description="Se True, distribui as fontes entre workers via fila com lease",
+    )
+    workers: int = Field(
+        default=4,
+        ge=0,
+        le=32,
+        description="Processos worker locais no modo distribuído (0 = apenas workers externos)",
+    )
+    memory_budget_mb: int | None = Field(
+        default=None,
+        ge=1,
+        le=4096,
+        description="Memória máxima (MB) dos produtos retidos pela task antes do despejo em disco (padrão: configuração)",
+    )
+    tenant: str = Field(
+        default=settings.INTERACTIVE_DEFAULT_TENANT,
+        min_length=1,
+        max_length=64,
+        description="Tenant dono da coleta (orçamento de concorrência na fila distribuída)",
+    )
+    priority: int | None = Field(
+        default=None,
+        ge=0,
+        le=9,
+        description="Prioridade das unidades na fila distribuída (padrão: interativa)",
+    )
+    profile: bool = Field(
+        default=False,
+        description="Se True, perfila a task (CPU e alocações) e disponibiliza em GET /collect/{task_id}/profile",
+    )
+
+
+class BatchCollectRequest(CollectRequest):
+    """Requisição de coleta em lote (milhares de fontes, sempre distribuída)"""
+
+    sources: list[str] = Field(
+        ...,
+        description="Lista de termos de busca",
+        min_length=1,
+        max_length=settings.BATCH_MAX_SOURCES,
+    )
+    distributed: bool = Field(
+        default=True,
+        description="Lotes sempre usam a fila distribuída",
+    )
+    tenant: str = Field(
+        default=settings.BATCH_DEFAULT_TENANT,
+        min_length=1,
+        max_length=64,
+        description="Tenant dono do lote (orçamento de concorrência na fila distribuída)",
+    )
+    priority: int | None = Field(
+        default=None,
+        ge=0,
+        le=9,
+        description="Prioridade das unidades na fila (padrão: BATCH_DEFAULT_PRIORITY; sempre abaixo de INTERACTIVE_PRIORITY)",
+    )
+
+
+class ReextractRequest(BaseModel):
+    """Requisição de re-extração das páginas arquivadas de uma execução"""
+
+    execution_id: str = Field(..., description="Execução cujas páginas arquivadas serão re-extraídas")
+    sources: list[str] | None = Field(
+        default=None,
+        description="Fontes a re-extrair (padrão: todas as arquivadas na execução)",
+    )
+    workers: int = Field(
+        default=4,
+        ge=0,
+        le=32,
+        description="Processos de extração em paralelo (0/1 = no processo da API)",
+    )
+    persist_to_bigquery: bool = Field(
+        default=True,
+        description="Se True, persiste os produtos re-extraídos no BigQuery",
+    )
+    profile: bool = Field(
+        default=False,
+        description="Se True, perfila a re-extração (GET /collect/{task_id}/profile)",
+    )
+    source_policy: Literal["keep_first", "merge_sources"] | None = Field(
+        default=None,
+        description="Atribuição de fonte para itens repetidos no job (padrão: configuração)",
+    )
 
 
 class CollectResponse(BaseModel):
@@ -57,20 +181,109 @@ class CollectResponse(BaseModel):
     estimated_time_seconds: int = Field(..., description="Tempo estimado em segundos")
 
 
+class SourceResult(BaseModel):
+    """Resultado de uma fonte dentro de uma coleta"""
+
+    source: str = Field(..., description="Termo de busca")
+    status: str = Field(..., description="Status da fonte (completed/failed)")
+    products_collected: int = Field(..., description="Produtos coletados da fonte")
+    error_message: str | None = Field(None, description="Mensagem de erro se falhou")
+
+
 class CollectResult(BaseModel):
     """Resultado final da coleta (armazenado em memória/cache)"""
 
     execution_id: str = Field(..., description="ID da execução")
-    status: str = Field(..., description="Status final (completed/failed)")
+    status: str = Field(..., description="Status final (completed/partial/failed)")
     sources_processed: int = Field(..., description="Quantidade de fontes processadas")
     total_products_collected: int = Field(..., description="Total de produtos coletados")
     products_inserted: int | None = Field(None, description="Produtos inseridos no BigQuery")
     products_duplicated: int | None = Field(None, description="Produtos duplicados (não inseridos)")
+    products_duplicated_in_batch: int | None = Field(None, description="Duplicados dentro da própria coleta (entre fontes/páginas)")
     started_at: datetime = Field(..., description="Timestamp de início")
     completed_at: datetime = Field(..., description="Timestamp de conclusão")
+    price_events: int | None = Field(None, description="Eventos de preço emitidos (novo/alterado/volta ao estoque)")
+    per_source: list[SourceResult] | None = Field(None, description="Resultado por fonte")
+    trace_id: str | None = Field(None, description="ID do trace da task (com TRACING_ENABLED)")
     error_message: str | None = Field(None, description="Mensagem de erro se falhou")
 
 
+class BatchStatusResponse(BaseModel):
+    """Progresso de uma coleta em lote"""
+
+    task_id: str = Field(..., description="ID da task em background")
+    tenant: str = Field(..., description="Tenant dono do lote")
+    priority: int = Field(..., description="Prioridade das unidades na fila")
+    status: str = Field(..., description="Status do lote (running/completed/failed)")
+    sources_total: int = Field(..., description="Quantidade de fontes do lote")
+    units: dict[str, int] = Field(..., description="Unidades na fila por status (pending/leased/done/failed)")
+    result: CollectResult | None = Field(None, description="Resultado agregado e por fonte (quando concluído)")
+
+
+class PriceEventsResponse(BaseModel):
+    """Resposta do endpoint de eventos de preço"""
+
+    count: int = Field(..., description="Quantidade de eventos retornados")
+    events: list[PriceEvent] = Field(..., description="Eventos, do mais recente para o mais antigo")
+
+
+class DealsResponse(BaseModel):
+    """Resposta do endpoint de ofertas (índice em memória)"""
+
+    count: int = Field(..., description="Quantidade de ofertas retornadas")
+    indexed_items: int = Field(..., description="Total de itens no índice")
+    deals: list[ProductSchema] = Field(..., description="Ofertas encontradas")
+
+
+class ProductsPage(BaseModel):
+    """Página de produtos lida via Storage Read API"""
+
+    count: int = Field(..., description="Quantidade de linhas na página")
+    items: list[dict] = Field(..., description="Linhas (apenas as colunas projetadas)")
+    next_cursor: str | None = Field(None, description="Cursor da próxima página (None se acabou)")
+
+
+class ClusterOffer(BaseModel):
+    """Oferta (anúncio) pertencente a um cluster de produto"""
+
+    item_id: str = Field(..., description="ID único do item (ex: MLB12345678)")
+    title: str = Field(..., description="Título do anúncio")
+    price: float = Field(..., description="Último preço visto")
+    url: str = Field(..., description="Link direto para o anúncio")
+    image_url: str | None = Field(None, description="URL da imagem principal")
+    updated_at: datetime = Field(..., description="Última vez que o anúncio foi visto")
+
+
+class ClusterCheapestResponse(BaseModel):
+    """Resposta do endpoint de oferta mais barata de um cluster"""
+
+    cluster_id: str = Field(..., description="ID do cluster de produto")
+    offers_count: int = Field(..., description="Quantidade de anúncios no cluster")
+    cheapest: ClusterOffer = Field(..., description="Oferta mais barata do cluster")
+
+
+class ProfileResponse(BaseModel):
+    """Resumo do profiling de uma task"""
+
+    task_id: str = Field(..., description="ID da task")
+    mode: str = Field(..., description="Modo do profiler (sampling/deterministic)")
+    duration_seconds: float = Field(..., description="Duração da task perfilada")
+    samples: int | None = Field(None, description="Pilhas amostradas (modo sampling)")
+    top_functions: list[dict] = Field(..., description="Funções com mais tempo próprio")
+    top_allocations: list[dict] = Field(..., description="Linhas que mais alocaram memória durante a task")
+    peak_traced_memory_mb: float | None = Field(None, description="Pico de memória rastreada pelo tracemalloc")
+    artifacts: list[str] = Field(..., description="Artefatos disponíveis (stacks, pstats, allocations)")
+
+
+class ThrottleResponse(BaseModel):
+    """Estado do controle adaptativo de requisições"""
+
+    enabled: bool = Field(..., description="Se o controle adaptativo está ativo")
+    hosts: dict[str, dict] = Field(..., description="Por host: limite de concorrência, taxa (req/s), latência média")
+    circuits: dict[str, dict] = Field(default_factory=dict, description="Por host: estado do circuit breaker (closed/open/half_open)")
+    egress: dict[str, dict] = Field(default_factory=dict, description="Por saída (proxy/user-agent): pontuação, latência, sucesso, bloqueio e quarentena")
+
+
 class ErrorResponse(BaseModel):
     """Resposta padrão de erro"""
 
@@ -20,6 +20,10 @@ class ProductSchema(BaseModel):
     seller: str | None = Field(None, description="Nome do vendedor ou loja oficial")
     image_url: str | None = Field(None, description="URL da imagem principal")
     source: str = Field(..., description="Query/página que gerou o item (ex: 'monitor gamer 144hz')")
+    sources: list[str] | None = Field(None, description="Todas as fontes do job em que o item apareceu (política merge_sources)")
+
+    # Matching de anúncios do mesmo produto (MinHash/LSH)
+    product_cluster_id: str | None = Field(None, description="Cluster de anúncios quase duplicados do mesmo produto")
 
     # Campos de rastreabilidade
     dedupe_key: str = Field(..., description="Chave única para deduplicação (marketplace + item_id + price)")
@@ -34,3 +38,25 @@ class ProductSchema(BaseModel):
     def has_discount(self) -> bool:
         """Indica se o produto está em promoção."""
         return self.original_price is not None and self.original_price > self.price
+
+
+class PriceEvent(BaseModel):
+    """Evento de mudança observada em um item (novo, preço alterado, volta ao estoque)."""
+
+    event_type: str = Field(..., description="Tipo do evento (new_item/price_changed/back_in_stock)")
+    item_id: str = Field(..., description="ID único do item (ex: MLB12345678)")
+    old_price: float | None = Field(None, description="Último preço conhecido (None para itens novos)")
+    new_price: float = Field(..., description="Preço observado nesta coleta")
+    title: str = Field(..., description="Título do produto")
+    url: str = Field(..., description="Link direto para o produto")
+    source: str = Field(..., description="Query que gerou o item")
+    execution_id: str = Field(..., description="ID da execução que observou a mudança")
+    occurred_at: datetime = Field(..., description="Timestamp da observação")
+
+    @computed_field
+    @property
+    def price_delta(self) -> float | None:
+        """Diferença entre o preço novo e o antigo (negativa em quedas de preço)."""
+        if self.old_price is None:
+            return None
+        return round(self.new_price - self.old_price, 2)
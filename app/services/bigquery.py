@@ -1,37 +1,73 @@
 # app/services/bigquery.py
 import json
+import os
 import tempfile
-from datetime import datetime, timezone
-
-from google.cloud import bigquery
-from google.cloud.exceptions import NotFound
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import DEDUPE_QUERY_SECONDS, DUPLICATES_TOTAL, LOAD_JOB_SECONDS
+from app.core.tracing import SPAN_KIND_CLIENT, tracer
 from app.schemas.product import ProductSchema
+from app.services.query_cache import query_cache
+from app.services.table_stats import TableStatsStore
 
 logger = get_logger(__name__)
 
-# Schema da tabela no BigQuery (baseado no desafio)
-TABLE_SCHEMA = [
-    bigquery.SchemaField("marketplace", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("item_id", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("url", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("title", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("price", "NUMERIC", mode="REQUIRED"),
-    bigquery.SchemaField("original_price", "NUMERIC", mode="NULLABLE"),
-    bigquery.SchemaField("discount_percent", "FLOAT64", mode="NULLABLE"),
-    bigquery.SchemaField("seller", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("image_url", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("source", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("dedupe_key", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("execution_id", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("collected_at", "TIMESTAMP", mode="REQUIRED"),
-    bigquery.SchemaField("inserted_at", "TIMESTAMP", mode="REQUIRED"),
+# Schema da tabela no BigQuery (baseado no desafio): (coluna, tipo, modo).
+# google.cloud.bigquery (com pandas/bigquery_storage) leva centenas de ms para
+# importar, então é importado só no primeiro uso (ou no warm-up da API)
+TABLE_COLUMNS = [
+    ("marketplace", "STRING", "REQUIRED"),
+    ("item_id", "STRING", "REQUIRED"),
+    ("url", "STRING", "REQUIRED"),
+    ("title", "STRING", "REQUIRED"),
+    ("price", "NUMERIC", "REQUIRED"),
+    ("original_price", "NUMERIC", "NULLABLE"),
+    ("discount_percent", "FLOAT64", "NULLABLE"),
+    ("seller", "STRING", "NULLABLE"),
+    ("image_url", "STRING", "NULLABLE"),
+    ("source", "STRING", "REQUIRED"),
+    ("sources", "STRING", "REPEATED"),
+    ("product_cluster_id", "STRING", "NULLABLE"),
+    ("dedupe_key", "STRING", "REQUIRED"),
+    ("execution_id", "STRING", "REQUIRED"),
+    ("collected_at", "TIMESTAMP", "REQUIRED"),
+    ("inserted_at", "TIMESTAMP", "REQUIRED"),
 ]
 
 TABLE_NAME = "promotions"
 
+_client = None
+_client_lock = threading.Lock()
+
+# Tabelas com recomputação das estatísticas em andamento (uma thread por tabela)
+_reconciling: set[str] = set()
+_reconciling_lock = threading.Lock()
+
+
+def table_schema() -> list:
+    """SchemaFields da tabela."""
+    from google.cloud import bigquery
+
+    return [bigquery.SchemaField(name, field_type, mode=mode) for name, field_type, mode in TABLE_COLUMNS]
+
+
+def get_client():
+    """Cliente BigQuery compartilhado pelo processo, criado no primeiro uso.
+    Usa GOOGLE_APPLICATION_CREDENTIALS automaticamente; se a criação falhar, a
+    próxima chamada tenta de novo.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from google.cloud import bigquery
+
+            _client = bigquery.Client(project=settings.GCP_PROJECT_ID)
+        return _client
+
 
 class BigQueryService:
     """Serviço para persistência de dados no BigQuery.
@@ -47,8 +83,8 @@ class BigQueryService:
         self.dataset_id = settings.GCP_DATASET_ID
         self.table_id = f"{self.project_id}.{self.dataset_id}.{TABLE_NAME}"
 
-        # Inicializa cliente (usa GOOGLE_APPLICATION_CREDENTIALS automaticamente)
-        self.client = bigquery.Client(project=self.project_id)
+        # Cliente compartilhado (credenciais resolvidas uma vez por processo)
+        self.client = get_client()
 
         logger.info(f"[BIGQUERY] Conectado ao projeto: {self.project_id}")
         logger.info(f"[BIGQUERY] Dataset: {self.dataset_id}")
@@ -57,12 +93,15 @@ class BigQueryService:
     def ensure_table_exists(self) -> None:
         """Garante que a tabela existe. Se não existir, cria com o schema definido.
         """
+        from google.cloud import bigquery
+        from google.cloud.exceptions import NotFound
+
         try:
             self.client.get_table(self.table_id)
             logger.info(f"[BIGQUERY] Tabela {TABLE_NAME} já existe")
         except NotFound:
             logger.info(f"[BIGQUERY] Criando tabela {TABLE_NAME}...")
-            table = bigquery.Table(self.table_id, schema=TABLE_SCHEMA)
+            table = bigquery.Table(self.table_id, schema=table_schema())
             table = self.client.create_table(table)
             logger.info(f"[BIGQUERY] Tabela {TABLE_NAME} criada com sucesso!")
 
@@ -85,7 +124,10 @@ class BigQueryService:
         self.ensure_table_exists()
 
         # Busca dedupe_keys existentes
-        existing_keys = self._get_existing_dedupe_keys([p.dedupe_key for p in products])
+        with DEDUPE_QUERY_SECONDS.time(), tracer.span("bigquery.dedupe_query", kind=SPAN_KIND_CLIENT,
+                                                      keys=len(products)) as span:
+            existing_keys = self._get_existing_dedupe_keys([p.dedupe_key for p in products])
+            span.set_attribute("existing", len(existing_keys))
 
         # Filtra produtos novos (não duplicados)
         new_products = [p for p in products if p.dedupe_key not in existing_keys]
@@ -93,6 +135,7 @@ class BigQueryService:
 
         if duplicates > 0:
             logger.info(f"[BIGQUERY] {duplicates} produtos duplicados ignorados")
+            DUPLICATES_TOTAL.inc(duplicates, stage="bigquery")
 
         if not new_products:
             logger.info("[BIGQUERY] Todos os produtos já existem na tabela")
@@ -114,6 +157,8 @@ class BigQueryService:
                 "seller": p.seller,
                 "image_url": p.image_url,
                 "source": p.source,
+                "sources": p.sources or [],
+                "product_cluster_id": p.product_cluster_id,
                 "dedupe_key": p.dedupe_key,
                 "execution_id": p.execution_id,
                 "collected_at": p.collected_at.isoformat(),
@@ -122,25 +167,50 @@ class BigQueryService:
             rows_to_insert.append(row)
 
         # Usa LOAD JOB com arquivo NDJSON temporário (funciona no free tier!)
+        temp_file = None
         try:
             with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
                 for row in rows_to_insert:
                     f.write(json.dumps(row) + "\n")
                 temp_file = f.name
 
+            from google.cloud import bigquery
+
             job_config = bigquery.LoadJobConfig(
                 source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-                schema=TABLE_SCHEMA,
+                schema=table_schema(),
+                # Permite adicionar colunas novas (ex: sources) em tabelas já existentes
+                schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
             )
 
-            with open(temp_file, "rb") as source_file:
-                job = self.client.load_table_from_file(
-                    source_file,
-                    self.table_id,
-                    job_config=job_config,
-                )
-
-            job.result()  # Aguarda conclusão
+            load_started = time.perf_counter()
+            load_status = "error"
+            try:
+                with tracer.span("bigquery.load_job", kind=SPAN_KIND_CLIENT, rows=len(rows_to_insert),
+                                 bytes=os.path.getsize(temp_file)) as span:
+                    with open(temp_file, "rb") as source_file:
+                        job = self.client.load_table_from_file(
+                            source_file,
+                            self.table_id,
+                            job_config=job_config,
+                        )
+
+                    job.result()  # Aguarda conclusão
+                    span.set_attribute("job_id", job.job_id)
+                load_status = "ok"
+            finally:
+                LOAD_JOB_SECONDS.observe(time.perf_counter() - load_started, status=load_status)
+
+            # Invalida leituras em cache cuja janela inclui as linhas novas
+            invalidated = query_cache.invalidate_window(max(p.collected_at for p in new_products))
+            if invalidated:
+                logger.debug(f"[BIGQUERY] {invalidated} consultas em cache invalidadas")
+
+            # Atualiza as estatísticas incrementais (falha aqui não invalida o insert)
+            try:
+                TableStatsStore().apply_rows(self.table_id, rows_to_insert)
+            except Exception as e:
+                logger.warning(f"[BIGQUERY] Erro ao atualizar estatísticas incrementais: {e}")
 
             logger.info(f"[BIGQUERY] {len(new_products)} produtos inseridos com sucesso!")
             return {"inserted": len(new_products), "duplicates": duplicates, "errors": 0}
@@ -149,12 +219,19 @@ class BigQueryService:
             logger.error(f"[BIGQUERY] Erro na inserção: {e}")
             return {"inserted": 0, "duplicates": duplicates, "errors": 1}
 
+        finally:
+            # Chunks grandes em sequência não podem acumular arquivos no disco
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
+
         logger.info(f"[BIGQUERY] {len(new_products)} produtos inseridos com sucesso!")
         return {"inserted": len(new_products), "duplicates": duplicates, "errors": 0}
 
     def _get_existing_dedupe_keys(self, keys: list[str]) -> set:
         """Busca quais dedupe_keys já existem na tabela.
         """
+        from google.cloud.exceptions import NotFound
+
         if not keys:
             return set()
 
@@ -176,9 +253,19 @@ class BigQueryService:
             # Tabela não existe ainda
             return set()
 
+    def _run_read_query(self, query: str, page_size: int | None = None):
+        """Executa uma consulta de leitura, permitindo (ou não) o cache do BigQuery.
+        Retorna o iterador de linhas: as páginas são buscadas sob demanda.
+        """
+        from google.cloud import bigquery
+
+        job_config = bigquery.QueryJobConfig(use_query_cache=settings.BIGQUERY_USE_QUERY_CACHE)
+        return self.client.query(query, job_config=job_config).result(page_size=page_size)
+
     def get_recent_products(self, hours: int = 24, limit: int = 100) -> list[dict]:
         """Retorna produtos coletados nas últimas X horas.
         Útil para validação e relatórios.
+        Resultados ficam em cache (TTL/LRU) até expirar ou um insert afetar a janela.
         """
         query = f"""
             SELECT *
@@ -189,15 +276,79 @@ class BigQueryService:
         """
 
         try:
-            result = self.client.query(query).result()
-            return [dict(row) for row in result]
+            rows = query_cache.get_or_load(
+                ("get_recent_products", self.table_id, hours, limit),
+                lambda: [dict(row) for row in self._run_read_query(query)],
+                window_start=datetime.now(timezone.utc) - timedelta(hours=hours),
+            )
+            return list(rows)
         except Exception as e:
             logger.error(f"[BIGQUERY] Erro ao buscar produtos recentes: {e}")
             return []
 
-    def get_stats(self) -> dict:
+    def get_stats(self, exact: bool = False) -> dict:
         """Retorna estatísticas da tabela.
+        Por padrão lê os contadores incrementais (O(1)); contagens distintas são
+        estimadas por HyperLogLog. Com exact=True faz o scan completo (com cache).
+        A recomputação periódica roda em background; enquanto isso valem os
+        últimos contadores (na primeira leitura, sem contadores, o scan exato).
         """
+        if exact:
+            try:
+                stats = query_cache.get_or_load(("get_stats", self.table_id), self._compute_stats)
+                return dict(stats)
+            except Exception as e:
+                logger.error(f"[BIGQUERY] Erro ao buscar estatísticas: {e}")
+                return {}
+
+        try:
+            store = TableStatsStore()
+            if store.needs_reconcile(self.table_id):
+                self._reconcile_in_background()
+            stats = store.get(self.table_id)
+        except Exception as e:
+            logger.error(f"[BIGQUERY] Erro ao buscar estatísticas: {e}")
+            return {}
+        return stats if stats is not None else self.get_stats(exact=True)
+
+    def _reconcile_in_background(self) -> None:
+        """Dispara reconcile_stats numa thread, se ainda não houver uma para a tabela."""
+        with _reconciling_lock:
+            if self.table_id in _reconciling:
+                return
+            _reconciling.add(self.table_id)
+
+        def run():
+            try:
+                self.reconcile_stats()
+            except Exception as e:
+                logger.error(f"[BIGQUERY] Erro ao reconciliar estatísticas: {e}")
+            finally:
+                with _reconciling_lock:
+                    _reconciling.discard(self.table_id)
+
+        threading.Thread(target=run, name="stats-reconcile", daemon=True).start()
+
+    def reconcile_stats(self, store: TableStatsStore | None = None) -> None:
+        """Recomputa as estatísticas incrementais com um scan completo da tabela.
+        Executado em background na primeira leitura e a cada STATS_RECONCILE_HOURS.
+        """
+        store = store or TableStatsStore()
+        # Loads concluídos a partir daqui são reaplicados sobre o resultado do scan
+        store.begin_reconcile(self.table_id)
+        aggregates = self._compute_stats()
+        # Os ids distintos vão página a página para o HyperLogLog, sem materializar a lista
+        item_ids = (row.item_id for row in self._run_read_query(
+            f"SELECT DISTINCT item_id FROM `{self.table_id}`",
+            page_size=settings.STATS_RECONCILE_PAGE_SIZE,
+        ))
+        execution_ids = (row.execution_id for row in self._run_read_query(
+            f"SELECT DISTINCT execution_id FROM `{self.table_id}`",
+            page_size=settings.STATS_RECONCILE_PAGE_SIZE,
+        ))
+        store.replace(self.table_id, aggregates, item_ids, execution_ids)
+
+    def _compute_stats(self) -> dict:
         query = f"""
             SELECT 
                 COUNT(*) as total_products,
@@ -209,10 +360,4 @@ class BigQueryService:
                 COUNT(CASE WHEN discount_percent IS NOT NULL THEN 1 END) as products_on_sale
             FROM `{self.table_id}`
         """
-
-        try:
-            result = list(self.client.query(query).result())[0]
-            return dict(result)
-        except Exception as e:
-            logger.error(f"[BIGQUERY] Erro ao buscar estatísticas: {e}")
-            return {}
+        return dict(next(iter(self._run_read_query(query))))
@@ -0,0 +1,225 @@
+# app/services/bigquery_reader.py
+"""Leitura em streaming da tabela `promotions` via BigQuery Storage Read API.
+
+Diferente de `BigQueryService.get_recent_products`, nada é materializado em
+memória: as linhas chegam como record batches Arrow, com projeção de colunas e
+filtro aplicados no servidor. A paginação usa cursor (stream + offset), então
+exportar um dia inteiro mantém a memória constante.
+
+O cliente de leitura é injetável (`read_client`): `scripts/bigquery_reader_teste.py`
+exercita paginação e export contra um serviço de leitura falso em memória com a
+mesma interface (`create_read_session` / `read_rows`).
+"""
+import base64
+import binascii
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.bigquery import TABLE_COLUMNS, TABLE_NAME
+
+logger = get_logger(__name__)
+
+COLUMNS = [name for name, _, _ in TABLE_COLUMNS]
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado ou expirado."""
+
+
+def encode_cursor(stream_name: str, offset: int) -> str:
+    payload = json.dumps({"s": stream_name, "o": offset}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return payload["s"], int(payload["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Cursor inválido: {cursor}") from e
+
+
+def build_row_restriction(
+    hours: int | None = None,
+    source: str | None = None,
+    min_discount: float | None = None,
+    since: datetime | None = None,
+) -> str:
+    """Monta o filtro de linhas (SQL restrito da Storage Read API)."""
+    clauses = []
+    if hours is not None:
+        clauses.append(f"collected_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(hours)} HOUR)")
+    if since is not None:
+        clauses.append(f"collected_at >= TIMESTAMP '{since.isoformat()}'")
+    if source is not None:
+        escaped = source.replace("\\", "\\\\").replace("'", "\\'")
+        clauses.append(f"source = '{escaped}'")
+    if min_discount is not None:
+        clauses.append(f"discount_percent >= {float(min_discount)}")
+    return " AND ".join(clauses)
+
+
+class ProductReader:
+    """Leitor em streaming (Arrow) da tabela de promoções."""
+
+    def __init__(self, read_client=None):
+        if read_client is None:
+            from google.cloud import bigquery_storage
+            read_client = bigquery_storage.BigQueryReadClient()
+
+        self.client = read_client
+        self.project_id = settings.GCP_PROJECT_ID
+        self.table_path = (
+            f"projects/{settings.GCP_PROJECT_ID}/datasets/{settings.GCP_DATASET_ID}/tables/{TABLE_NAME}"
+        )
+
+    def open_stream(self, columns: list[str] | None = None, row_restriction: str = "") -> str | None:
+        """Cria uma sessão de leitura e retorna o nome do stream (None se não houver linhas)."""
+        from google.cloud.bigquery_storage import types
+
+        read_session = types.ReadSession(
+            table=self.table_path,
+            data_format=types.DataFormat.ARROW,
+            read_options=types.ReadSession.TableReadOptions(
+                selected_fields=columns or COLUMNS,
+                row_restriction=row_restriction,
+            ),
+        )
+        # Um único stream preserva a ordem necessária para a paginação por offset
+        session = self.client.create_read_session(
+            parent=f"projects/{self.project_id}",
+            read_session=read_session,
+            max_stream_count=1,
+        )
+        if not session.streams:
+            return None
+        return session.streams[0].name
+
+    def iter_batches(self, stream_name: str, offset: int = 0) -> Iterator:
+        """Itera record batches Arrow do stream a partir do offset."""
+        reader = self.client.read_rows(stream_name, offset=offset)
+        for page in reader.rows().pages:
+            yield page.to_arrow()
+
+    def read_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        columns: list[str] | None = None,
+        row_restriction: str = "",
+    ) -> tuple[list[dict], str | None]:
+        """Lê uma página de até `limit` linhas.
+
+        Args:
+            limit: Máximo de linhas da página
+            cursor: Cursor retornado pela página anterior (None = primeira página)
+            columns: Colunas projetadas (padrão: todas)
+            row_restriction: Filtro de linhas (usado apenas na primeira página)
+
+        Returns:
+            Tupla (linhas, próximo cursor ou None se acabou)
+
+        """
+        if cursor is None:
+            stream_name = self.open_stream(columns=columns, row_restriction=row_restriction)
+            offset = 0
+            if stream_name is None:
+                return [], None
+        else:
+            stream_name, offset = decode_cursor(cursor)
+
+        rows: list[dict] = []
+        for batch in self.iter_batches(stream_name, offset=offset):
+            remaining = limit - len(rows)
+            rows.extend(batch.slice(0, remaining).to_pylist())
+            if len(rows) >= limit:
+                # Se o stream terminar exatamente aqui, a próxima página virá vazia
+                return rows, encode_cursor(stream_name, offset + len(rows))
+
+        return rows, None
+
+    def iter_export(
+        self,
+        fmt: str,
+        columns: list[str] | None = None,
+        row_restriction: str = "",
+    ) -> Iterator[bytes]:
+        """Gera o export em chunks (ndjson ou parquet) sem materializar a tabela."""
+        stream_name = self.open_stream(columns=columns, row_restriction=row_restriction)
+        batches = self.iter_batches(stream_name) if stream_name else iter(())
+
+        if fmt == "ndjson":
+            for batch in batches:
+                yield "".join(json.dumps(row, default=str) + "\n" for row in batch.to_pylist()).encode()
+        elif fmt == "parquet":
+            yield from _iter_parquet(batches, columns or COLUMNS)
+        else:
+            raise ValueError(f"Formato de export não suportado: {fmt}")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Arquivo em memória que é esvaziado a cada chunk enviado ao cliente."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(columns: list[str]):
+    """Schema Arrow das colunas projetadas, nos tipos que o Storage Read API entrega."""
+    import pyarrow as pa
+
+    types = {
+        "STRING": pa.string(),
+        "NUMERIC": pa.decimal128(38, 9),
+        "FLOAT64": pa.float64(),
+        "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+    }
+    fields = {}
+    for name, field_type, mode in TABLE_COLUMNS:
+        arrow_type = types[field_type]
+        if mode == "REPEATED":
+            arrow_type = pa.list_(arrow_type)
+        fields[name] = pa.field(name, arrow_type, nullable=mode != "REQUIRED")
+    return pa.schema([fields[name] for name in columns])
+
+
+def _iter_parquet(batches: Iterator, columns: list[str]) -> Iterator[bytes]:
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema, compression="zstd")
+        writer.write_batch(batch)  # Um row group por batch
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    if writer is None:
+        # Sem linhas: ainda assim um arquivo Parquet válido (só schema, 0 row groups)
+        writer = pq.ParquetWriter(sink, _arrow_schema(columns), compression="zstd")
+    writer.close()
+    yield sink.drain()
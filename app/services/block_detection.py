@@ -0,0 +1,48 @@
+# app/services/block_detection.py
+"""Classificação de páginas de busca sem produtos.
+
+Uma página de captcha/desafio costuma vir com HTTP 200 e, para o extrator,
+parece uma busca vazia. O classificador diferencia:
+- ok: produtos extraídos
+- blocked: captcha, desafio anti-bot ou verificação de conta
+- empty: a busca realmente não tem resultados
+- layout_changed: página normal, mas os seletores não encontraram itens
+"""
+import re
+
+PAGE_OK = "ok"
+PAGE_BLOCKED = "blocked"
+PAGE_EMPTY = "empty"
+PAGE_LAYOUT_CHANGED = "layout_changed"
+
+BLOCK_MARKERS = re.compile(
+    r"captcha|challenge-form|cf-chl|account-verification|suspicious-traffic|"
+    r"access denied|acesso negado|verifique que você não é um robô|are you a robot",
+    re.IGNORECASE,
+)
+
+EMPTY_MARKERS = re.compile(
+    r"ui-search-rescue|não há anúncios que correspondam|nenhum resultado|"
+    r"verifique se a palavra foi digitada corretamente",
+    re.IGNORECASE,
+)
+
+
+class BlockedPageError(RuntimeError):
+    """O site respondeu com uma página de bloqueio (não deve ser repetida)."""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"Página bloqueada ({reason}): {url}")
+        self.url = url
+        self.reason = reason
+
+
+def classify_page(html: str, products_count: int, status_code: int = 200) -> str:
+    """Classifica a página a partir do HTML e da quantidade de produtos extraídos."""
+    if products_count > 0:
+        return PAGE_OK
+    if status_code == 403 or BLOCK_MARKERS.search(html):
+        return PAGE_BLOCKED
+    if EMPTY_MARKERS.search(html):
+        return PAGE_EMPTY
+    return PAGE_LAYOUT_CHANGED
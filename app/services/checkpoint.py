@@ -0,0 +1,157 @@
+# app/services/checkpoint.py
+"""Checkpoints de coleta para retomada de tasks interrompidas.
+
+Para cada execution_id persiste as páginas já coletadas (source, page) com os
+produtos extraídos. Ao retomar, o crawler pula as páginas já concluídas e, se a
+coleta inteira já terminou, apenas a persistência é refeita.
+"""
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import ProductSchema
+
+logger = get_logger(__name__)
+
+
+class CheckpointStore:
+    """Store durável (SQLite) de checkpoints por task/execution_id."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.CHECKPOINT_PATH or os.path.join(settings.DATA_DIR, "checkpoints.db")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_tasks (
+                    task_id TEXT PRIMARY KEY,
+                    execution_id TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    crawl_completed INTEGER NOT NULL DEFAULT 0,
+                    persisted INTEGER NOT NULL DEFAULT 0,
+                    failed_sources TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Checkpoints criados antes do registro das fontes com falha
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(checkpoint_tasks)")}
+            if "failed_sources" not in columns:
+                conn.execute("ALTER TABLE checkpoint_tasks ADD COLUMN failed_sources TEXT")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_pages (
+                    execution_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    products TEXT NOT NULL,
+                    PRIMARY KEY (execution_id, source, page)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save_task(self, task_id: str, execution_id: str, request: dict) -> None:
+        """Registra a task (e a requisição original) para permitir retomada."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_tasks (task_id, execution_id, request, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (task_id, execution_id, json.dumps(request), time.time()),
+            )
+        self.purge_expired()
+
+    def get_task(self, task_id: str) -> dict | None:
+        """Retorna o registro da task ou None se não houver checkpoint."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT execution_id, request, crawl_completed, persisted, failed_sources "
+                "FROM checkpoint_tasks WHERE task_id = ?",
+                (task_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        execution_id, request, crawl_completed, persisted, failed_sources = row
+        return {
+            "task_id": task_id,
+            "execution_id": execution_id,
+            "request": json.loads(request),
+            "crawl_completed": bool(crawl_completed),
+            "persisted": bool(persisted),
+            "failed_sources": json.loads(failed_sources) if failed_sources else {},
+        }
+
+    def mark_crawl_completed(self, task_id: str, failed_sources: dict[str, str | None] | None = None) -> None:
+        """Registra o fim da coleta. Com fontes que falharam (bloqueio, circuito
+        aberto), a coleta não conta como concluída: a retomada volta a coletá-las
+        (as páginas já gravadas das demais fontes são reaproveitadas).
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE checkpoint_tasks SET crawl_completed = ?, failed_sources = ?, updated_at = ? "
+                "WHERE task_id = ?",
+                (0 if failed_sources else 1, json.dumps(failed_sources or {}), time.time(), task_id),
+            )
+
+    def mark_persisted(self, task_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE checkpoint_tasks SET persisted = 1, updated_at = ? WHERE task_id = ?",
+                (time.time(), task_id),
+            )
+
+    def save_page(self, execution_id: str, source: str, page: int, products: list[ProductSchema]) -> None:
+        """Grava o cursor (source, page) concluído e seus produtos."""
+        payload = json.dumps([p.model_dump(mode="json") for p in products])
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_pages (execution_id, source, page, products) VALUES (?, ?, ?, ?)",
+                (execution_id, source, page, payload),
+            )
+
+    def load_page(self, execution_id: str, source: str, page: int) -> list[ProductSchema] | None:
+        """Retorna os produtos de uma página já concluída, ou None se ainda não foi coletada."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT products FROM checkpoint_pages WHERE execution_id = ? AND source = ? AND page = ?",
+                (execution_id, source, page),
+            ).fetchone()
+        if row is None:
+            return None
+        return [ProductSchema.model_validate(p) for p in json.loads(row[0])]
+
+    def load_results(self, execution_id: str, sources: list[str], limit_per_source: int) -> dict[str, list[ProductSchema]]:
+        """Reconstrói o resultado de fetch_from_sources a partir dos checkpoints."""
+        return dict(self.iter_results(execution_id, sources, limit_per_source))
+
+    def iter_results(
+        self, execution_id: str, sources: list[str], limit_per_source: int,
+    ) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Como load_results, mas gera (fonte, produtos) uma fonte por vez."""
+        with self._connect() as conn:
+            for source in sources:
+                products = []
+                for (payload,) in conn.execute(
+                    "SELECT products FROM checkpoint_pages WHERE execution_id = ? AND source = ? ORDER BY page",
+                    (execution_id, source),
+                ):
+                    products.extend(ProductSchema.model_validate(p) for p in json.loads(payload))
+                yield source, products[:limit_per_source]
+
+    def purge_expired(self) -> None:
+        """Remove checkpoints mais antigos que CHECKPOINT_TTL_HOURS."""
+        cutoff = time.time() - settings.CHECKPOINT_TTL_HOURS * 3600
+        with self._connect() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT execution_id FROM checkpoint_tasks WHERE updated_at < ?", (cutoff,),
+            )]
+            for execution_id in expired:
+                conn.execute("DELETE FROM checkpoint_pages WHERE execution_id = ?", (execution_id,))
+            conn.execute("DELETE FROM checkpoint_tasks WHERE updated_at < ?", (cutoff,))
+
+        if expired:
+            logger.info(f"[CHECKPOINT] {len(expired)} checkpoints expirados removidos")
@@ -0,0 +1,141 @@
+# app/services/circuit_breaker.py
+"""Circuit breaker por host, compartilhado entre tasks e processos.
+
+Estados:
+- closed: requisições normais; falhas consecutivas (páginas de bloqueio, 403/429,
+  5xx, erros de conexão) ao atingir BREAKER_FAILURE_THRESHOLD abrem o circuito
+- open: nenhuma requisição ao host até o fim da pausa (falha imediata)
+- half_open: uma única requisição de teste; sucesso fecha, falha reabre com a
+  pausa dobrada (até BREAKER_MAX_OPEN_SECONDS)
+
+O estado fica em SQLite local, então tasks da API e workers distribuídos na
+mesma máquina respeitam o mesmo circuito.
+"""
+import os
+import sqlite3
+import time
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Circuito do host aberto: a requisição não foi feita."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Circuito aberto para {host}, nova tentativa em {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Circuit breaker (closed/open/half-open) por host em SQLite."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.BREAKER_PATH or os.path.join(settings.DATA_DIR, "circuit_breaker.db")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS circuits (
+                    host TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    failures INTEGER NOT NULL,
+                    open_seconds REAL NOT NULL,
+                    opened_until REAL NOT NULL,
+                    last_reason TEXT
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _load(self, conn: sqlite3.Connection, host: str) -> tuple[str, int, float, float]:
+        row = conn.execute(
+            "SELECT state, failures, open_seconds, opened_until FROM circuits WHERE host = ?", (host,),
+        ).fetchone()
+        return row or (STATE_CLOSED, 0, float(settings.BREAKER_OPEN_SECONDS), 0.0)
+
+    def _save(self, conn, host, state, failures, open_seconds, opened_until, reason=None) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO circuits (host, state, failures, open_seconds, opened_until, last_reason) "
+            "VALUES (?, ?, ?, ?, ?, COALESCE(?, (SELECT last_reason FROM circuits WHERE host = ?)))",
+            (host, state, failures, open_seconds, opened_until, reason, host),
+        )
+
+    def before_request(self, host: str) -> None:
+        """Levanta CircuitOpenError se o host não deve receber requisições agora."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            state, failures, open_seconds, opened_until = self._load(conn, host)
+
+            if state == STATE_CLOSED:
+                conn.execute("COMMIT")
+                return
+
+            # Fim da pausa (ou sonda anterior sem resposta): esta requisição é a sonda
+            if now >= opened_until:
+                probe_deadline = now + settings.BREAKER_PROBE_TIMEOUT_SECONDS
+                self._save(conn, host, STATE_HALF_OPEN, failures, open_seconds, probe_deadline)
+                conn.execute("COMMIT")
+                logger.info(f"[CIRCUITO] {host}: half-open, enviando requisição de teste")
+                return
+
+            conn.execute("COMMIT")
+            raise CircuitOpenError(host, opened_until - now)
+
+    def record_success(self, host: str) -> None:
+        """Resposta válida: zera as falhas e fecha o circuito."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            state, failures, _, _ = self._load(conn, host)
+            if state != STATE_CLOSED or failures:
+                self._save(conn, host, STATE_CLOSED, 0, float(settings.BREAKER_OPEN_SECONDS), 0.0)
+                if state != STATE_CLOSED:
+                    logger.info(f"[CIRCUITO] {host}: fechado")
+            conn.execute("COMMIT")
+
+    def record_failure(self, host: str, reason: str) -> None:
+        """Registra uma falha; abre o circuito no limite ou se a sonda falhou."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            state, failures, open_seconds, opened_until = self._load(conn, host)
+            failures += 1
+
+            if state == STATE_HALF_OPEN:
+                # Sonda falhou: pausa maior
+                open_seconds = min(open_seconds * 2, settings.BREAKER_MAX_OPEN_SECONDS)
+                self._save(conn, host, STATE_OPEN, failures, open_seconds, now + open_seconds, reason)
+                logger.warning(f"[CIRCUITO] {host}: sonda falhou ({reason}), aberto por {open_seconds:.0f}s")
+            elif state == STATE_CLOSED and failures >= settings.BREAKER_FAILURE_THRESHOLD:
+                self._save(conn, host, STATE_OPEN, failures, open_seconds, now + open_seconds, reason)
+                logger.warning(f"[CIRCUITO] {host}: {failures} falhas seguidas ({reason}), aberto por {open_seconds:.0f}s")
+            else:
+                self._save(conn, host, state, failures, open_seconds, opened_until, reason)
+            conn.execute("COMMIT")
+
+    def snapshot(self) -> dict[str, dict]:
+        """Estado atual por host."""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT host, state, failures, opened_until, last_reason FROM circuits",
+            ).fetchall()
+        return {
+            host: {
+                "state": state,
+                "consecutive_failures": failures,
+                "retry_in_seconds": round(max(opened_until - now, 0.0), 1) if state == STATE_OPEN else 0.0,
+                "last_reason": reason,
+            }
+            for host, state, failures, opened_until, reason in rows
+        }
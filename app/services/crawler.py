@@ -1,25 +1,86 @@
-import re
+import contextvars
+import queue
+import threading
 import time
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import (
+    retry,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import (
+    BLOCKS_TOTAL,
+    FETCH_SECONDS,
+    ITEMS_TOTAL,
+    PAGES_TOTAL,
+    RETRIES_TOTAL,
+)
+from app.core.tracing import SPAN_KIND_CLIENT, tracer
 from app.schemas.product import ProductSchema
+from app.services.block_detection import (
+    PAGE_BLOCKED,
+    PAGE_LAYOUT_CHANGED,
+    BlockedPageError,
+)
+from app.services.checkpoint import CheckpointStore
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.egress import (
+    OUTCOME_BLOCKED,
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    Egress,
+    egress_pool,
+)
+from app.services.html_archive import HtmlArchive
+from app.services.http_transport import get_transport
+from app.services.known_items import KnownItemsIndex
+from app.services.marketplaces import (
+    MarketplaceAdapter,
+    adapter_for_url,
+    resolve_source,
+)
+from app.services.price_history import PriceHistoryService
+from app.services.throttle import THROTTLE_STATUS_CODES, parse_retry_after, throttle
 
 # Configuração de logs
 logger = get_logger(__name__)
 
-# Constantes
-ITEMS_PER_PAGE = 50  # ML mostra ~50 itens por página com _NoIndex_True
+
+def _throttle_key(host: str, egress: Egress | None) -> str:
+    """Cada saída tem sua própria taxa no host (o site limita por identidade)."""
+    return f"{host}@{egress.egress_id}" if egress is not None else host
+
+
+def _count_retry(retry_state) -> None:
+    """before_sleep do tenacity: conta a nova tentativa da página."""
+    url = retry_state.kwargs.get("url") or retry_state.args[1]
+    RETRIES_TOTAL.inc(marketplace=adapter_for_url(url).name)
+    error = retry_state.outcome.exception()
+    tracer.current_span().add_event(
+        "retry", attempt=retry_state.attempt_number, error=f"{type(error).__name__}: {error}", **{"url.full": url},
+    )
+
+
+def _retry_sleep(seconds: float) -> None:
+    """sleep do tenacity: a espera até a nova tentativa aparece como span crawl.retry."""
+    with tracer.span("crawl.retry", wait_seconds=round(seconds, 3)):
+        time.sleep(seconds)
 
 class CrawlerService:
-    """Serviço de coleta de produtos do Mercado Livre via web scraping.
-    Usa requests + BeautifulSoup para extrair dados da página de busca.
+    """Serviço de coleta de produtos via web scraping.
+    Motor de busca de páginas compartilhado (retry, throttle, circuit breaker,
+    pool de saídas); URLs, paginação e extração vêm do adaptador do marketplace
+    de cada fonte (Mercado Livre por padrão).
     Suporta paginação dinâmica e múltiplas fontes de busca.
     """
 
@@ -30,24 +91,46 @@ class CrawlerService:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
         }
-        self.base_url = "https://lista.mercadolivre.com.br"
 
         # Gera um execution_id único por instância do serviço
         self.execution_id = str(uuid.uuid4())[:8]
 
+        # Delay pedido pelo chamador; com THROTTLE_ENABLED só define a taxa inicial do host
+        self.request_delay: float | None = None
+
         # Estatísticas da coleta
         self.stats = {
             "total_collected": 0,
             "pages_fetched": 0,
             "sources_processed": 0,
+            "items_unchanged": 0,
+            "early_stops": 0,
+            "blocked_pages": 0,
+            "layout_changes": 0,
+            "circuit_open_skips": 0,
         }
 
+        # HTTP/1.1 (requests) ou HTTP/2 multiplexado, compartilhado pelo processo
+        self.transport = get_transport()
+
+        # Circuit breaker por host, compartilhado com outras tasks/processos
+        self.circuit_breaker = CircuitBreaker() if settings.BREAKER_ENABLED else None
+        # HTML bruto das páginas para re-extração sem novas requisições
+        self.html_archive = HtmlArchive() if settings.HTML_ARCHIVE_ENABLED else None
+        # fonte -> motivo das fontes interrompidas por bloqueio ou circuito aberto
+        self.failed_sources: dict[str, str] = {}
+        # Histórico de preços (modo incremental: renova last_seen_at dos itens inalterados)
+        self.price_history: PriceHistoryService | None = None
+
     def fetch_from_sources(
         self,
         sources: list[str],
         limit_per_source: int = 100,
         max_pages_per_source: int = 3,
         delay_between_requests: float = 1.0,
+        checkpoint: CheckpointStore | None = None,
+        known_items: KnownItemsIndex | None = None,
+        unchanged_stop_ratio: float | None = None,
     ) -> dict[str, list[ProductSchema]]:
         """Coleta produtos de múltiplas fontes (queries de busca).
         
@@ -56,15 +139,79 @@ class CrawlerService:
             limit_per_source: Limite de produtos por fonte
             max_pages_per_source: Máximo de páginas a coletar por fonte
             delay_between_requests: Delay entre requisições (rate limit)
+            checkpoint: Store de checkpoints (pula páginas já coletadas neste execution_id)
+            known_items: Índice de itens conhecidos (ativa o modo incremental)
+            unchanged_stop_ratio: Fração de itens inalterados na página que encerra a paginação
             
         Returns:
             Dict com fonte -> lista de produtos
 
+        """
+        return dict(self.iter_sources(
+            sources=sources,
+            limit_per_source=limit_per_source,
+            max_pages_per_source=max_pages_per_source,
+            delay_between_requests=delay_between_requests,
+            checkpoint=checkpoint,
+            known_items=known_items,
+            unchanged_stop_ratio=unchanged_stop_ratio,
+        ))
+
+    def iter_sources(
+        self,
+        sources: list[str],
+        limit_per_source: int = 100,
+        max_pages_per_source: int = 3,
+        delay_between_requests: float = 1.0,
+        checkpoint: CheckpointStore | None = None,
+        known_items: KnownItemsIndex | None = None,
+        unchanged_stop_ratio: float | None = None,
+    ) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Versão em streaming de fetch_from_sources: gera (fonte, produtos) à medida
+        que cada fonte termina, sem reter as fontes anteriores em memória.
+
+        Fontes de marketplaces diferentes (prefixo `marketplace:`) são coletadas em
+        paralelo, uma thread por marketplace, cada uma dentro do próprio orçamento
+        de taxa e concorrência; as fontes de um mesmo marketplace seguem em sequência.
         """
         logger.info(f"[COLETA] Iniciando coleta de {len(sources)} fontes | execution_id: {self.execution_id}")
 
-        results = {}
+        groups: dict[str, list[str]] = {}
+        for source in sources:
+            groups.setdefault(resolve_source(source)[0].name, []).append(source)
+
+        options = {
+            "limit_per_source": limit_per_source,
+            "max_pages_per_source": max_pages_per_source,
+            "delay_between_requests": delay_between_requests,
+            "checkpoint": checkpoint,
+            "known_items": known_items,
+            "unchanged_stop_ratio": unchanged_stop_ratio,
+        }
+        if len(groups) > 1:
+            logger.info(f"[COLETA] {len(groups)} marketplaces em paralelo: {', '.join(groups)}")
+            results = self._iter_parallel(list(groups.values()), **options)
+        else:
+            results = self._iter_group(sources, **options)
+
+        total = 0
+        for source, products in results:
+            total += len(products)
+            yield source, products
 
+        logger.info(f"[COLETA] Coleta finalizada: {total} produtos de {len(sources)} fontes")
+
+    def _iter_group(
+        self,
+        sources: list[str],
+        limit_per_source: int,
+        max_pages_per_source: int,
+        delay_between_requests: float,
+        checkpoint: CheckpointStore | None,
+        known_items: KnownItemsIndex | None,
+        unchanged_stop_ratio: float | None,
+    ) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Coleta as fontes em sequência."""
         for i, source in enumerate(sources, 1):
             logger.info(f"[COLETA] Fonte {i}/{len(sources)}: '{source}'")
 
@@ -73,20 +220,64 @@ class CrawlerService:
                 limit=limit_per_source,
                 max_pages=max_pages_per_source,
                 delay_between_pages=delay_between_requests,
+                checkpoint=checkpoint,
+                known_items=known_items,
+                unchanged_stop_ratio=unchanged_stop_ratio,
             )
 
-            results[source] = products
             self.stats["sources_processed"] += 1
+            yield source, products
 
-            # Delay entre fontes (exceto na última)
-            if i < len(sources):
+            # Delay entre fontes (exceto na última; o controle adaptativo já espaça as requisições)
+            if i < len(sources) and not settings.THROTTLE_ENABLED:
                 logger.debug(f"[COLETA] Aguardando {delay_between_requests}s antes da próxima fonte...")
                 time.sleep(delay_between_requests)
 
-        total = sum(len(p) for p in results.values())
-        logger.info(f"[COLETA] Coleta finalizada: {total} produtos de {len(sources)} fontes")
+    def _iter_parallel(self, groups: list[list[str]], **options) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Uma thread por grupo (marketplace); os resultados saem na ordem em que
+        as fontes terminam. A fila é limitada, então no máximo uma fonte por
+        marketplace fica retida esperando o consumidor.
+        """
+        results: queue.Queue = queue.Queue(maxsize=len(groups))
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=1.0)
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-        return results
+        def run(group: list[str]) -> None:
+            try:
+                for item in self._iter_group(group, **options):
+                    if not put(item):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="marketplace") as pool:
+            for group in groups:
+                # Cada thread herda o contexto (span corrente) de quem iniciou a coleta
+                pool.submit(contextvars.copy_context().run, run, group)
+            pending = len(groups)
+            try:
+                while pending:
+                    item = results.get()
+                    if item is done:
+                        pending -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                # Consumidor interrompido (ou erro): as threads param na próxima fonte
+                stop.set()
 
     def fetch_products_paginated(
         self,
@@ -94,15 +285,25 @@ class CrawlerService:
         limit: int = 100,
         max_pages: int = 3,
         delay_between_pages: float = 1.0,
+        checkpoint: CheckpointStore | None = None,
+        known_items: KnownItemsIndex | None = None,
+        unchanged_stop_ratio: float | None = None,
     ) -> list[ProductSchema]:
         """Coleta produtos com paginação dinâmica.
         Para automaticamente quando não há mais produtos ou atinge o limite.
         
+        No modo incremental (known_items informado), só emite itens novos ou com
+        preço alterado e para de paginar quando a fração de itens inalterados da
+        página atinge unchanged_stop_ratio.
+        
         Args:
             query: Termo de busca
             limit: Quantidade máxima de produtos a retornar
             max_pages: Número máximo de páginas a coletar
             delay_between_pages: Delay em segundos entre requisições
+            checkpoint: Store de checkpoints (pula páginas já coletadas neste execution_id)
+            known_items: Índice de itens conhecidos (ativa o modo incremental)
+            unchanged_stop_ratio: Fração de itens inalterados na página que encerra a paginação
             
         Returns:
             Lista de ProductSchema com os produtos encontrados
@@ -110,67 +311,267 @@ class CrawlerService:
         """
         logger.info(f"[COLETA] Busca paginada: '{query}' (limite: {limit}, max_pages: {max_pages})")
 
-        all_products = []
-        query_slug = query.replace(" ", "-")
-
-        for page in range(1, max_pages + 1):
-            # Monta URL com paginação
-            # ML usa _Desde_XX onde XX = (page-1) * 50 + 1 para páginas > 1
-            if page == 1:
-                search_url = f"{self.base_url}/{query_slug}_NoIndex_True"
-            else:
-                offset = (page - 1) * ITEMS_PER_PAGE + 1
-                search_url = f"{self.base_url}/{query_slug}_Desde_{offset}_NoIndex_True"
-
-            try:
-                products = self._fetch_page(search_url, source_query=query)
-
-                if not products:
-                    logger.info(f"[COLETA] Página {page} sem produtos, encerrando paginação para '{query}'")
+        with tracer.span("crawl.source", source=query) as source_span:
+            self.request_delay = delay_between_pages
+            adapter, search_query = resolve_source(query)
+            source_span.set_attribute("marketplace", adapter.name)
+            all_products = []
+            seen = 0  # Itens vistos (emitidos ou não), contam para o limite
+            if unchanged_stop_ratio is None:
+                unchanged_stop_ratio = settings.INCREMENTAL_STOP_RATIO
+
+            page = 0
+            for page in range(1, max_pages + 1):
+                search_url = adapter.search_url(search_query, page)
+
+                try:
+                    cached = checkpoint.load_page(self.execution_id, query, page) if checkpoint else None
+                    if cached is not None:
+                        logger.info(f"[COLETA] Página {page} de '{query}' recuperada do checkpoint")
+                        products = cached
+                    else:
+                        products = self._fetch_page(search_url, source_query=query, adapter=adapter, page=page)
+                        if checkpoint:
+                            checkpoint.save_page(self.execution_id, query, page, products)
+
+                    if not products:
+                        logger.info(f"[COLETA] Página {page} sem produtos, encerrando paginação para '{query}'")
+                        break
+
+                    page_products = products[:limit - seen]
+                    unchanged_ratio = 0.0
+                    if known_items is not None:
+                        known = known_items.get_prices(query, [p.item_id for p in page_products])
+                        emitted = [p for p in page_products if known.get(p.item_id) != float(p.price)]
+                        unchanged_ratio = 1 - len(emitted) / len(page_products)
+                        self.stats["items_unchanged"] += len(page_products) - len(emitted)
+                        if len(emitted) < len(page_products):
+                            self.price_history = self.price_history or PriceHistoryService()
+                            self.price_history.touch([p for p in page_products if known.get(p.item_id) == float(p.price)])
+                        page_products = emitted
+
+                    all_products.extend(page_products)
+                    seen += len(products)
+                    self.stats["pages_fetched"] += 1
+                    self.stats["total_collected"] += len(page_products)
+
+                    logger.info(f"[COLETA] Página {page}: {len(page_products)} produtos (total acumulado: {len(all_products)})")
+
+                    # Para se atingiu o limite
+                    if seen >= limit:
+                        logger.info(f"[COLETA] Limite atingido ({limit}), parando paginação")
+                        break
+
+                    # Para se a página veio com menos produtos que o esperado (última página)
+                    if adapter.is_last_page(len(products)):
+                        logger.info("[COLETA] Página parcial detectada, provavelmente última página")
+                        break
+
+                    # Modo incremental: página majoritariamente conhecida, o restante também deve ser
+                    if known_items is not None and unchanged_ratio >= unchanged_stop_ratio:
+                        logger.info(f"[COLETA] {unchanged_ratio:.0%} da página {page} inalterada, parando paginação")
+                        self.stats["early_stops"] += 1
+                        break
+
+                    # Rate limit entre páginas (desnecessário se a página veio do checkpoint
+                    # ou se o controle adaptativo já espaça as requisições)
+                    if page < max_pages and cached is None and not settings.THROTTLE_ENABLED:
+                        time.sleep(delay_between_pages)
+
+                except CircuitOpenError as e:
+                    # Falha imediata: nenhuma requisição feita enquanto o host está bloqueando
+                    logger.warning(f"[COLETA] {e}, pulando '{query}'")
+                    self.stats["circuit_open_skips"] += 1
+                    self.failed_sources[query] = str(e)
                     break
 
-                all_products.extend(products)
-                self.stats["pages_fetched"] += 1
-                self.stats["total_collected"] += len(products)
-
-                logger.info(f"[COLETA] Página {page}: {len(products)} produtos (total acumulado: {len(all_products)})")
-
-                # Para se atingiu o limite
-                if len(all_products) >= limit:
-                    logger.info(f"[COLETA] Limite atingido ({limit}), parando paginação")
+                except BlockedPageError as e:
+                    logger.error(f"[COLETA] {e}, encerrando paginação para '{query}'")
+                    self.failed_sources[query] = str(e)
                     break
 
-                # Para se a página veio com menos produtos que o esperado (última página)
-                if len(products) < ITEMS_PER_PAGE * 0.5:  # Menos de 50% da capacidade
-                    logger.info("[COLETA] Página parcial detectada, provavelmente última página")
+                except requests.RequestException as e:
+                    logger.error(f"[COLETA] Erro na página {page}: {e}")
                     break
 
-                # Rate limit entre páginas
-                if page < max_pages:
-                    time.sleep(delay_between_pages)
-
-            except requests.RequestException as e:
-                logger.error(f"[COLETA] Erro na página {page}: {e}")
-                break
-
-        return all_products[:limit]
+            source_span.set_attributes(
+                pages=page, items=min(len(all_products), limit), failure=self.failed_sources.get(query),
+            )
+            return all_products[:limit]
 
     @retry(
         stop=stop_after_attempt(settings.MAX_RETRIES),
         wait=wait_exponential(min=settings.RETRY_MIN_SECONDS, max=settings.RETRY_MAX_SECONDS),
+        # Repetir uma página de bloqueio (ou com o circuito aberto) só aprofunda o bloqueio
+        retry=retry_if_not_exception_type((BlockedPageError, CircuitOpenError)),
+        before_sleep=_count_retry,
+        sleep=_retry_sleep,
         reraise=True,
     )
-    def _fetch_page(self, url: str, source_query: str) -> list[ProductSchema]:
-        """Faz requisição para uma página específica e extrai os produtos.
+    def _fetch_page(
+        self, url: str, source_query: str, adapter: MarketplaceAdapter | None = None, page: int = 1,
+    ) -> list[ProductSchema]:
+        """Faz requisição para uma página específica e extrai os produtos com o
+        adaptador do marketplace (pelo host da URL, se não informado).
         Implementa retry automático em caso de falha.
+        Páginas sem produtos são classificadas (bloqueio, busca vazia ou layout
+        alterado); bloqueios e erros alimentam o circuit breaker do host e a
+        pontuação da saída (proxy/user-agent) usada. Com HTML_ARCHIVE_ENABLED o
+        HTML das páginas válidas (inclusive sem itens reconhecidos) é arquivado.
         """
-        logger.debug(f"[COLETA] Requisição para: {url}")
-        response = requests.get(url, headers=self.headers, timeout=15)
-        response.raise_for_status()
-        return self._extract_from_html(response.text, source_query=source_query)
+        with tracer.span("crawl.fetch", **{"url.full": url, "page": page, "source": source_query}) as span:
+            adapter = adapter or adapter_for_url(url)
+            host = urlparse(url).netloc
+            span.set_attribute("marketplace", adapter.name)
+            egress = None
+            try:
+                if self.circuit_breaker:
+                    self.circuit_breaker.before_request(host)
+                if egress_pool.enabled:
+                    egress = egress_pool.acquire(wait_for=lambda e: throttle.wait_time(_throttle_key(host, e)))
+                    span.set_attribute("egress", egress.egress_id)
+            except CircuitOpenError:
+                BLOCKS_TOTAL.inc(marketplace=adapter.name, reason="circuit_open")
+                raise
+            outcome = OUTCOME_ERROR
+            page_status = "error"
+            latency = None
+
+            logger.debug(f"[COLETA] Requisição para: {url}")
+            try:
+                try:
+                    response = self._get(url, egress=egress, adapter=adapter)
+                except requests.RequestException as e:
+                    self._record_failure(host, type(e).__name__)
+                    raise
+
+                if response.status_code == 429 or response.status_code >= 500:
+                    self._record_failure(host, f"HTTP {response.status_code}")
+                if response.status_code != 403:
+                    response.raise_for_status()
+
+                products = []
+                if response.ok:
+                    with tracer.span("crawl.parse", marketplace=adapter.name, bytes=len(response.content)) as parse_span:
+                        products = adapter.extract(
+                            response.text,
+                            source_query=source_query,
+                            execution_id=self.execution_id,
+                            collected_at=datetime.now(timezone.utc),
+                        )
+                        parse_span.set_attribute("items", len(products))
+                page_class = adapter.classify_page(response.text, len(products), response.status_code)
+
+                page_status = page_class
+                span.set_attributes(**{
+                    "http.response.status_code": response.status_code,
+                    "http.response.body.size": len(response.content),
+                    "items": len(products),
+                    "page.class": page_class,
+                })
+                if page_class == PAGE_BLOCKED:
+                    outcome = OUTCOME_BLOCKED
+                    self.stats["blocked_pages"] += 1
+                    self._record_failure(host, "página de bloqueio")
+                    BLOCKS_TOTAL.inc(marketplace=adapter.name, reason="http_403" if response.status_code == 403 else "captcha")
+                    raise BlockedPageError(url, f"HTTP {response.status_code}" if response.status_code == 403 else "captcha/desafio")
+
+                outcome = OUTCOME_OK
+                ITEMS_TOTAL.inc(len(products), marketplace=adapter.name, source=source_query)
+                latency = response.elapsed.total_seconds() if response.elapsed else None
+                if self.html_archive and response.ok:
+                    self._archive_page(url, source_query, page, adapter, response.text)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_success(host)
+                if page_class == PAGE_LAYOUT_CHANGED:
+                    self.stats["layout_changes"] += 1
+                    logger.error(f"[COLETA] Nenhum item reconhecido em {url}: possível mudança de layout")
+                return products
+            finally:
+                PAGES_TOTAL.inc(marketplace=adapter.name, status=page_status)
+                if egress is not None:
+                    egress_pool.release(egress, outcome, latency)
+
+    def _archive_page(self, url: str, source: str, page: int, adapter: MarketplaceAdapter, html: str) -> None:
+        # Falha no arquivo não deve perder a página já extraída
+        try:
+            self.html_archive.put(self.execution_id, source, page, url, adapter.name, html)
+        except Exception as e:
+            logger.warning(f"[COLETA] Falha ao arquivar HTML de {url}: {e}")
+
+    def _record_failure(self, host: str, reason: str) -> None:
+        if self.circuit_breaker:
+            self.circuit_breaker.record_failure(host, reason)
+
+    def _get(self, url: str, egress: Egress | None = None, adapter: MarketplaceAdapter | None = None) -> requests.Response:
+        """GET pela saída escolhida, dentro do orçamento do marketplace (requisições
+        simultâneas e teto de taxa) e do controle adaptativo (AIMD + Retry-After)
+        do par (host, saída).
+        """
+        adapter = adapter or adapter_for_url(url)
+        with adapter.slots:
+            return self._throttled_get(url, egress, adapter)
+
+    def _throttled_get(self, url: str, egress: Egress | None, adapter: MarketplaceAdapter) -> requests.Response:
+        headers = self.headers
+        proxies = None
+        if egress is not None:
+            headers = {**self.headers, "User-Agent": egress.user_agent}
+            proxies = egress.proxies
+
+        if not settings.THROTTLE_ENABLED:
+            return self._request(url, headers, proxies, adapter)
+
+        key = _throttle_key(urlparse(url).netloc, egress)
+        throttle.acquire(
+            key,
+            initial_rate=1.0 / self.request_delay if self.request_delay else None,
+            max_rate=adapter.max_rate,
+        )
+        started = time.monotonic()
+        status_code = None
+        retry_after = None
+        timed_out = False
+        try:
+            response = self._request(url, headers, proxies, adapter)
+            status_code = response.status_code
+            if status_code in THROTTLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return response
+        except requests.Timeout:
+            timed_out = True
+            raise
+        finally:
+            throttle.release(
+                key,
+                latency=time.monotonic() - started,
+                status_code=status_code,
+                timeout=timed_out,
+                retry_after=retry_after,
+            )
+
+    def _request(
+        self, url: str, headers: dict, proxies: dict | None, adapter: MarketplaceAdapter,
+    ) -> requests.Response:
+        """Requisição HTTP em si, medida em crawler_fetch_seconds e no span http.get
+        (o span crawl.fetch inclui também as esperas de throttle e de slots).
+        """
+        started = time.perf_counter()
+        status = "error"
+        with tracer.span("http.get", kind=SPAN_KIND_CLIENT, **{"url.full": url}) as span:
+            try:
+                response = self.transport.get(url, headers=headers, proxies=proxies, timeout=15)
+                status = f"{response.status_code // 100}xx"
+                span.set_attributes(**{
+                    "http.response.status_code": response.status_code,
+                    "http.response.body.size": len(response.content),
+                })
+                return response
+            finally:
+                FETCH_SECONDS.observe(time.perf_counter() - started, marketplace=adapter.name, status=status)
 
     def fetch_products(self, query: str, limit: int = 50) -> list[ProductSchema]:
-        """Coleta produtos do Mercado Livre (sem paginação - apenas primeira página).
+        """Coleta produtos (sem paginação - apenas primeira página).
         Mantido para compatibilidade com código existente.
         
         Args:
@@ -183,124 +584,13 @@ class CrawlerService:
         """
         return self.fetch_products_paginated(query=query, limit=limit, max_pages=1)
 
-    def _extract_from_html(self, html_content: str, source_query: str) -> list[ProductSchema]:
-        """Extrai produtos do HTML da página de busca do Mercado Livre.
-        
-        Args:
-            html_content: HTML bruto da página
-            source_query: Query de busca que gerou essa página
-            
-        Returns:
-            Lista de ProductSchema extraídos e normalizados
-
-        """
-        products = []
-        soup = BeautifulSoup(html_content, "html.parser")
-        collected_at = datetime.now(timezone.utc)
-
-        # Seletores comuns do ML (eles mudam as vezes, por isso mantemos vários padrões)
-        items = soup.find_all("li", {"class": "ui-search-layout__item"})
-
-        # Se não encontrou, tenta outros seletores
-        if not items:
-            items = soup.find_all("div", {"class": "ui-search-result__wrapper"})
-        if not items:
-            items = soup.select(".ui-search-layout__item, .andes-card")
-
-        logger.info(f"Encontrados {len(items)} itens no HTML")
-
-        for item in items:
-            try:
-                # Extração resiliente de cada campo
-
-                # Título - novo seletor: a.poly-component__title ou h3 > a
-                title_tag = item.find("a", {"class": "poly-component__title"})
-                if not title_tag:
-                    title_tag = item.find("h2", {"class": "ui-search-item__title"})
-                if not title_tag:
-                    h3 = item.find("h3")
-                    if h3:
-                        title_tag = h3.find("a")
-                if not title_tag:
-                    continue
-
-                title = title_tag.text.strip()
-                url = title_tag.get("href", "")
-
-                # Tenta extrair ID da URL (ex: MLB-12345 ou MLB12345 ou p/MLB12345)
-                item_id = None
-                id_match = re.search(r"MLB-?(\d+)", url)
-                if id_match:
-                    item_id = f"MLB{id_match.group(1)}"
-                else:
-                    # Se não encontrou ID, pula o item (obrigatório para dedupe)
-                    logger.debug(f"Item sem ID válido, pulando: {title[:50]}")
-                    continue
-
-                # Preço - busca dentro de poly-price__current
-                price = 0.0
-                price_container = item.find("div", {"class": "poly-price__current"})
-                if price_container:
-                    price_tag = price_container.find("span", {"class": "andes-money-amount__fraction"})
-                    if price_tag:
-                        price_text = price_tag.text.replace(".", "").replace(",", ".")
-                        price = float(price_text) if price_text else 0.0
-
-                # Preço original (desconto) - busca s.andes-money-amount ou poly-price__original
-                original_price = None
-                original_container = item.find("s", {"class": "andes-money-amount"})
-                if not original_container:
-                    original_container = item.find("div", {"class": "poly-price__original"})
-                if original_container:
-                    op_fraction = original_container.find("span", {"class": "andes-money-amount__fraction"})
-                    if op_fraction:
-                        original_price = float(op_fraction.text.replace(".", "").replace(",", "."))
-
-                # Calcula percentual de desconto
-                discount_percent = None
-                if original_price and original_price > price:
-                    discount_percent = round(((original_price - price) / original_price) * 100, 2)
-
-                # Imagem - busca img.poly-component__picture
-                img_tag = item.find("img", {"class": "poly-component__picture"})
-                if not img_tag:
-                    img_tag = item.find("img")
-                image_url = img_tag.get("data-src") or img_tag.get("src") if img_tag else None
-
-                # Gera dedupe_key: combinação única de marketplace + item_id + price
-                dedupe_key = f"mercado_livre_{item_id}_{price}"
-
-                # Cria o objeto normalizado usando o Schema
-                product = ProductSchema(
-                    marketplace="mercado_livre",
-                    item_id=item_id,
-                    url=url,
-                    title=title,
-                    price=price,
-                    original_price=original_price,
-                    discount_percent=discount_percent,
-                    seller=None,  # Difícil pegar na listagem sem entrar no item
-                    image_url=image_url,
-                    source=source_query,
-                    dedupe_key=dedupe_key,
-                    execution_id=self.execution_id,
-                    collected_at=collected_at,
-                    currency="BRL",
-                )
-                products.append(product)
-
-            except Exception as e:
-                logger.debug(f"Erro ao extrair item: {e}")
-                continue
-
-        return products
-
     def fetch_from_url(self, url: str, source_name: str = "custom") -> list[ProductSchema]:
-        """Coleta produtos de uma URL específica do Mercado Livre.
+        """Coleta produtos de uma URL específica de um marketplace suportado.
         Útil para coletar de páginas de ofertas, categorias específicas, etc.
+        O adaptador é escolhido pelo host da URL.
         
         Args:
-            url: URL completa da página do ML
+            url: URL completa da página (ex: listagem do ML)
             source_name: Nome identificador da fonte
             
         Returns:
@@ -310,13 +600,10 @@ class CrawlerService:
         logger.info(f"[COLETA] Coletando de URL direta: {url}")
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-
-            products = self._extract_from_html(response.text, source_query=source_name)
+            products = self._fetch_page(url, source_query=source_name)
             logger.info(f"[COLETA] {len(products)} produtos extraídos de {source_name}")
             return products
 
-        except requests.RequestException as e:
+        except (requests.RequestException, BlockedPageError, CircuitOpenError) as e:
             logger.error(f"[COLETA] Erro ao coletar de {url}: {e}")
             return []
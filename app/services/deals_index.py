@@ -0,0 +1,170 @@
+# app/services/deals_index.py
+"""Índice em memória das melhores ofertas, alimentado a cada coleta concluída.
+
+Responde consultas de dashboard em milissegundos sem ir ao BigQuery, que
+continua sendo o sistema de registro:
+- top-K por discount_percent (heap por fonte, percorrida sem destruir)
+- faixa de preço (lista ordenada + bisect)
+- lookup por item_id (dict)
+
+O tamanho é limitado (DEALS_INDEX_MAX_ITEMS) e itens mais antigos que
+DEALS_INDEX_MAX_AGE_HOURS são removidos.
+"""
+import heapq
+import itertools
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.schemas.product import ProductSchema
+
+
+def _price_key(entry: tuple[float, str]) -> float:
+    return entry[0]
+
+
+class DealsIndex:
+    """Índice thread-safe (as coletas rodam em threads de background)."""
+
+    def __init__(self, max_items: int | None = None, max_age_seconds: float | None = None):
+        self.max_items = max_items or settings.DEALS_INDEX_MAX_ITEMS
+        self.max_age_seconds = max_age_seconds or settings.DEALS_INDEX_MAX_AGE_HOURS * 3600
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # item_id -> (versão, timestamp de entrada, produto)
+        self._items: dict[str, tuple[int, float, ProductSchema]] = {}
+        # fonte -> heap de (-desconto, versão, item_id); entradas antigas são ignoradas (lazy delete)
+        self._heaps: dict[str, list[tuple[float, int, str]]] = {}
+        self._source_counts: dict[str, int] = {}
+        self._prices: list[tuple[float, str]] = []
+        self._by_age: deque[tuple[float, int, str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, products: list[ProductSchema]) -> None:
+        """Indexa os produtos de uma coleta (substitui versões anteriores do mesmo item_id)."""
+        now = time.time()
+        with self._lock:
+            for product in products:
+                self._remove(product.item_id)
+
+                version = next(self._seq)
+                self._items[product.item_id] = (version, now, product)
+                self._source_counts[product.source] = self._source_counts.get(product.source, 0) + 1
+                heap = self._heaps.setdefault(product.source, [])
+                heapq.heappush(heap, (-(product.discount_percent or 0.0), version, product.item_id))
+                insort(self._prices, (float(product.price), product.item_id))
+                self._by_age.append((now, version, product.item_id))
+
+            self._evict(now)
+
+    def get(self, item_id: str) -> ProductSchema | None:
+        with self._lock:
+            self._evict(time.time())
+            entry = self._items.get(item_id)
+            return entry[2] if entry else None
+
+    def top_deals(
+        self,
+        k: int = 50,
+        source: str | None = None,
+        min_discount: float | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> list[ProductSchema]:
+        """Top-K por desconto, com filtros opcionais."""
+        with self._lock:
+            self._evict(time.time())
+            results = []
+            for neg_discount, product in self._iter_by_discount(source):
+                if min_discount is not None and -neg_discount < min_discount:
+                    break  # Ordenado por desconto: nada mais passa no filtro
+                if min_price is not None and product.price < min_price:
+                    continue
+                if max_price is not None and product.price > max_price:
+                    continue
+                results.append(product)
+                if len(results) >= k:
+                    break
+            return results
+
+    def price_range(
+        self,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        source: str | None = None,
+        limit: int = 50,
+    ) -> list[ProductSchema]:
+        """Produtos na faixa de preço, do mais barato para o mais caro."""
+        with self._lock:
+            self._evict(time.time())
+            lo = bisect_left(self._prices, min_price, key=_price_key) if min_price is not None else 0
+            hi = bisect_right(self._prices, max_price, key=_price_key) if max_price is not None else len(self._prices)
+            results = []
+            for i in range(lo, hi):
+                product = self._items[self._prices[i][1]][2]
+                if source is not None and product.source != source:
+                    continue
+                results.append(product)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _iter_by_discount(self, source: str | None) -> Iterator[tuple[float, ProductSchema]]:
+        """Percorre as heaps em ordem de desconto decrescente sem modificá-las.
+        Usa uma fronteira de índices (filhos 2i+1, 2i+2): O(K log K) para os K primeiros.
+        """
+        heaps = [self._heaps.get(source, [])] if source is not None else list(self._heaps.values())
+        frontier = [(heap[0], h, 0) for h, heap in enumerate(heaps) if heap]
+        heapq.heapify(frontier)
+
+        while frontier:
+            (neg_discount, version, item_id), h, i = heapq.heappop(frontier)
+            heap = heaps[h]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], h, child))
+
+            entry = self._items.get(item_id)
+            if entry is not None and entry[0] == version:
+                yield neg_discount, entry[2]
+
+    def _remove(self, item_id: str) -> None:
+        entry = self._items.pop(item_id, None)
+        if entry is None:
+            return
+        _, _, product = entry
+        self._source_counts[product.source] -= 1
+        pos = bisect_left(self._prices, (float(product.price), item_id))
+        if pos < len(self._prices) and self._prices[pos][1] == item_id:
+            self._prices.pop(pos)
+
+        # Compacta a heap quando a maioria das entradas ficou obsoleta
+        heap = self._heaps.get(product.source)
+        if heap is not None and len(heap) > 2 * self._source_counts[product.source] + 64:
+            self._heaps[product.source] = [
+                e for e in heap if e[2] in self._items and self._items[e[2]][0] == e[1]
+            ]
+            heapq.heapify(self._heaps[product.source])
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.max_age_seconds
+        while self._by_age:
+            added_at, version, item_id = self._by_age[0]
+            entry = self._items.get(item_id)
+            if entry is None or entry[0] != version:
+                self._by_age.popleft()  # Entrada obsoleta
+                continue
+            if added_at >= cutoff and len(self._items) <= self.max_items:
+                break
+            self._by_age.popleft()
+            self._remove(item_id)
+
+
+# Instância compartilhada pela API (alimentada por run_collection_task)
+deals_index = DealsIndex()
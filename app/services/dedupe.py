@@ -0,0 +1,62 @@
+# app/services/dedupe.py
+"""Deduplicação em lote (dentro da mesma execução) antes da persistência.
+
+O mesmo anúncio aparece com frequência em várias fontes do mesmo job (ex: "ps5"
+e "ps5 slim") ou em mais de uma página. A deduplicação por hash do dedupe_key é
+O(n) e acontece antes da consulta de chaves existentes no BigQuery.
+"""
+from collections.abc import Iterable
+
+from app.schemas.product import ProductSchema
+
+POLICY_KEEP_FIRST = "keep_first"  # Mantém a fonte da primeira ocorrência
+POLICY_MERGE_SOURCES = "merge_sources"  # Mantém a lista de todas as fontes em `sources`
+
+
+class BatchDeduplicator:
+    """Deduplicador incremental por dedupe_key.
+    Produtos podem ser adicionados em streaming (fonte a fonte, página a página);
+    apenas as chaves e as fontes em que cada uma apareceu ficam em memória, então
+    os produtos únicos podem seguir para um spool em disco.
+
+    As fontes são registradas em qualquer política: `sources_of` alimenta o
+    índice incremental com todos os pares (fonte, item); a política só decide
+    se elas vão para `sources` no produto persistido.
+    """
+
+    def __init__(self, policy: str = POLICY_KEEP_FIRST):
+        if policy not in (POLICY_KEEP_FIRST, POLICY_MERGE_SOURCES):
+            raise ValueError(f"Política de dedupe inválida: {policy}")
+        self.policy = policy
+        self.duplicates = 0
+        self._sources: dict[str, list[str]] = {}
+
+    def add(self, product: ProductSchema) -> bool:
+        """Adiciona um produto. Retorna False se for duplicado no lote."""
+        key = product.dedupe_key
+        sources = self._sources.get(key)
+        if sources is None:
+            self._sources[key] = [product.source]
+            return True
+
+        self.duplicates += 1
+        if product.source not in sources:
+            sources.append(product.source)
+        return False
+
+    def unique(self, products: Iterable[ProductSchema]) -> list[ProductSchema]:
+        """Adiciona os produtos e retorna apenas os que ainda não tinham aparecido."""
+        return [p for p in products if self.add(p)]
+
+    def sources_of(self, product: ProductSchema) -> list[str]:
+        """Todas as fontes em que o produto apareceu no lote (qualquer política)."""
+        return list(self._sources.get(product.dedupe_key, [product.source]))
+
+    def apply_sources(self, products: Iterable[ProductSchema]) -> None:
+        """Preenche `sources` com todas as fontes vistas (política merge_sources).
+        Chamado depois que o lote inteiro passou pelo deduplicador.
+        """
+        if self.policy != POLICY_MERGE_SOURCES:
+            return
+        for product in products:
+            product.sources = self.sources_of(product)
@@ -0,0 +1,302 @@
+# app/services/distributed.py
+"""Execução distribuída da coleta.
+
+O coordenador divide as fontes em unidades de trabalho na fila com lease,
+sobe N processos worker locais (outros nós podem rodar `python -m app.worker`
+apontando para a mesma fila) e agrega os resultados no mesmo formato de
+`CrawlerService.fetch_from_sources`.
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.core.logging import (
+    bind_log_context,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+from app.core.tracing import tracer
+from app.schemas.product import ProductSchema
+from app.services.checkpoint import CheckpointStore
+from app.services.crawler import CrawlerService
+from app.services.known_items import KnownItemsIndex
+from app.services.work_queue import (
+    DEFAULT_TENANT,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_LEASED,
+    STATUS_PENDING,
+    WorkUnit,
+    get_work_queue,
+)
+
+logger = get_logger(__name__)
+
+
+def execute_unit(unit: WorkUnit) -> dict:
+    """Executa uma unidade de trabalho (coleta paginada de uma fonte).
+
+    Returns:
+        dict serializável com os produtos e estatísticas da unidade
+
+    """
+    params = unit.params
+    crawler = CrawlerService()
+    crawler.execution_id = params["execution_id"]
+
+    # Continua o trace da task que enfileirou a unidade (mesmo em outro nó)
+    with bind_log_context(execution_id=params["execution_id"], job_id=unit.job_id, unit_id=unit.unit_id), \
+            tracer.span("worker.unit", parent=params.get("traceparent"), unit_id=unit.unit_id,
+                        source=unit.source, attempt=unit.attempts):
+        products = crawler.fetch_products_paginated(
+            query=unit.source,
+            limit=params["limit"],
+            max_pages=params["max_pages"],
+            delay_between_pages=params["delay"],
+            checkpoint=CheckpointStore() if params.get("checkpoint") else None,
+            known_items=KnownItemsIndex() if params.get("incremental") else None,
+            unchanged_stop_ratio=params.get("unchanged_stop_ratio"),
+        )
+    tracer.flush()
+
+    return {
+        "products": [p.model_dump(mode="json") for p in products],
+        "stats": crawler.stats,
+        "error": crawler.failed_sources.get(unit.source),
+    }
+
+
+def _heartbeat_loop(queue, unit: WorkUnit, worker_id: str, stop: threading.Event) -> None:
+    while not stop.wait(settings.QUEUE_HEARTBEAT_SECONDS):
+        if not queue.heartbeat(unit.unit_id, worker_id):
+            logger.warning(f"[WORKER] Lease perdido para a unidade {unit.unit_id} ('{unit.source}')")
+            return
+
+
+def run_worker(
+    job_id: str | None = None,
+    worker_id: str | None = None,
+    stop_when_idle: bool = False,
+    queue=None,
+) -> int:
+    """Loop do worker: obtém unidades da fila, executa e grava o resultado.
+
+    Args:
+        job_id: Se informado, só processa unidades desse job
+        worker_id: Identificador do worker (padrão: host-pid)
+        stop_when_idle: Encerra quando não houver mais unidades disponíveis
+        queue: Fila a usar (padrão: get_work_queue())
+
+    Returns:
+        Quantidade de unidades processadas
+
+    """
+    queue = queue or get_work_queue()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    processed = 0
+
+    logger.info(f"[WORKER] Worker {worker_id} iniciado", extra={"job_id": job_id})
+
+    while True:
+        unit = queue.lease(worker_id, job_id=job_id)
+        if unit is None:
+            # Unidades pendentes podem estar apenas aguardando o orçamento do tenant
+            if stop_when_idle and not (job_id and queue.job_status(job_id)[STATUS_PENDING]):
+                break
+            time.sleep(settings.QUEUE_POLL_SECONDS)
+            continue
+
+        logger.info(f"[WORKER] Processando '{unit.source}' (tentativa {unit.attempts})",
+                    extra={"unit_id": unit.unit_id, "job_id": unit.job_id})
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat_loop, args=(queue, unit, worker_id, stop), daemon=True,
+        )
+        heartbeat.start()
+        try:
+            result = execute_unit(unit)
+            if not queue.complete(unit.unit_id, worker_id, result):
+                logger.warning(f"[WORKER] Resultado descartado, unidade {unit.unit_id} foi reentregue")
+        except Exception as e:
+            logger.error(f"[WORKER] Erro na unidade '{unit.source}': {e}", exc_info=True)
+            queue.fail(unit.unit_id, worker_id, str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        processed += 1
+
+    logger.info(f"[WORKER] Worker {worker_id} encerrado ({processed} unidades)")
+    return processed
+
+
+def _worker_process(job_id: str) -> None:
+    """Entry point dos processos worker locais (spawn)."""
+    configure_logging(level="INFO")
+    try:
+        run_worker(job_id=job_id, stop_when_idle=True)
+    finally:
+        # Processos multiprocessing não rodam o atexit: esvazia a fila de logs
+        shutdown_logging()
+
+
+class DistributedCollector:
+    """Coordena uma coleta distribuída entre processos/nós via fila com lease."""
+
+    def __init__(self, queue=None):
+        self.queue = queue or get_work_queue()
+        # fonte -> erro das unidades que esgotaram as tentativas
+        self.failed_sources: dict[str, str | None] = {}
+
+    def fetch_from_sources(
+        self,
+        execution_id: str,
+        sources: list[str],
+        limit_per_source: int = 100,
+        max_pages_per_source: int = 3,
+        delay_between_requests: float = 1.0,
+        workers: int = 4,
+        incremental: bool = False,
+        unchanged_stop_ratio: float | None = None,
+        tenant: str = DEFAULT_TENANT,
+        priority: int | None = None,
+        job_id: str | None = None,
+    ) -> dict[str, list[ProductSchema]]:
+        """Coleta as fontes em paralelo e agrega os produtos por fonte.
+
+        Args:
+            execution_id: ID da execução (propagado para os produtos)
+            sources: Lista de termos de busca
+            limit_per_source: Limite de produtos por fonte
+            max_pages_per_source: Máximo de páginas por fonte
+            delay_between_requests: Delay entre páginas dentro de cada worker
+            workers: Processos worker locais (0 = apenas workers externos)
+            incremental: Emite apenas itens novos/alterados (ver KnownItemsIndex)
+            unchanged_stop_ratio: Fração de itens inalterados que encerra a paginação
+            tenant: Tenant dono do job (orçamento de concorrência e fair share)
+            priority: Prioridade das unidades (padrão: INTERACTIVE_PRIORITY)
+            job_id: ID do job na fila (reaproveita as unidades se o job já existir)
+
+        Returns:
+            Dict com fonte -> lista de produtos
+
+        """
+        return dict(self.iter_sources(
+            execution_id=execution_id,
+            sources=sources,
+            limit_per_source=limit_per_source,
+            max_pages_per_source=max_pages_per_source,
+            delay_between_requests=delay_between_requests,
+            workers=workers,
+            incremental=incremental,
+            unchanged_stop_ratio=unchanged_stop_ratio,
+            tenant=tenant,
+            priority=priority,
+            job_id=job_id,
+        ))
+
+    def iter_sources(
+        self,
+        execution_id: str,
+        sources: list[str],
+        limit_per_source: int = 100,
+        max_pages_per_source: int = 3,
+        delay_between_requests: float = 1.0,
+        workers: int = 4,
+        incremental: bool = False,
+        unchanged_stop_ratio: float | None = None,
+        tenant: str = DEFAULT_TENANT,
+        priority: int | None = None,
+        job_id: str | None = None,
+    ) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Versão em streaming de fetch_from_sources: espera o job terminar e gera
+        (fonte, produtos) carregando o resultado de uma unidade por vez.
+        """
+        job_id = job_id or f"{execution_id}-{uuid.uuid4().hex[:8]}"
+        priority = settings.INTERACTIVE_PRIORITY if priority is None else priority
+
+        if any(self.queue.job_status(job_id).values()):
+            logger.info(f"[COLETA] Job {job_id} já está na fila, retomando",
+                        extra={"execution_id": execution_id, "job_id": job_id})
+        else:
+            params = {
+                "execution_id": execution_id,
+                "limit": limit_per_source,
+                "max_pages": max_pages_per_source,
+                "delay": delay_between_requests,
+                "checkpoint": settings.CHECKPOINT_ENABLED,
+                "incremental": incremental,
+                "unchanged_stop_ratio": unchanged_stop_ratio,
+                "traceparent": tracer.traceparent(),
+            }
+            self.queue.enqueue(job_id, [(source, params) for source in sources], tenant=tenant, priority=priority)
+
+        workers = min(workers, len(sources))
+        logger.info(f"[COLETA] Coleta distribuída: {len(sources)} fontes, {workers} workers locais",
+                    extra={"execution_id": execution_id, "job_id": job_id, "tenant": tenant, "priority": priority})
+
+        ctx = multiprocessing.get_context("spawn")
+        processes = [ctx.Process(target=_worker_process, args=(job_id,), daemon=True) for _ in range(workers)]
+        for process in processes:
+            process.start()
+
+        try:
+            self._wait_for_job(job_id, processes)
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        yield from self._iter_results(job_id)
+        self.queue.purge_job(job_id)
+
+    def _wait_for_job(self, job_id: str, processes: list) -> None:
+        """Espera o job terminar. O prazo (QUEUE_JOB_TIMEOUT_SECONDS) conta desde a
+        última unidade concluída: lotes grandes, limitados pelo orçamento do tenant
+        ou atrás de coletas interativas, podem durar bem mais que isso.
+        """
+        deadline = time.monotonic() + settings.QUEUE_JOB_TIMEOUT_SECONDS
+        finished = 0
+        while time.monotonic() < deadline:
+            status = self.queue.job_status(job_id)
+            if status[STATUS_PENDING] == 0 and status[STATUS_LEASED] == 0:
+                return
+            if status[STATUS_DONE] + status[STATUS_FAILED] > finished:
+                finished = status[STATUS_DONE] + status[STATUS_FAILED]
+                deadline = time.monotonic() + settings.QUEUE_JOB_TIMEOUT_SECONDS
+
+            # Se todos os workers locais morreram, o coordenador assume o restante
+            if processes and not any(p.is_alive() for p in processes):
+                logger.warning("[COLETA] Workers locais encerrados com unidades pendentes, processando no coordenador")
+                run_worker(job_id=job_id, stop_when_idle=True, queue=self.queue)
+
+            time.sleep(settings.QUEUE_POLL_SECONDS)
+
+        raise TimeoutError(f"Job {job_id} ficou {settings.QUEUE_JOB_TIMEOUT_SECONDS}s sem concluir nenhuma unidade")
+
+    def _iter_results(self, job_id: str) -> Iterator[tuple[str, list[ProductSchema]]]:
+        total = 0
+        units = self.queue.job_units(job_id, with_results=False)
+        for unit in units:
+            result = self.queue.get_unit(unit.unit_id).result if unit.status != STATUS_FAILED else None
+            if result is None:
+                logger.error(f"[COLETA] Fonte '{unit.source}' falhou: {unit.error}")
+                self.failed_sources[unit.source] = unit.error
+                yield unit.source, []
+                continue
+            if result.get("error"):
+                # Fonte interrompida por bloqueio/circuito aberto (produtos parciais mantidos)
+                self.failed_sources[unit.source] = result["error"]
+            products = [ProductSchema.model_validate(p) for p in result["products"]]
+            total += len(products)
+            yield unit.source, products
+
+        logger.info(f"[COLETA] Coleta distribuída finalizada: {total} produtos de {len(units)} fontes")
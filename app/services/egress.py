@@ -0,0 +1,168 @@
+# app/services/egress.py
+"""Pool de saídas (proxy + user-agent) para o crawler.
+
+Cada saída acumula médias móveis de latência, sucesso e bloqueio. A requisição
+vai para a saída saudável com maior vazão esperada, considerando também a
+espera que o controle adaptativo (throttle) imporia a ela; saídas bloqueadas ou com falhas
+seguidas ficam em quarentena com cool-down exponencial. Como o throttle é
+mantido por (host, saída), as páginas por minuto crescem com o tamanho do pool.
+
+Sem EGRESS_PROXIES nem EGRESS_USER_AGENTS o pool fica desativado e o crawler
+sai direto com settings.USER_AGENT.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.circuit_breaker import CircuitOpenError
+
+logger = get_logger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_BLOCKED = "blocked"
+OUTCOME_ERROR = "error"
+
+
+class NoHealthyEgressError(CircuitOpenError):
+    """Todas as saídas estão em quarentena."""
+
+    def __init__(self, retry_in: float):
+        super().__init__("pool de saídas", retry_in)
+
+
+@dataclass
+class Egress:
+    """Uma identidade de saída (proxy opcional + user-agent) e suas estatísticas."""
+
+    egress_id: str
+    proxy_url: str | None
+    user_agent: str
+    latency_ewma: float | None = None
+    success_rate: float = 1.0
+    block_rate: float = 0.0
+    requests: int = 0
+    in_flight: int = 0
+    consecutive_failures: int = 0
+    cooldown_seconds: float = 0.0
+    quarantined_until: float = 0.0
+
+    @property
+    def proxies(self) -> dict[str, str] | None:
+        if not self.proxy_url:
+            return None
+        return {"http": self.proxy_url, "https": self.proxy_url}
+
+    def score(self, default_latency: float = 1.0, wait: float = 0.0) -> float:
+        """Páginas úteis por segundo esperadas: sucesso x (1 - bloqueio) / (espera + latência)."""
+        latency = self.latency_ewma if self.latency_ewma is not None else default_latency
+        quality = self.success_rate * (1.0 - self.block_rate)
+        return quality / (wait + latency + 1e-3) / (1 + self.in_flight)
+
+
+class EgressPool:
+    """Pool thread-safe de saídas com pontuação e quarentena."""
+
+    def __init__(self, egresses: list[Egress]):
+        self.egresses = egresses
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "EgressPool":
+        if not settings.EGRESS_PROXIES and not settings.EGRESS_USER_AGENTS:
+            return cls([])  # Desativado: saída direta única
+
+        proxies: list[str | None] = list(settings.EGRESS_PROXIES)
+        if settings.EGRESS_INCLUDE_DIRECT or not proxies:
+            proxies.insert(0, None)
+        user_agents = settings.EGRESS_USER_AGENTS or [settings.USER_AGENT]
+
+        # Sem proxies, cada user-agent vira uma saída direta; com proxies, os perfis são distribuídos entre eles
+        if proxies == [None]:
+            pairs = [(None, ua) for ua in user_agents]
+        else:
+            pairs = [(proxy, user_agents[i % len(user_agents)]) for i, proxy in enumerate(proxies)]
+        return cls([
+            Egress(egress_id=f"egress-{i}", proxy_url=proxy, user_agent=ua)
+            for i, (proxy, ua) in enumerate(pairs)
+        ])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.egresses)
+
+    def acquire(self, wait_for=None) -> Egress:
+        """Escolhe a saída saudável de melhor pontuação.
+
+        Args:
+            wait_for: Função egress -> segundos de espera imposta pelo throttle (opcional)
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self.egresses if e.quarantined_until <= now]
+            if not healthy:
+                raise NoHealthyEgressError(min(e.quarantined_until for e in self.egresses) - now)
+
+            # Saídas ainda sem medição usam a melhor latência conhecida (exploração otimista)
+            known = [e.latency_ewma for e in self.egresses if e.latency_ewma is not None]
+            default_latency = min(known) if known else 1.0
+
+            egress = max(
+                healthy,
+                key=lambda e: e.score(default_latency, wait_for(e) if wait_for else 0.0),
+            )
+            egress.in_flight += 1
+            return egress
+
+    def release(self, egress: Egress, outcome: str, latency: float | None = None) -> None:
+        """Registra o resultado da requisição feita pela saída."""
+        alpha = settings.EGRESS_EWMA_ALPHA
+        with self._lock:
+            egress.in_flight = max(egress.in_flight - 1, 0)
+            egress.requests += 1
+            if latency is not None and outcome == OUTCOME_OK:
+                egress.latency_ewma = latency if egress.latency_ewma is None else (
+                    alpha * latency + (1 - alpha) * egress.latency_ewma
+                )
+            egress.success_rate = alpha * (outcome == OUTCOME_OK) + (1 - alpha) * egress.success_rate
+            egress.block_rate = alpha * (outcome == OUTCOME_BLOCKED) + (1 - alpha) * egress.block_rate
+
+            if outcome == OUTCOME_OK:
+                egress.consecutive_failures = 0
+                egress.cooldown_seconds = 0.0
+                return
+
+            egress.consecutive_failures += 1
+            if outcome == OUTCOME_BLOCKED or egress.consecutive_failures >= settings.EGRESS_MAX_FAILURES:
+                egress.cooldown_seconds = min(
+                    egress.cooldown_seconds * 2 or settings.EGRESS_QUARANTINE_SECONDS,
+                    settings.EGRESS_MAX_QUARANTINE_SECONDS,
+                )
+                egress.quarantined_until = time.monotonic() + egress.cooldown_seconds
+                egress.consecutive_failures = 0
+                logger.warning(
+                    f"[EGRESS] {egress.egress_id} em quarentena por {egress.cooldown_seconds:.0f}s ({outcome})"
+                )
+
+    def snapshot(self) -> dict[str, dict]:
+        """Estatísticas atuais por saída (sem expor credenciais do proxy)."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                e.egress_id: {
+                    "proxy": e.proxy_url.rsplit("@", 1)[-1] if e.proxy_url else None,
+                    "score": round(e.score(), 3),
+                    "latency_ewma_seconds": round(e.latency_ewma, 3) if e.latency_ewma else None,
+                    "success_rate": round(e.success_rate, 3),
+                    "block_rate": round(e.block_rate, 3),
+                    "requests": e.requests,
+                    "quarantined_seconds": round(max(e.quarantined_until - now, 0.0), 1),
+                }
+                for e in self.egresses
+            }
+
+
+# Instância compartilhada pelo processo (crawler e rota GET /throttle)
+egress_pool = EgressPool.from_settings()
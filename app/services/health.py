@@ -0,0 +1,139 @@
+# app/services/health.py
+"""Checks de saúde e prontidão com resultado em cache.
+
+Uma thread refaz os checks a cada HEALTH_CHECK_INTERVAL_SECONDS:
+- bigquery: `get_dataset` com o cliente compartilhado do processo
+- crawler: HEAD na raiz do host de busca de cada marketplace (sem seguir
+  redirects; qualquer resposta abaixo de 500 conta como alcançável)
+- queue: tasks de coleta agendadas aguardando execução nesta réplica
+  (saturada a partir de HEALTH_MAX_QUEUED_TASKS)
+
+Os endpoints /health, /health/ready só leem o último resultado: o probe não
+faz I/O nem bloqueia o event loop. Um resultado mais velho que três
+intervalos (thread parada ou travada num check) deixa a réplica não pronta.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import TASKS_QUEUED
+from app.services.bigquery import get_client
+from app.services.marketplaces import ADAPTERS
+
+logger = get_logger(__name__)
+
+STATUS_HEALTHY = "healthy"
+STATUS_UNHEALTHY = "unhealthy"
+STATUS_UNKNOWN = "unknown"
+
+HEALTH_CHECKS = ("bigquery", "crawler", "queue")
+
+
+class HealthMonitor:
+    """Refresca os checks numa thread; `snapshot` devolve o último resultado."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: dict[str, dict] = {
+            name: {"status": STATUS_UNKNOWN, "detail": None, "latency_ms": None} for name in HEALTH_CHECKS
+        }
+        self._refreshed_at: float | None = None
+        self._refreshed_at_wall: datetime | None = None
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        """Inicia a thread de refresh (idempotente)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        while True:
+            self.refresh()
+            if self._stop_event.wait(settings.HEALTH_CHECK_INTERVAL_SECONDS):
+                return
+
+    def refresh(self) -> None:
+        """Executa todos os checks e publica o resultado."""
+        results = {}
+        for name, check in (("bigquery", self._check_bigquery), ("crawler", self._check_crawler),
+                            ("queue", self._check_queue)):
+            started = time.perf_counter()
+            try:
+                detail = check()
+                status = STATUS_HEALTHY
+            except Exception as e:
+                detail = str(e)
+                status = STATUS_UNHEALTHY
+            results[name] = {
+                "status": status,
+                "detail": detail,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+        with self._lock:
+            previous = self._results
+            self._results = results
+            self._refreshed_at = time.monotonic()
+            self._refreshed_at_wall = datetime.now(timezone.utc)
+
+        # Loga só as transições (a rodada se repete a cada intervalo)
+        for name, result in results.items():
+            if result["status"] != previous[name]["status"]:
+                log = logger.info if result["status"] == STATUS_HEALTHY else logger.error
+                log(f"[HEALTH] {name}: {previous[name]['status']} -> {result['status']}",
+                    extra={"service": name, "detail": result["detail"]})
+
+    def _check_bigquery(self) -> str:
+        # Cliente compartilhado do processo (credenciais resolvidas uma vez)
+        get_client().get_dataset(settings.GCP_DATASET_ID, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        return settings.GCP_DATASET_ID
+
+    def _check_crawler(self) -> str:
+        hosts = []
+        for adapter in ADAPTERS.values():
+            url = urlparse(adapter.search_url("health", 1))
+            root = f"{url.scheme}://{url.netloc}/"
+            response = requests.head(
+                root,
+                headers={"User-Agent": settings.USER_AGENT},
+                timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+                allow_redirects=False,
+            )
+            if response.status_code >= 500:
+                raise RuntimeError(f"{url.netloc} respondeu HTTP {response.status_code}")
+            hosts.append(f"{url.netloc} HTTP {response.status_code}")
+        return ", ".join(hosts)
+
+    def _check_queue(self) -> str:
+        queued = int(TASKS_QUEUED.value())
+        limit = settings.HEALTH_MAX_QUEUED_TASKS
+        if limit and queued >= limit:
+            raise RuntimeError(f"{queued} tasks agendadas (limite {limit})")
+        return f"{queued} tasks agendadas"
+
+    def snapshot(self) -> dict:
+        """Último resultado: {"ready", "refreshed_at", "stale", "checks"} (sem I/O)."""
+        with self._lock:
+            results = self._results
+            refreshed_at = self._refreshed_at
+            refreshed_at_wall = self._refreshed_at_wall
+        stale = refreshed_at is None or time.monotonic() - refreshed_at > 3 * settings.HEALTH_CHECK_INTERVAL_SECONDS
+        ready = not stale and all(
+            results[name]["status"] == STATUS_HEALTHY for name in settings.HEALTH_READY_CHECKS if name in results
+        )
+        return {"ready": ready, "refreshed_at": refreshed_at_wall, "stale": stale, "checks": results}
+
+
+health_monitor = HealthMonitor()
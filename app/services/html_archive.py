@@ -0,0 +1,269 @@
+# app/services/html_archive.py
+"""Arquivo do HTML bruto das páginas coletadas, para re-extração sem novas requisições.
+
+Cada página buscada é registrada por (execution_id, source, page) apontando
+para o conteúdo endereçado pelo SHA-256 do HTML: páginas idênticas ocupam
+espaço uma vez só. O HTML é comprimido com zstd usando um dicionário
+treinado por marketplace (as páginas de busca de um site compartilham quase
+todo o markup); até haver amostras suficientes para o treino, as páginas são
+comprimidas sem dicionário.
+
+`reextract` roda o extrator atual do adaptador sobre as páginas arquivadas de
+uma execução, em processos paralelos, e emite os produtos como uma nova
+coleta: um ajuste no parser custa CPU em vez de milhares de requisições.
+"""
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.logging import bind_log_context, get_logger
+from app.core.tracing import tracer
+from app.schemas.product import ProductSchema
+from app.services.marketplaces import get_adapter
+
+logger = get_logger(__name__)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("HTML_ARCHIVE_ENABLED requer o pacote 'zstandard' instalado") from e
+    return zstandard
+
+
+class HtmlArchive:
+    """Arquivo endereçado por conteúdo (SQLite + zstd com dicionário por marketplace)."""
+
+    def __init__(self, path: str | None = None):
+        self.zstd = _zstd()
+        self.path = path or settings.HTML_ARCHIVE_PATH or os.path.join(settings.DATA_DIR, "html_archive.db")
+        # dict_id -> ZstdCompressionDict (dicionários não mudam depois de gravados)
+        self._dicts: dict[int, object] = {}
+        self._training_failed: set[str] = set()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dictionaries (
+                    dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    marketplace TEXT NOT NULL UNIQUE,
+                    data BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    dict_id INTEGER,
+                    raw_size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    execution_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    marketplace TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (execution_id, source, page)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _dictionary(self, conn: sqlite3.Connection, dict_id: int):
+        compression_dict = self._dicts.get(dict_id)
+        if compression_dict is None:
+            row = conn.execute("SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)).fetchone()
+            compression_dict = self._dicts[dict_id] = self.zstd.ZstdCompressionDict(row[0])
+        return compression_dict
+
+    def _marketplace_dict_id(self, conn: sqlite3.Connection, marketplace: str) -> int | None:
+        row = conn.execute("SELECT dict_id FROM dictionaries WHERE marketplace = ?", (marketplace,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, execution_id: str, source: str, page: int, url: str, marketplace: str, html: str) -> str:
+        """Arquiva o HTML da página e retorna o hash do conteúdo."""
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._connect() as conn:
+            exists = conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                dict_id = self._marketplace_dict_id(conn, marketplace)
+                compressor = self.zstd.ZstdCompressor(
+                    level=settings.HTML_ARCHIVE_LEVEL,
+                    dict_data=self._dictionary(conn, dict_id) if dict_id else None,
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, dict_id, raw_size, data) VALUES (?, ?, ?, ?)",
+                    (digest, dict_id, len(raw), compressor.compress(raw)),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (execution_id, source, page, url, marketplace, hash, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (execution_id, source, page, url, marketplace, digest, time.time()),
+            )
+
+        self._maybe_train(marketplace)
+        return digest
+
+    def get(self, digest: str) -> str | None:
+        """HTML original a partir do hash do conteúdo."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT dict_id, data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            dict_id, data = row
+            decompressor = self.zstd.ZstdDecompressor(
+                dict_data=self._dictionary(conn, dict_id) if dict_id else None,
+            )
+        return decompressor.decompress(data).decode("utf-8")
+
+    def _maybe_train(self, marketplace: str) -> None:
+        """Treina o dicionário do marketplace quando há amostras suficientes sem dicionário."""
+        if marketplace in self._training_failed:
+            return
+        with self._connect() as conn:
+            if self._marketplace_dict_id(conn, marketplace) is not None:
+                return
+            hashes = [row[0] for row in conn.execute(
+                "SELECT DISTINCT hash FROM pages WHERE marketplace = ? ORDER BY fetched_at DESC LIMIT ?",
+                (marketplace, settings.HTML_ARCHIVE_DICT_SAMPLES),
+            )]
+        if len(hashes) < settings.HTML_ARCHIVE_DICT_SAMPLES:
+            return
+
+        samples = [html.encode("utf-8") for html in map(self.get, hashes) if html]
+        try:
+            trained = self.zstd.train_dictionary(settings.HTML_ARCHIVE_DICT_SIZE_KB * 1024, samples)
+        except self.zstd.ZstdError as e:
+            logger.warning(f"[ARQUIVO] Falha ao treinar dicionário de {marketplace}: {e}")
+            self._training_failed.add(marketplace)
+            return
+
+        with self._connect() as conn:
+            # Outro processo pode ter treinado ao mesmo tempo: o primeiro dicionário vale
+            conn.execute(
+                "INSERT OR IGNORE INTO dictionaries (marketplace, data, created_at) VALUES (?, ?, ?)",
+                (marketplace, trained.as_bytes(), time.time()),
+            )
+        logger.info(f"[ARQUIVO] Dicionário zstd de {marketplace} treinado com {len(samples)} páginas")
+
+    def pages(self, execution_id: str, sources: list[str] | None = None) -> list[dict]:
+        """Páginas arquivadas da execução (sem o HTML), ordenadas por fonte e página."""
+        query = "SELECT source, page, url, marketplace, hash, fetched_at FROM pages WHERE execution_id = ?"
+        params: list = [execution_id]
+        if sources:
+            query += f" AND source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY source, page", params).fetchall()
+        return [
+            {"source": s, "page": p, "url": u, "marketplace": m, "hash": h, "fetched_at": f}
+            for s, p, u, m, h, f in rows
+        ]
+
+    def sources(self, execution_id: str) -> list[str]:
+        """Fontes com páginas arquivadas na execução."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT source FROM pages WHERE execution_id = ? ORDER BY source", (execution_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> dict:
+        """Páginas, conteúdos distintos e taxa de compressão do arquivo."""
+        with self._connect() as conn:
+            pages = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, raw, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs",
+            ).fetchone()
+        return {
+            "pages": pages,
+            "unique_pages": blobs,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 2) if stored else None,
+        }
+
+    def reextract(
+        self,
+        source_execution_id: str,
+        execution_id: str,
+        sources: list[str] | None = None,
+        workers: int = 0,
+    ) -> Iterator[tuple[str, list[ProductSchema]]]:
+        """Re-executa o extrator atual sobre as páginas arquivadas de uma execução.
+
+        Gera (fonte, produtos) por fonte, como CrawlerService.iter_sources. Os
+        produtos recebem o novo execution_id e o instante original da coleta.
+        Com workers > 1 as fontes são extraídas em processos paralelos (spawn).
+        """
+        by_source: dict[str, list[dict]] = {}
+        for row in self.pages(source_execution_id, sources):
+            by_source.setdefault(row["source"], []).append(row)
+
+        logger.info(
+            f"[ARQUIVO] Re-extraindo {sum(map(len, by_source.values()))} páginas de "
+            f"{len(by_source)} fontes | execution_id: {source_execution_id} -> {execution_id}"
+        )
+        # Os processos continuam o trace do span corrente (traceparent)
+        jobs = [(self.path, source, rows, execution_id, tracer.traceparent()) for source, rows in by_source.items()]
+
+        if workers <= 1:
+            for job in jobs:
+                yield _reextract_source(*job)
+            return
+
+        # Janela limitada de fontes em voo: resultados não se acumulam se o consumidor for lento
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            pending: deque = deque()
+            for job in jobs:
+                pending.append(pool.submit(_reextract_source, *job))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+def _reextract_source(
+    path: str, source: str, rows: list[dict], execution_id: str, traceparent: str | None = None,
+) -> tuple[str, list[ProductSchema]]:
+    """Extrai os produtos das páginas arquivadas de uma fonte (executa em processo worker)."""
+    archive = HtmlArchive(path)
+    products: list[ProductSchema] = []
+    with bind_log_context(execution_id=execution_id), \
+            tracer.span("reextract.source", parent=traceparent, source=source, pages=len(rows)) as span:
+        for row in rows:
+            html = archive.get(row["hash"])
+            if html is None:
+                continue
+            adapter = get_adapter(row["marketplace"])
+            with tracer.span("crawl.parse", marketplace=adapter.name, page=row["page"], bytes=len(html)) as parse_span:
+                page_products = adapter.extract(
+                    html,
+                    source_query=source,
+                    execution_id=execution_id,
+                    collected_at=datetime.fromtimestamp(row["fetched_at"], tz=timezone.utc),
+                )
+                parse_span.set_attribute("items", len(page_products))
+            products.extend(page_products)
+        span.set_attribute("items", len(products))
+    # Processos do pool não rodam os handlers de atexit
+    tracer.flush()
+    return source, products
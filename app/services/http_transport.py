@@ -0,0 +1,117 @@
+# app/services/http_transport.py
+"""Transporte HTTP do crawler.
+
+Por padrão cada página é buscada com `requests` (HTTP/1.1, uma requisição por
+conexão). Com HTTP2_ENABLED, as requisições passam por um cliente `httpx`
+HTTP/2 compartilhado pelo processo: várias coletas em paralelo multiplexam
+streams em poucas conexões por host (HTTP2_MAX_CONNECTIONS), com no máximo
+HTTP2_MAX_STREAMS requisições simultâneas por conexão.
+
+As respostas e erros do HTTP/2 são convertidos para os tipos do `requests`,
+então o restante do crawler (retry, throttle, circuit breaker) não muda.
+"""
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestsTransport:
+    """HTTP/1.1 via requests (comportamento original)."""
+
+    http2 = False
+
+    def get(self, url: str, headers: dict, proxies: dict | None = None, timeout: float = 15) -> requests.Response:
+        return requests.get(url, headers=headers, proxies=proxies, timeout=timeout)
+
+
+class Http2Transport:
+    """HTTP/2 multiplexado via httpx (um cliente por proxy, thread-safe)."""
+
+    http2 = True
+
+    def __init__(self, max_connections: int | None = None, max_streams: int | None = None):
+        try:
+            import h2  # noqa: F401
+            import httpx
+        except ImportError as e:
+            raise RuntimeError("HTTP2_ENABLED requer o pacote 'httpx[http2]' instalado") from e
+
+        self._httpx = httpx
+        self.max_connections = max_connections or settings.HTTP2_MAX_CONNECTIONS
+        self.max_streams = max_streams or settings.HTTP2_MAX_STREAMS
+
+        self._lock = threading.Lock()
+        # proxy (ou None) -> (cliente, semáforo de streams em voo)
+        self._clients: dict[str | None, tuple] = {}
+
+    def _client(self, proxy_url: str | None):
+        with self._lock:
+            entry = self._clients.get(proxy_url)
+            if entry is None:
+                client = self._httpx.Client(
+                    http2=True,
+                    proxy=proxy_url,
+                    limits=self._httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    follow_redirects=True,
+                )
+                entry = self._clients[proxy_url] = (
+                    client,
+                    threading.BoundedSemaphore(self.max_connections * self.max_streams),
+                )
+                logger.debug(f"[HTTP2] Cliente criado (proxy: {proxy_url or 'direto'})")
+            return entry
+
+    def get(self, url: str, headers: dict, proxies: dict | None = None, timeout: float = 15) -> requests.Response:
+        proxy_url = (proxies or {}).get("https") or (proxies or {}).get("http")
+        client, streams = self._client(proxy_url)
+
+        with streams:
+            try:
+                response = client.get(url, headers=headers, timeout=timeout)
+            except self._httpx.TimeoutException as e:
+                raise requests.Timeout(str(e)) from e
+            except self._httpx.HTTPError as e:
+                raise requests.ConnectionError(str(e)) from e
+
+        return _to_requests_response(response)
+
+    def close(self) -> None:
+        with self._lock:
+            for client, _ in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+def _to_requests_response(response) -> requests.Response:
+    """Converte httpx.Response em requests.Response (mesmos atributos usados pelo crawler)."""
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted._content = response.content
+    converted.headers = CaseInsensitiveDict(response.headers)
+    converted.url = str(response.url)
+    converted.encoding = response.encoding
+    converted.reason = response.reason_phrase
+    converted.elapsed = response.elapsed
+    return converted
+
+
+_transport: RequestsTransport | Http2Transport | None = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> RequestsTransport | Http2Transport:
+    """Retorna o transporte configurado (compartilhado pelo processo)."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Http2Transport() if settings.HTTP2_ENABLED else RequestsTransport()
+        return _transport
@@ -0,0 +1,81 @@
+# app/services/known_items.py
+"""Índice local dos últimos (item_id, price) conhecidos por fonte.
+
+Usado pelo modo incremental do crawler: páginas cujos itens já são conhecidos
+com o mesmo preço não precisam ser emitidas (o dedupe_key seria o mesmo) e a
+paginação pode parar cedo.
+"""
+import os
+import sqlite3
+import time
+from collections.abc import Callable
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import ProductSchema
+
+logger = get_logger(__name__)
+
+
+class KnownItemsIndex:
+    """Índice (source, item_id) -> último preço visto, em SQLite."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.KNOWN_ITEMS_PATH or os.path.join(settings.DATA_DIR, "known_items.db")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS known_items (
+                    source TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    seen_at REAL NOT NULL,
+                    PRIMARY KEY (source, item_id)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_prices(self, source: str, item_ids: list[str]) -> dict[str, float]:
+        """Retorna o último preço conhecido de cada item_id da fonte."""
+        if not item_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in item_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT item_id, price FROM known_items WHERE source = ? AND item_id IN ({placeholders})",
+                (source, *item_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def update(
+        self,
+        products: list[ProductSchema],
+        sources_of: Callable[[ProductSchema], list[str]] | None = None,
+    ) -> None:
+        """Registra os preços emitidos por fonte (chamado após a persistência).
+
+        Args:
+            products: Produtos persistidos (já deduplicados no lote)
+            sources_of: Fontes em que cada produto apareceu antes do dedupe
+                (`BatchDeduplicator.sources_of`); sem ela, usa `sources`/`source`
+
+        """
+        sources_of = sources_of or (lambda p: p.sources or [p.source])
+        now = time.time()
+        rows = [
+            (source, p.item_id, float(p.price), now)
+            for p in products
+            for source in sources_of(p)
+        ]
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO known_items (source, item_id, price, seen_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        logger.debug(f"[INCREMENTAL] {len(rows)} itens atualizados no índice")
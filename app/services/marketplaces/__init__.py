@@ -0,0 +1,51 @@
+# app/services/marketplaces/__init__.py
+"""Registro dos adaptadores de marketplace.
+
+Uma fonte pode indicar o marketplace com prefixo (`mercado_livre:ps5`); sem
+prefixo, usa settings.DEFAULT_MARKETPLACE. Cada adaptador registrado é uma
+instância única por processo, então o orçamento de concorrência dele é
+compartilhado por todas as coletas em andamento.
+"""
+from app.core.config import settings
+from app.services.marketplaces.base import MarketplaceAdapter
+from app.services.marketplaces.mercado_livre import MercadoLivreAdapter
+
+ADAPTERS: dict[str, MarketplaceAdapter] = {
+    adapter.name: adapter
+    for adapter in (MercadoLivreAdapter(),)
+}
+
+
+def get_adapter(name: str | None = None) -> MarketplaceAdapter:
+    """Adaptador pelo nome (padrão: settings.DEFAULT_MARKETPLACE)."""
+    name = name or settings.DEFAULT_MARKETPLACE
+    try:
+        return ADAPTERS[name]
+    except KeyError:
+        raise ValueError(f"Marketplace desconhecido: '{name}' (disponíveis: {', '.join(ADAPTERS)})") from None
+
+
+def resolve_source(source: str) -> tuple[MarketplaceAdapter, str]:
+    """Separa `marketplace:query` em (adaptador, query); sem prefixo conhecido usa o padrão."""
+    prefix, sep, query = source.partition(":")
+    if sep and prefix.strip() in ADAPTERS:
+        return ADAPTERS[prefix.strip()], query.strip()
+    return get_adapter(), source
+
+
+def adapter_for_url(url: str) -> MarketplaceAdapter:
+    """Adaptador que atende o host da URL (padrão se nenhum atender)."""
+    for adapter in ADAPTERS.values():
+        if adapter.handles(url):
+            return adapter
+    return get_adapter()
+
+
+__all__ = [
+    "ADAPTERS",
+    "MarketplaceAdapter",
+    "MercadoLivreAdapter",
+    "adapter_for_url",
+    "get_adapter",
+    "resolve_source",
+]
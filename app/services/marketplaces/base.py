@@ -0,0 +1,60 @@
+# app/services/marketplaces/base.py
+"""Interface dos adaptadores de marketplace.
+
+O crawler (motor de busca de páginas: retry, throttle, circuit breaker, pool de
+saídas) é o mesmo para todos os marketplaces; o adaptador define apenas o que é
+específico de cada site: URLs de busca, paginação, extração do HTML e as
+regras de item_id/dedupe_key.
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.schemas.product import ProductSchema
+from app.services.block_detection import classify_page
+
+
+class MarketplaceAdapter(ABC):
+    """Regras de coleta de um marketplace."""
+
+    name: str  # Identificador gravado em ProductSchema.marketplace
+    hosts: tuple[str, ...] = ()  # Hosts atendidos (para fetch_from_url)
+    items_per_page: int = 50
+    currency: str = "BRL"
+
+    def __init__(self):
+        budget = settings.MARKETPLACE_BUDGETS.get(self.name, {})
+        # Teto de req/s por saída no host e requisições simultâneas no processo
+        self.max_rate: float = float(budget.get("max_rate", settings.THROTTLE_MAX_RATE))
+        self.max_concurrency: int = int(budget.get("max_concurrency", settings.MARKETPLACE_MAX_CONCURRENCY))
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    @abstractmethod
+    def search_url(self, query: str, page: int) -> str:
+        """URL da página `page` (a partir de 1) da busca por `query`."""
+
+    @abstractmethod
+    def extract(
+        self, html: str, source_query: str, execution_id: str, collected_at: datetime,
+    ) -> list[ProductSchema]:
+        """Extrai e normaliza os produtos do HTML de uma página de listagem."""
+
+    @abstractmethod
+    def parse_item_id(self, url: str) -> str | None:
+        """ID do item a partir do link do anúncio (None se não reconhecido)."""
+
+    def dedupe_key(self, item_id: str, price: float) -> str:
+        return f"{self.name}_{item_id}_{price}"
+
+    def is_last_page(self, products_count: int) -> bool:
+        """Página com menos da metade da capacidade: provavelmente a última."""
+        return products_count < self.items_per_page * 0.5
+
+    def classify_page(self, html: str, products_count: int, status_code: int = 200) -> str:
+        return classify_page(html, products_count, status_code)
+
+    def handles(self, url: str) -> bool:
+        host = urlparse(url).netloc
+        return any(host == h or host.endswith(f".{h}") for h in self.hosts)
@@ -0,0 +1,156 @@
+# app/services/marketplaces/mercado_livre.py
+"""Adaptador do Mercado Livre (páginas de busca em lista.mercadolivre.com.br)."""
+import logging
+import re
+import time
+from datetime import datetime
+
+from app.core.logging import get_logger, log_limited
+from app.core.metrics import PARSE_SECONDS, VALIDATION_SECONDS
+from app.schemas.product import ProductSchema
+from app.services.marketplaces.base import MarketplaceAdapter
+
+logger = get_logger(__name__)
+
+
+class MercadoLivreAdapter(MarketplaceAdapter):
+    """Busca, paginação `_Desde_` e seletores do Mercado Livre."""
+
+    name = "mercado_livre"
+    hosts = ("mercadolivre.com.br",)
+    items_per_page = 50  # ML mostra ~50 itens por página com _NoIndex_True
+    currency = "BRL"
+
+    base_url = "https://lista.mercadolivre.com.br"
+    item_id_pattern = re.compile(r"MLB-?(\d+)")
+
+    def search_url(self, query: str, page: int) -> str:
+        # ML usa _Desde_XX onde XX = (page-1) * 50 + 1 para páginas > 1
+        query_slug = query.replace(" ", "-")
+        if page == 1:
+            return f"{self.base_url}/{query_slug}_NoIndex_True"
+        offset = (page - 1) * self.items_per_page + 1
+        return f"{self.base_url}/{query_slug}_Desde_{offset}_NoIndex_True"
+
+    def parse_item_id(self, url: str) -> str | None:
+        # Ex: MLB-12345 ou MLB12345 ou p/MLB12345
+        id_match = self.item_id_pattern.search(url)
+        return f"MLB{id_match.group(1)}" if id_match else None
+
+    def extract(
+        self, html: str, source_query: str, execution_id: str, collected_at: datetime,
+    ) -> list[ProductSchema]:
+        """Extrai produtos do HTML da página de busca do Mercado Livre.
+
+        Args:
+            html: HTML bruto da página
+            source_query: Query de busca que gerou essa página
+            execution_id: ID da execução/coleta
+            collected_at: Timestamp da coleta
+
+        Returns:
+            Lista de ProductSchema extraídos e normalizados
+
+        """
+        # bs4 importado no primeiro parse (fora do cold start da API)
+        from bs4 import BeautifulSoup
+
+        products = []
+        started = time.perf_counter()
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Seletores comuns do ML (eles mudam as vezes, por isso mantemos vários padrões)
+        items = soup.find_all("li", {"class": "ui-search-layout__item"})
+
+        # Se não encontrou, tenta outros seletores
+        if not items:
+            items = soup.find_all("div", {"class": "ui-search-result__wrapper"})
+        if not items:
+            items = soup.select(".ui-search-layout__item, .andes-card")
+
+        logger.info(f"Encontrados {len(items)} itens no HTML")
+
+        validation_seconds = 0.0
+        for item in items:
+            try:
+                # Extração resiliente de cada campo
+
+                # Título - novo seletor: a.poly-component__title ou h3 > a
+                title_tag = item.find("a", {"class": "poly-component__title"})
+                if not title_tag:
+                    title_tag = item.find("h2", {"class": "ui-search-item__title"})
+                if not title_tag:
+                    h3 = item.find("h3")
+                    if h3:
+                        title_tag = h3.find("a")
+                if not title_tag:
+                    continue
+
+                title = title_tag.text.strip()
+                url = title_tag.get("href", "")
+
+                item_id = self.parse_item_id(url)
+                if not item_id:
+                    # Se não encontrou ID, pula o item (obrigatório para dedupe)
+                    log_limited(logger, logging.DEBUG, "item_sem_id", "Item sem ID válido, pulando: %s", title[:50])
+                    continue
+
+                # Preço - busca dentro de poly-price__current
+                price = 0.0
+                price_container = item.find("div", {"class": "poly-price__current"})
+                if price_container:
+                    price_tag = price_container.find("span", {"class": "andes-money-amount__fraction"})
+                    if price_tag:
+                        price_text = price_tag.text.replace(".", "").replace(",", ".")
+                        price = float(price_text) if price_text else 0.0
+
+                # Preço original (desconto) - busca s.andes-money-amount ou poly-price__original
+                original_price = None
+                original_container = item.find("s", {"class": "andes-money-amount"})
+                if not original_container:
+                    original_container = item.find("div", {"class": "poly-price__original"})
+                if original_container:
+                    op_fraction = original_container.find("span", {"class": "andes-money-amount__fraction"})
+                    if op_fraction:
+                        original_price = float(op_fraction.text.replace(".", "").replace(",", "."))
+
+                # Calcula percentual de desconto
+                discount_percent = None
+                if original_price and original_price > price:
+                    discount_percent = round(((original_price - price) / original_price) * 100, 2)
+
+                # Imagem - busca img.poly-component__picture
+                img_tag = item.find("img", {"class": "poly-component__picture"})
+                if not img_tag:
+                    img_tag = item.find("img")
+                image_url = img_tag.get("data-src") or img_tag.get("src") if img_tag else None
+
+                # Cria o objeto normalizado usando o Schema
+                validation_started = time.perf_counter()
+                product = ProductSchema(
+                    marketplace=self.name,
+                    item_id=item_id,
+                    url=url,
+                    title=title,
+                    price=price,
+                    original_price=original_price,
+                    discount_percent=discount_percent,
+                    seller=None,  # Difícil pegar na listagem sem entrar no item
+                    image_url=image_url,
+                    source=source_query,
+                    dedupe_key=self.dedupe_key(item_id, price),
+                    execution_id=execution_id,
+                    collected_at=collected_at,
+                    currency=self.currency,
+                )
+                validation_seconds += time.perf_counter() - validation_started
+                products.append(product)
+
+            except Exception as e:
+                log_limited(logger, logging.DEBUG, "erro_item", "Erro ao extrair item: %s", e)
+                continue
+
+        # Uma observação por página: a validação é medida à parte do parse
+        PARSE_SECONDS.observe(time.perf_counter() - started - validation_seconds, marketplace=self.name)
+        VALIDATION_SECONDS.observe(validation_seconds, marketplace=self.name)
+        return products
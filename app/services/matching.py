@@ -0,0 +1,241 @@
+# app/services/matching.py
+"""Matching de anúncios quase duplicados (mesmo produto, item_ids diferentes).
+
+Cada título é normalizado e quebrado em shingles de caracteres; a assinatura
+MinHash estima a similaridade de Jaccard entre títulos e o índice LSH (bandas
+da assinatura) encontra candidatos sem comparar pares de títulos. O índice é
+mantido incrementalmente em SQLite, lote a lote, e cada produto recebe um
+`product_cluster_id` estável.
+"""
+import hashlib
+import operator
+import os
+import random
+import re
+import sqlite3
+import struct
+import time
+import unicodedata
+from array import array
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import ProductSchema
+
+logger = get_logger(__name__)
+
+_PRIME = (1 << 61) - 1  # Primo de Mersenne, mantém os hashes em 64 bits
+_SHINGLE_SIZE = 4
+
+
+def normalize_title(title: str) -> str:
+    """Remove acentos, pontuação e caixa do título."""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") % _PRIME
+
+
+def shingles(title: str, size: int = _SHINGLE_SIZE) -> set[str]:
+    """Shingles de caracteres do título normalizado."""
+    text = normalize_title(title)
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """Gera assinaturas MinHash com permutações (a*x + b) mod p determinísticas."""
+
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, tokens: set[str]) -> tuple[int, ...]:
+        hashes = [_hash64(t.encode()) for t in tokens]
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.params)
+
+
+def signature_similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimativa da similaridade de Jaccard a partir das assinaturas."""
+    return sum(map(operator.eq, sig_a, sig_b)) / len(sig_a)
+
+
+class ProductMatcher:
+    """Índice MinHash/LSH incremental que atribui product_cluster_id aos produtos."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.MATCHING_PATH or os.path.join(settings.DATA_DIR, "matching.db")
+        self.bands = settings.LSH_BANDS
+        self.rows = settings.MINHASH_PERMUTATIONS // self.bands
+        self.hasher = MinHasher(num_perm=self.bands * self.rows)
+        self.threshold = settings.MATCH_THRESHOLD
+        self.price_tolerance = settings.MATCH_PRICE_TOLERANCE
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS item_clusters (
+                    item_id TEXT PRIMARY KEY,
+                    cluster_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    url TEXT NOT NULL,
+                    image_url TEXT,
+                    signature BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_item_clusters_cluster ON item_clusters (cluster_id, price)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    bucket TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    PRIMARY KEY (bucket, item_id)
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _buckets(self, product: ProductSchema, signature: tuple[int, ...]) -> list[str]:
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f"<{len(rows)}Q", *rows), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        # Mesma imagem é um sinal forte de mesmo produto, independente do título
+        if product.image_url and not product.image_url.startswith("data:"):
+            keys.append(f"img:{hashlib.blake2b(product.image_url.encode(), digest_size=8).hexdigest()}")
+        return keys
+
+    def _match_score(self, price: float, signature: tuple[int, ...], candidate: dict, same_image: bool) -> float:
+        """Similaridade com o candidato, ou 0.0 se não for o mesmo produto."""
+        low, high = sorted((price, candidate["price"]))
+        if high > 0 and (high - low) / high > self.price_tolerance:
+            return 0.0
+        if same_image:
+            return 1.0
+        score = signature_similarity(signature, candidate["signature"])
+        return score if score >= self.threshold else 0.0
+
+    def assign_clusters(self, products: list[ProductSchema]) -> int:
+        """Atribui product_cluster_id a cada produto e atualiza o índice.
+
+        Args:
+            products: Produtos do lote (já deduplicados)
+
+        Returns:
+            Quantidade de clusters novos criados
+
+        """
+        if not products:
+            return 0
+
+        signatures = [self.hasher.signature(shingles(p.title)) for p in products]
+        bucket_keys = [self._buckets(p, sig) for p, sig in zip(products, signatures)]
+        new_clusters = 0
+        now = time.time()
+
+        with self._connect() as conn:
+            # Carrega buckets e itens candidatos do lote inteiro de uma vez
+            buckets: dict[str, set[str]] = {}
+            all_keys = list({key for keys in bucket_keys for key in keys})
+            for i in range(0, len(all_keys), 500):
+                chunk = all_keys[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for bucket, item_id in conn.execute(
+                    f"SELECT bucket, item_id FROM lsh_buckets WHERE bucket IN ({placeholders})", chunk,
+                ):
+                    buckets.setdefault(bucket, set()).add(item_id)
+
+            candidate_ids = list({item_id for ids in buckets.values() for item_id in ids}
+                                 | {p.item_id for p in products})
+            known: dict[str, dict] = {}
+            for i in range(0, len(candidate_ids), 500):
+                chunk = candidate_ids[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for item_id, cluster_id, price, image_url, signature in conn.execute(
+                    f"SELECT item_id, cluster_id, price, image_url, signature FROM item_clusters "
+                    f"WHERE item_id IN ({placeholders})",
+                    chunk,
+                ):
+                    known[item_id] = {
+                        "cluster_id": cluster_id,
+                        "price": price,
+                        "image_url": image_url,
+                        "signature": tuple(array("Q", signature)),
+                    }
+
+            for product, signature, keys in zip(products, signatures, bucket_keys):
+                price = float(product.price)
+                existing = known.get(product.item_id)
+
+                if existing is not None:
+                    cluster_id = existing["cluster_id"]
+                else:
+                    # Um mesmo candidato costuma cair em várias bandas: avalia cada um uma vez
+                    candidates: dict[str, bool] = {}
+                    for key in keys:
+                        same_image = key.startswith("img:")
+                        for candidate_id in buckets.get(key, ()):
+                            candidates[candidate_id] = candidates.get(candidate_id, False) or same_image
+
+                    cluster_id = None
+                    best = 0.0
+                    for candidate_id, same_image in candidates.items():
+                        candidate = known.get(candidate_id)
+                        if candidate is None:
+                            continue
+                        score = self._match_score(price, signature, candidate, same_image)
+                        if score > best:
+                            best, cluster_id = score, candidate["cluster_id"]
+
+                    if cluster_id is None:
+                        cluster_id = f"pc_{product.item_id}"
+                        new_clusters += 1
+
+                product.product_cluster_id = cluster_id
+                known[product.item_id] = {
+                    "cluster_id": cluster_id,
+                    "price": price,
+                    "image_url": product.image_url,
+                    "signature": signature,
+                }
+                for key in keys:
+                    buckets.setdefault(key, set()).add(product.item_id)
+
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO item_clusters
+                        (item_id, cluster_id, title, price, url, image_url, signature, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (product.item_id, cluster_id, product.title, price, product.url,
+                     product.image_url, array("Q", signature).tobytes(), now),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO lsh_buckets (bucket, item_id) VALUES (?, ?)",
+                    [(key, product.item_id) for key in keys],
+                )
+
+        logger.info(f"[MATCHING] {len(products)} produtos agrupados, {new_clusters} clusters novos")
+        return new_clusters
+
+    def get_cluster(self, cluster_id: str) -> list[dict]:
+        """Ofertas do cluster ordenadas do menor para o maior preço."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_id, title, price, url, image_url, updated_at FROM item_clusters "
+                "WHERE cluster_id = ? ORDER BY price",
+                (cluster_id,),
+            ).fetchall()
+        return [
+            {"item_id": item_id, "title": title, "price": price, "url": url,
+             "image_url": image_url, "updated_at": updated_at}
+            for item_id, title, price, url, image_url, updated_at in rows
+        ]
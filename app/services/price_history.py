@@ -0,0 +1,209 @@
+# app/services/price_history.py
+"""Motor de diff de preços e histórico por item.
+
+Mantém o último preço visto de cada item_id num índice local e, a cada lote
+coletado, emite eventos estruturados (novo item, mudança de preço, volta ao
+estoque) com os valores antigo e novo. Detectar promoções passa a custar
+O(itens alterados), sem self-joins na tabela `promotions`.
+"""
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import PriceEvent, ProductSchema
+
+logger = get_logger(__name__)
+
+EVENT_NEW_ITEM = "new_item"
+EVENT_PRICE_CHANGED = "price_changed"
+EVENT_BACK_IN_STOCK = "back_in_stock"
+
+
+def _to_iso(value: datetime) -> str:
+    """Serializa em UTC com precisão fixa (mantém a ordenação lexicográfica)."""
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+class PriceHistoryService:
+    """Índice de último preço por item_id + tabela compacta de eventos (SQLite)."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.PRICE_HISTORY_PATH or os.path.join(settings.DATA_DIR, "price_history.db")
+        self.back_in_stock_after = timedelta(hours=settings.BACK_IN_STOCK_HOURS)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS last_seen (
+                    item_id TEXT PRIMARY KEY,
+                    price REAL NOT NULL,
+                    last_seen_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_type TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    old_price REAL,
+                    new_price REAL NOT NULL,
+                    title TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    execution_id TEXT NOT NULL,
+                    occurred_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_price_events_item ON price_events (item_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_price_events_time ON price_events (occurred_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def process(self, products: list[ProductSchema]) -> list[PriceEvent]:
+        """Compara o lote com o último preço conhecido e registra os eventos.
+
+        Args:
+            products: Produtos coletados (na ordem de coleta)
+
+        Returns:
+            Lista de eventos emitidos para o lote
+
+        """
+        if not products:
+            return []
+
+        events = []
+        with self._connect() as conn:
+            # Leitura e escrita na mesma transação de escrita: tasks/workers
+            # concorrentes não leem o mesmo preço anterior (eventos duplicados)
+            conn.execute("BEGIN IMMEDIATE")
+            item_ids = list({p.item_id for p in products})
+            last_seen = {}
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+            for i in range(0, len(item_ids), 500):
+                chunk = item_ids[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for item_id, price, seen_at in conn.execute(
+                    f"SELECT item_id, price, last_seen_at FROM last_seen WHERE item_id IN ({placeholders})",
+                    chunk,
+                ):
+                    last_seen[item_id] = (price, datetime.fromisoformat(seen_at))
+
+            for p in products:
+                price = float(p.price)
+                previous = last_seen.get(p.item_id)
+
+                event_type = None
+                old_price = None
+                if previous is None:
+                    event_type = EVENT_NEW_ITEM
+                else:
+                    old_price, seen_at = previous
+                    if p.collected_at - seen_at >= self.back_in_stock_after:
+                        event_type = EVENT_BACK_IN_STOCK
+                    elif old_price != price:
+                        event_type = EVENT_PRICE_CHANGED
+
+                last_seen[p.item_id] = (price, p.collected_at)
+                if event_type is None:
+                    continue
+
+                events.append(PriceEvent(
+                    event_type=event_type,
+                    item_id=p.item_id,
+                    old_price=old_price,
+                    new_price=price,
+                    title=p.title,
+                    url=p.url,
+                    source=p.source,
+                    execution_id=p.execution_id,
+                    occurred_at=p.collected_at,
+                ))
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO last_seen (item_id, price, last_seen_at) VALUES (?, ?, ?)",
+                [(item_id, price, _to_iso(seen_at)) for item_id, (price, seen_at) in last_seen.items()],
+            )
+            conn.executemany(
+                """
+                INSERT INTO price_events
+                    (event_type, item_id, old_price, new_price, title, url, source, execution_id, occurred_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (e.event_type, e.item_id, e.old_price, e.new_price, e.title, e.url,
+                     e.source, e.execution_id, _to_iso(e.occurred_at))
+                    for e in events
+                ],
+            )
+
+        logger.info(f"[HISTORICO] {len(events)} eventos de preço emitidos para {len(products)} produtos")
+        return events
+
+    def touch(self, products: list[ProductSchema]) -> None:
+        """Atualiza last_seen_at de itens vistos sem mudança de preço.
+
+        No modo incremental esses itens não chegam a `process` (não são
+        persistidos); sem o toque, a próxima mudança de preço de um item que
+        continuou anunciado seria reportada como volta ao estoque.
+        """
+        if not products:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE last_seen SET last_seen_at = ? WHERE item_id = ? AND last_seen_at < ?",
+                [(_to_iso(p.collected_at), p.item_id, _to_iso(p.collected_at)) for p in products],
+            )
+
+    def get_events(
+        self,
+        since: datetime | None = None,
+        event_type: str | None = None,
+        item_id: str | None = None,
+        limit: int = 100,
+    ) -> list[PriceEvent]:
+        """Retorna os eventos mais recentes, com filtros opcionais."""
+        clauses = []
+        args: list = []
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            clauses.append("occurred_at >= ?")
+            args.append(_to_iso(since))
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            args.append(event_type)
+        if item_id is not None:
+            clauses.append("item_id = ?")
+            args.append(item_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT event_type, item_id, old_price, new_price, title, url, source, execution_id, occurred_at
+                FROM price_events {where}
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (*args, limit),
+            ).fetchall()
+
+        return [
+            PriceEvent(
+                event_type=row_event_type,
+                item_id=row_item_id,
+                old_price=old_price,
+                new_price=new_price,
+                title=title,
+                url=url,
+                source=source,
+                execution_id=execution_id,
+                occurred_at=datetime.fromisoformat(occurred_at),
+            )
+            for row_event_type, row_item_id, old_price, new_price, title, url, source, execution_id, occurred_at in rows
+        ]
@@ -0,0 +1,282 @@
+# app/services/profiling.py
+"""Profiling opcional por task de coleta.
+
+Uma task perfilada (`profile` no request ou sorteada por PROFILE_SAMPLE_RATE)
+roda sob um de dois perfis:
+- sampling: uma thread amostra a pilha da task a cada PROFILE_INTERVAL_MS
+  (overhead baixo, inclui esperas como sleeps e I/O do BigQuery) e grava as
+  pilhas no formato "folded" (flamegraph.pl, speedscope, inferno)
+- deterministic: cProfile (todas as chamadas; overhead maior), gravado como .pstats.
+  Só uma task por processo: a partir do Python 3.12 o cProfile usa o
+  sys.monitoring, global no processo, e recusa um segundo profiler ativo. As
+  demais tasks (ou outro profiler já ativo) caem para o modo sampling.
+
+Com PROFILE_TRACEMALLOC, tracemalloc registra as alocações feitas durante a
+task (diferença entre snapshots do início e do fim). Os artefatos ficam em
+{DATA_DIR}/profiles/{task_id} e expiram após PROFILE_TTL_HOURS.
+
+O perfil cobre a thread da task; threads auxiliares (coleta paralela de
+marketplaces) e processos worker não são amostrados.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_MODES = ("sampling", "deterministic")
+
+# artefato -> (arquivo, media type)
+PROFILE_ARTIFACTS = {
+    "stacks": ("stacks.folded", "text/plain"),
+    "pstats": ("profile.pstats", "application/octet-stream"),
+    "allocations": ("allocations.txt", "text/plain"),
+}
+
+TOP_ENTRIES = 25
+
+# tracemalloc é global no processo: tasks perfiladas em paralelo compartilham o tracing
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+# cProfile é exclusivo no processo (sys.monitoring no 3.12+): uma task determinística por vez
+_deterministic_lock = threading.Lock()
+
+
+def should_profile(requested: bool) -> bool:
+    """Se a task deve ser perfilada (pedido explícito ou amostragem global)."""
+    return requested or (settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(";", ",").replace(" ", "_")
+
+
+class _StackSampler(threading.Thread):
+    """Amostra periodicamente a pilha de uma thread (pilhas "folded" -> contagem)."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="task-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class TaskProfiler:
+    """Context manager que perfila o bloco e grava os artefatos da task."""
+
+    def __init__(self, task_id: str, mode: str | None = None, store: "ProfileStore | None" = None):
+        self.task_id = task_id
+        self.mode = mode or settings.PROFILE_MODE
+        if self.mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling inválido: '{self.mode}' (use {', '.join(PROFILE_MODES)})")
+        self.store = store or ProfileStore()
+        self._sampler: _StackSampler | None = None
+        self._profile: cProfile.Profile | None = None
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._started = 0.0
+
+    def __enter__(self) -> "TaskProfiler":
+        global _tracemalloc_users
+        if settings.PROFILE_TRACEMALLOC:
+            with _tracemalloc_lock:
+                if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+                _tracemalloc_users += 1
+            self._baseline = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+
+        self._started = time.perf_counter()
+        if self.mode == "deterministic":
+            self._profile = self._start_deterministic()
+            if self._profile is None:
+                self.mode = "sampling"
+        if self.mode == "sampling":
+            self._sampler = _StackSampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+            self._sampler.start()
+
+        logger.info(f"[PROFILE] Task {self.task_id} perfilada ({self.mode})")
+        return self
+
+    def _start_deterministic(self) -> cProfile.Profile | None:
+        """Ativa o cProfile, ou None se outra task (ou ferramenta) já perfila o processo."""
+        if not _deterministic_lock.acquire(blocking=False):
+            logger.warning(f"[PROFILE] Outra task já usa o perfil determinístico; task {self.task_id} usa sampling")
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # "Another profiling tool is already active" (3.12+)
+            _deterministic_lock.release()
+            logger.warning(f"[PROFILE] cProfile indisponível ({e}); task {self.task_id} usa sampling")
+            return None
+        return profile
+
+    def __exit__(self, *exc) -> None:
+        global _tracemalloc_users
+        duration = time.perf_counter() - self._started
+        if self._sampler:
+            self._sampler.stop()
+        if self._profile:
+            self._profile.disable()
+            _deterministic_lock.release()
+
+        snapshot = None
+        peak = None
+        if self._baseline is not None:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0:
+                    tracemalloc.stop()
+
+        # Falha ao gravar o perfil não deve mudar o resultado da task
+        try:
+            self.store.save(self.task_id, self._summary(duration, snapshot, peak), self._sampler, self._profile,
+                            self._allocations_text(snapshot))
+        except Exception as e:
+            logger.warning(f"[PROFILE] Falha ao gravar o perfil da task {self.task_id}: {e}")
+
+    def _summary(self, duration: float, snapshot, peak: int | None) -> dict:
+        summary = {
+            "task_id": self.task_id,
+            "mode": self.mode,
+            "duration_seconds": round(duration, 3),
+            "samples": None,
+            "top_functions": [],
+            "top_allocations": [],
+            "peak_traced_memory_mb": round(peak / 1024 / 1024, 2) if peak is not None else None,
+        }
+
+        if self._sampler:
+            # Tempo próprio por função: a folha de cada pilha amostrada
+            leaves: Counter = Counter()
+            for stack, count in self._sampler.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            total = sum(leaves.values())
+            summary["samples"] = total
+            summary["top_functions"] = [
+                {"function": name, "samples": count, "percent": round(100 * count / total, 1)}
+                for name, count in leaves.most_common(TOP_ENTRIES)
+            ]
+        elif self._profile:
+            stats = pstats.Stats(self._profile).stats
+            ranked = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:TOP_ENTRIES]
+            summary["top_functions"] = [
+                {
+                    "function": f"{os.path.basename(filename)}:{line}:{name}",
+                    "calls": calls,
+                    "total_seconds": round(tottime, 4),
+                    "cumulative_seconds": round(cumtime, 4),
+                }
+                for (filename, line, name), (_, calls, tottime, cumtime, _) in ranked
+            ]
+
+        if snapshot is not None:
+            summary["top_allocations"] = [
+                {"location": str(stat.traceback[0]), "size_kb": round(stat.size_diff / 1024, 1), "count": stat.count_diff}
+                for stat in self._allocation_stats(snapshot)
+            ]
+        return summary
+
+    def _allocation_stats(self, snapshot) -> list:
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        return [s for s in stats if s.size_diff > 0][:TOP_ENTRIES]
+
+    def _allocations_text(self, snapshot) -> str | None:
+        if snapshot is None:
+            return None
+        lines = [f"Alocações durante a task {self.task_id} (diferença início/fim, por linha)", ""]
+        for stat in snapshot.compare_to(self._baseline, "traceback")[:TOP_ENTRIES]:
+            if stat.size_diff <= 0:
+                continue
+            lines.append(f"{stat.size_diff / 1024:.1f} KiB em {stat.count_diff} blocos")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+        return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Diretório de artefatos de profiling por task, com expiração por TTL."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or settings.PROFILE_DIR or os.path.join(settings.DATA_DIR, "profiles")
+        os.makedirs(self.directory, exist_ok=True)
+        self.purge_expired()
+
+    def _task_dir(self, task_id: str) -> str:
+        return os.path.join(self.directory, task_id)
+
+    def save(self, task_id: str, summary: dict, sampler, profile, allocations: str | None) -> None:
+        task_dir = self._task_dir(task_id)
+        os.makedirs(task_dir, exist_ok=True)
+
+        artifacts = []
+        if sampler is not None:
+            with open(os.path.join(task_dir, PROFILE_ARTIFACTS["stacks"][0]), "w") as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            artifacts.append("stacks")
+        if profile is not None:
+            profile.dump_stats(os.path.join(task_dir, PROFILE_ARTIFACTS["pstats"][0]))
+            artifacts.append("pstats")
+        if allocations is not None:
+            with open(os.path.join(task_dir, PROFILE_ARTIFACTS["allocations"][0]), "w") as f:
+                f.write(allocations)
+            artifacts.append("allocations")
+
+        summary["artifacts"] = artifacts
+        with open(os.path.join(task_dir, "summary.json"), "w") as f:
+            json.dump(summary, f)
+        logger.info(f"[PROFILE] Perfil da task {task_id} gravado ({', '.join(artifacts)})")
+
+    def load_summary(self, task_id: str) -> dict | None:
+        path = os.path.join(self._task_dir(task_id), "summary.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def artifact_path(self, task_id: str, artifact: str) -> str | None:
+        """Caminho do artefato da task (None se não existir)."""
+        filename = PROFILE_ARTIFACTS[artifact][0]
+        path = os.path.join(self._task_dir(task_id), filename)
+        return path if os.path.exists(path) else None
+
+    def purge_expired(self) -> None:
+        """Remove perfis mais antigos que PROFILE_TTL_HOURS."""
+        cutoff = time.time() - settings.PROFILE_TTL_HOURS * 3600
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                continue
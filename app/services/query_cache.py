@@ -0,0 +1,81 @@
+# app/services/query_cache.py
+"""Cache de resultados de consultas de leitura do BigQuery (TTL + LRU).
+
+As leituras (`get_recent_products`, `get_stats`) são cobradas e levam segundos;
+refreshes repetidos de dashboard passam a ser servidos da memória. Entradas são
+invalidadas quando `insert_products` carrega linhas na janela afetada.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Cache LRU com expiração por entrada, thread-safe."""
+
+    def __init__(self, max_entries: int | None = None, ttl_seconds: float | None = None):
+        self.max_entries = max_entries or settings.QUERY_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.QUERY_CACHE_TTL_SECONDS
+        self._lock = threading.Lock()
+        # chave -> (expira_em, início da janela coberta pela consulta, valor)
+        self._entries: OrderedDict[Hashable, tuple[float, datetime | None, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, window_start: datetime | None = None) -> None:
+        """Armazena um valor. window_start=None significa que cobre a tabela inteira."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, window_start, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], window_start: datetime | None = None) -> Any:
+        """Retorna do cache ou executa o loader e armazena o resultado."""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.set(key, value, window_start=window_start)
+        return value
+
+    def invalidate_window(self, newest: datetime) -> int:
+        """Remove entradas cuja janela inclui linhas com collected_at até `newest`.
+
+        Returns:
+            Quantidade de entradas removidas
+
+        """
+        with self._lock:
+            stale = [
+                key for key, (_, window_start, _) in self._entries.items()
+                if window_start is None or window_start <= newest
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache compartilhado entre instâncias de BigQueryService (uma por requisição/task)
+query_cache = TTLCache()
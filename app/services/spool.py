@@ -0,0 +1,95 @@
+# app/services/spool.py
+"""Spool de produtos com memória limitada para a persistência em chunks.
+
+Produtos são guardados serializados (NDJSON) em memória até o orçamento da
+task; ao ultrapassá-lo, o conteúdo é despejado num arquivo local append-only e
+as próximas entradas vão direto para o disco. A leitura devolve chunks de
+tamanho fixo, de modo que o pico de memória independe do tamanho do job.
+"""
+import os
+import tempfile
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import ProductSchema
+
+logger = get_logger(__name__)
+
+
+class ProductSpool:
+    """Buffer append-only de produtos com despejo em disco."""
+
+    def __init__(self, memory_budget_bytes: int | None = None, spool_dir: str | None = None):
+        self.memory_budget_bytes = memory_budget_bytes or settings.TASK_MEMORY_BUDGET_MB * 1024 * 1024
+        self.spool_dir = spool_dir or os.path.join(settings.DATA_DIR, "spool")
+        self.count = 0
+
+        self._lines: list[bytes] = []
+        self._buffered_bytes = 0
+        self._file = None
+        self._path: str | None = None
+
+    def __enter__(self) -> "ProductSpool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def append(self, product: ProductSchema) -> None:
+        line = product.model_dump_json().encode() + b"\n"
+        self.count += 1
+
+        if self._file is not None:
+            self._file.write(line)
+            return
+
+        self._lines.append(line)
+        self._buffered_bytes += len(line)
+        if self._buffered_bytes > self.memory_budget_bytes:
+            self._spill()
+
+    def _spill(self) -> None:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        fd, self._path = tempfile.mkstemp(suffix=".ndjson", dir=self.spool_dir)
+        self._file = os.fdopen(fd, "wb")
+        self._file.writelines(self._lines)
+
+        logger.info(f"[SPOOL] Orçamento de memória excedido, {len(self._lines)} produtos despejados em disco")
+        self._lines = []
+        self._buffered_bytes = 0
+
+    def iter_chunks(self, chunk_size: int | None = None) -> Iterator[list[ProductSchema]]:
+        """Itera os produtos em chunks de até chunk_size, na ordem de inserção."""
+        chunk_size = chunk_size or settings.PERSIST_CHUNK_SIZE
+        chunk: list[ProductSchema] = []
+
+        if self._file is not None:
+            self._file.flush()
+            lines = open(self._path, "rb")
+        else:
+            lines = iter(self._lines)
+
+        try:
+            for line in lines:
+                chunk.append(ProductSchema.model_validate_json(line))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            if self._file is not None:
+                lines.close()
+
+    def close(self) -> None:
+        """Libera o buffer e remove o arquivo de spool."""
+        self._lines = []
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._path)
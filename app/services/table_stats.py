@@ -0,0 +1,265 @@
+# app/services/table_stats.py
+"""Estatísticas da tabela `promotions` mantidas incrementalmente.
+
+Cada `insert_products` bem-sucedido atualiza contadores (total, soma de preços,
+produtos em promoção, primeira/última coleta) e sketches HyperLogLog para as
+contagens distintas de item_id e execution_id. Ler as estatísticas passa a ser
+O(1), independente do tamanho da tabela; uma recomputação completa periódica
+(STATS_RECONCILE_HOURS) corrige eventuais desvios.
+
+A recomputação roda em background e pode levar minutos: `begin_reconcile`
+abre um acumulador de deltas antes do scan, `apply_rows` também soma nele
+os loads que chegam durante o scan e `replace` os reaplica sobre o resultado
+do scan na mesma transação.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog para contagem aproximada de distintos (~1.6% de erro com p=12)."""
+
+    def __init__(self, precision: int = 12, registers: bytes | None = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    def add(self, value: str) -> None:
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Correção para cardinalidades pequenas (linear counting)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """União com outro sketch de mesma precisão (máximo por registrador)."""
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+def _earliest(a: str | None, b: str | None) -> str | None:
+    if a is None or b is None:
+        return a or b
+    return a if datetime.fromisoformat(a) <= datetime.fromisoformat(b) else b
+
+
+def _latest(a: str | None, b: str | None) -> str | None:
+    if a is None or b is None:
+        return a or b
+    return a if datetime.fromisoformat(a) >= datetime.fromisoformat(b) else b
+
+
+def _accumulate(current: tuple, rows: list[dict]) -> tuple:
+    """Soma as linhas a um estado (total, soma de preços, em promoção, primeira, última, HLLs)."""
+    total, sum_price, on_sale, first, last, hll_items, hll_executions = current
+    items = HyperLogLog(registers=hll_items)
+    executions = HyperLogLog(registers=hll_executions)
+    for row in rows:
+        total += 1
+        sum_price += row["price"]
+        if row["discount_percent"] is not None:
+            on_sale += 1
+        items.add(row["item_id"])
+        executions.add(row["execution_id"])
+        first = _earliest(first, row["collected_at"])
+        last = _latest(last, row["collected_at"])
+    return total, sum_price, on_sale, first, last, items.to_bytes(), executions.to_bytes()
+
+
+class TableStatsStore:
+    """Contadores e sketches por tabela, persistidos em SQLite."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.TABLE_STATS_PATH or os.path.join(settings.DATA_DIR, "table_stats.db")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS table_stats (
+                    table_id TEXT PRIMARY KEY,
+                    total_products INTEGER NOT NULL,
+                    sum_price REAL NOT NULL,
+                    products_on_sale INTEGER NOT NULL,
+                    first_collection TEXT,
+                    last_collection TEXT,
+                    hll_items BLOB NOT NULL,
+                    hll_executions BLOB NOT NULL,
+                    reconciled_at REAL NOT NULL
+                )
+            """)
+            # Deltas dos loads feitos durante uma recomputação em andamento
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS table_stats_pending (
+                    table_id TEXT PRIMARY KEY,
+                    total_products INTEGER NOT NULL,
+                    sum_price REAL NOT NULL,
+                    products_on_sale INTEGER NOT NULL,
+                    first_collection TEXT,
+                    last_collection TEXT,
+                    hll_items BLOB NOT NULL,
+                    hll_executions BLOB NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, table_id: str) -> dict | None:
+        """Estatísticas no mesmo formato de BigQueryService.get_stats (None se nunca calculadas)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT total_products, sum_price, products_on_sale, first_collection, last_collection, "
+                "hll_items, hll_executions FROM table_stats WHERE table_id = ?",
+                (table_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        total, sum_price, on_sale, first, last, hll_items, hll_executions = row
+        return {
+            "total_products": total,
+            "unique_items": HyperLogLog(registers=hll_items).count(),
+            "total_executions": HyperLogLog(registers=hll_executions).count(),
+            "first_collection": datetime.fromisoformat(first) if first else None,
+            "last_collection": datetime.fromisoformat(last) if last else None,
+            "avg_price": sum_price / total if total else None,
+            "products_on_sale": on_sale,
+        }
+
+    def needs_reconcile(self, table_id: str) -> bool:
+        """True se nunca houve recomputação completa ou se a última passou do intervalo."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT reconciled_at FROM table_stats WHERE table_id = ?", (table_id,),
+            ).fetchone()
+        if row is None:
+            return True
+        interval = settings.STATS_RECONCILE_HOURS * 3600
+        return interval > 0 and time.time() - row[0] > interval
+
+    def begin_reconcile(self, table_id: str) -> None:
+        """Abre o acumulador de deltas (chamado antes do scan da recomputação)."""
+        empty = bytes(HyperLogLog().registers)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO table_stats_pending (table_id, total_products, sum_price, products_on_sale, "
+                "first_collection, last_collection, hll_items, hll_executions, started_at) "
+                "VALUES (?, 0, 0, 0, NULL, NULL, ?, ?, ?)",
+                (table_id, empty, empty, time.time()),
+            )
+
+    def apply_rows(self, table_id: str, rows: list[dict]) -> None:
+        """Incorpora linhas recém-carregadas aos contadores (chamado após o LOAD JOB)."""
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("table_stats", "table_stats_pending"):
+                    current = conn.execute(
+                        "SELECT total_products, sum_price, products_on_sale, first_collection, last_collection, "
+                        f"hll_items, hll_executions FROM {table} WHERE table_id = ?",
+                        (table_id,),
+                    ).fetchone()
+                    # Sem base reconciliada (nem recomputação em andamento): a próxima
+                    # leitura fará a recomputação completa
+                    if current is None:
+                        continue
+                    conn.execute(
+                        f"""
+                        UPDATE {table}
+                        SET total_products = ?, sum_price = ?, products_on_sale = ?, first_collection = ?,
+                            last_collection = ?, hll_items = ?, hll_executions = ?
+                        WHERE table_id = ?
+                        """,
+                        (*_accumulate(current, rows), table_id),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def replace(
+        self,
+        table_id: str,
+        aggregates: dict,
+        item_ids: Iterable[str],
+        execution_ids: Iterable[str],
+    ) -> None:
+        """Substitui os contadores pelo resultado de uma recomputação completa,
+        somando os deltas dos loads feitos durante o scan (ver begin_reconcile).
+        """
+        items = HyperLogLog()
+        items.update(item_ids)
+        executions = HyperLogLog()
+        executions.update(execution_ids)
+
+        total = aggregates.get("total_products") or 0
+        avg_price = aggregates.get("avg_price")
+        sum_price = float(avg_price) * total if avg_price is not None else 0.0
+        on_sale = aggregates.get("products_on_sale") or 0
+        first = aggregates.get("first_collection")
+        last = aggregates.get("last_collection")
+        first = first.isoformat() if first else None
+        last = last.isoformat() if last else None
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT total_products, sum_price, products_on_sale, first_collection, last_collection, "
+                    "hll_items, hll_executions FROM table_stats_pending WHERE table_id = ?",
+                    (table_id,),
+                ).fetchone()
+                if pending is not None:
+                    delta_total, delta_sum, delta_on_sale, delta_first, delta_last, delta_items, delta_executions = pending
+                    total += delta_total
+                    sum_price += delta_sum
+                    on_sale += delta_on_sale
+                    first = _earliest(first, delta_first)
+                    last = _latest(last, delta_last)
+                    items.merge(HyperLogLog(registers=delta_items))
+                    executions.merge(HyperLogLog(registers=delta_executions))
+                    conn.execute("DELETE FROM table_stats_pending WHERE table_id = ?", (table_id,))
+
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO table_stats
+                        (table_id, total_products, sum_price, products_on_sale, first_collection,
+                         last_collection, hll_items, hll_executions, reconciled_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (table_id, total, sum_price, on_sale, first, last, items.to_bytes(), executions.to_bytes(),
+                     time.time()),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"[STATS] Estatísticas de {table_id} reconciliadas ({total} linhas)")
@@ -0,0 +1,211 @@
+# app/services/task_export.py
+"""Armazenamento local dos produtos de cada task para export em streaming.
+
+Os produtos de uma coleta são gravados em um arquivo Parquet por task (um row
+group por chunk da persistência, compressão zstd) em {DATA_DIR}/exports. O
+arquivo só fica visível depois que a coleta termina e expira após
+TASK_EXPORT_TTL_HOURS. A leitura percorre os row groups um a um, então o export
+nunca materializa a task inteira em memória.
+"""
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.schemas.product import ProductSchema
+
+logger = get_logger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+# Tamanho dos chunks lidos do disco ao servir o Parquet já pronto
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("marketplace", pa.string()),
+        ("item_id", pa.string()),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("price", pa.float64()),
+        ("original_price", pa.float64()),
+        ("discount_percent", pa.float64()),
+        ("seller", pa.string()),
+        ("image_url", pa.string()),
+        ("source", pa.string()),
+        ("sources", pa.list_(pa.string())),
+        ("product_cluster_id", pa.string()),
+        ("dedupe_key", pa.string()),
+        ("execution_id", pa.string()),
+        ("collected_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def _to_row(p: ProductSchema) -> dict:
+    return {
+        "marketplace": p.marketplace,
+        "item_id": p.item_id,
+        "url": p.url,
+        "title": p.title,
+        "price": float(p.price),
+        "original_price": float(p.original_price) if p.original_price is not None else None,
+        "discount_percent": float(p.discount_percent) if p.discount_percent is not None else None,
+        "seller": p.seller,
+        "image_url": p.image_url,
+        "source": p.source,
+        "sources": p.sources or [],
+        "product_cluster_id": p.product_cluster_id,
+        "dedupe_key": p.dedupe_key,
+        "execution_id": p.execution_id,
+        "collected_at": p.collected_at,
+    }
+
+
+class TaskExportWriter:
+    """Grava os chunks de uma task; o arquivo final aparece apenas em close()."""
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.count = 0
+        self._tmp_path = f"{path}.partial"
+        self._schema = _arrow_schema()
+        self._writer = pq.ParquetWriter(self._tmp_path, self._schema, compression="zstd")
+
+    def __enter__(self) -> "TaskExportWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, products: list[ProductSchema]) -> None:
+        import pyarrow as pa
+
+        if not products:
+            return
+        table = pa.Table.from_pylist([_to_row(p) for p in products], schema=self._schema)
+        self._writer.write_table(table)  # Um row group por chunk
+        self.count += len(products)
+
+    def close(self) -> None:
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        logger.debug(f"[EXPORT] {self.count} produtos gravados em {self.path}")
+
+    def abort(self) -> None:
+        """Descarta o arquivo parcial (a task falhou)."""
+        self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class TaskExportStore:
+    """Diretório de arquivos Parquet por task, com expiração por TTL."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or settings.TASK_EXPORT_DIR or os.path.join(settings.DATA_DIR, "exports")
+        os.makedirs(self.directory, exist_ok=True)
+        self.purge_expired()
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.directory, f"{task_id}.parquet")
+
+    def open_writer(self, task_id: str) -> TaskExportWriter:
+        """Abre o writer da task (uma retomada substitui o arquivo anterior)."""
+        return TaskExportWriter(self._path(task_id))
+
+    def exists(self, task_id: str) -> bool:
+        return os.path.exists(self._path(task_id))
+
+    def iter_export(self, task_id: str, fmt: str, compress: bool = True) -> Iterator[bytes]:
+        """Gera o export da task em chunks.
+
+        Args:
+            task_id: ID da task
+            fmt: ndjson, csv ou parquet
+            compress: Comprime ndjson/csv com gzip (o Parquet já usa zstd internamente)
+
+        """
+        path = self._path(task_id)
+        if fmt == "parquet":
+            yield from _iter_file(path)
+            return
+        if fmt == "ndjson":
+            chunks = _iter_ndjson(path)
+        elif fmt == "csv":
+            chunks = _iter_csv(path)
+        else:
+            raise ValueError(f"Formato de export não suportado: {fmt}")
+
+        yield from _gzip(chunks) if compress else chunks
+
+    def purge_expired(self) -> None:
+        """Remove exports mais antigos que TASK_EXPORT_TTL_HOURS."""
+        cutoff = time.time() - settings.TASK_EXPORT_TTL_HOURS * 3600
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue  # Removido por outra task em paralelo
+
+        if removed:
+            logger.info(f"[EXPORT] {removed} exports expirados removidos")
+
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_BYTES):
+            yield chunk
+
+
+def _iter_rows(path: str) -> Iterator[list[dict]]:
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for i in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(i).to_pylist()
+
+
+def _iter_ndjson(path: str) -> Iterator[bytes]:
+    for rows in _iter_rows(path):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows).encode()
+
+
+def _iter_csv(path: str) -> Iterator[bytes]:
+    fieldnames = _arrow_schema().names
+    header = True
+    for rows in _iter_rows(path):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        if header:
+            writer.writeheader()
+            header = False
+        for row in rows:
+            row["sources"] = "|".join(row["sources"] or [])
+            writer.writerow(row)
+        yield buffer.getvalue().encode()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,184 @@
+# app/services/throttle.py
+"""Controle adaptativo de concorrência/taxa por host (AIMD).
+
+Substitui o delay fixo escolhido pelo chamador: cada host tem uma taxa de
+requisições que cresce aditivamente enquanto latência e respostas estão
+saudáveis e é cortada multiplicativamente em 429/403, timeouts ou picos de
+latência. `Retry-After` bloqueia o host até o instante indicado.
+
+O limite de requisições simultâneas segue a lei de Little
+(taxa x latência média), de modo que threads concorrentes no mesmo processo
+também respeitam o controlador. Cada processo (ex: workers distribuídos) tem
+seu próprio estado.
+"""
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+THROTTLE_STATUS_CODES = (403, 429)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max((until - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class _HostState:
+    def __init__(self, rate: float, max_rate: float):
+        self.rate = rate  # Requisições por segundo permitidas
+        self.max_rate = max_rate  # Teto do host (orçamento do marketplace)
+        self.latency_ewma: float | None = None
+        self.in_flight = 0
+        self.next_slot = 0.0  # Instante (monotonic) da próxima requisição permitida
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.decreases = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        if self.latency_ewma is None:
+            return 1
+        return max(1, math.floor(self.rate * self.latency_ewma))
+
+
+class AdaptiveThrottle:
+    """Controlador AIMD thread-safe, com estado por host."""
+
+    def __init__(
+        self,
+        min_rate: float | None = None,
+        max_rate: float | None = None,
+        increase: float | None = None,
+        decrease_factor: float | None = None,
+        latency_spike_factor: float | None = None,
+    ):
+        self.min_rate = min_rate or settings.THROTTLE_MIN_RATE
+        self.max_rate = max_rate or settings.THROTTLE_MAX_RATE
+        self.increase = increase or settings.THROTTLE_ADDITIVE_INCREASE
+        self.decrease_factor = decrease_factor or settings.THROTTLE_DECREASE_FACTOR
+        self.latency_spike_factor = latency_spike_factor or settings.THROTTLE_LATENCY_SPIKE_FACTOR
+
+        self._cond = threading.Condition()
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, host: str, initial_rate: float | None = None, max_rate: float | None = None) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            max_rate = min(max_rate or self.max_rate, self.max_rate)
+            rate = min(max(initial_rate or settings.THROTTLE_INITIAL_RATE, self.min_rate), max_rate)
+            state = self._hosts[host] = _HostState(rate, max_rate)
+        elif max_rate is not None and max_rate != state.max_rate:
+            state.max_rate = min(max_rate, self.max_rate)
+            state.rate = min(state.rate, state.max_rate)
+        return state
+
+    def acquire(self, host: str, initial_rate: float | None = None, max_rate: float | None = None) -> None:
+        """Bloqueia até o host aceitar mais uma requisição (taxa, concorrência e Retry-After).
+
+        max_rate limita a taxa do host abaixo de THROTTLE_MAX_RATE (orçamento do marketplace).
+        """
+        with self._cond:
+            state = self._state(host, initial_rate, max_rate)
+            while True:
+                now = time.monotonic()
+                wait = max(state.blocked_until, state.next_slot) - now
+                if wait <= 0 and state.in_flight < state.concurrency_limit:
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+            state.in_flight += 1
+            state.next_slot = now + 1.0 / state.rate
+
+    def wait_time(self, host: str) -> float:
+        """Segundos até o host aceitar a próxima requisição (0 se livre)."""
+        with self._cond:
+            state = self._hosts.get(host)
+            if state is None:
+                return 0.0
+            wait = max(state.blocked_until, state.next_slot) - time.monotonic()
+            if state.in_flight >= state.concurrency_limit:
+                wait = max(wait, state.latency_ewma or 0.0)
+            return max(wait, 0.0)
+
+    def release(
+        self,
+        host: str,
+        latency: float | None = None,
+        status_code: int | None = None,
+        timeout: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Registra o resultado da requisição e ajusta a taxa do host."""
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+
+            throttled = timeout or status_code in THROTTLE_STATUS_CODES
+            spike = (
+                latency is not None
+                and state.latency_ewma is not None
+                and latency > state.latency_ewma * self.latency_spike_factor
+            )
+
+            if latency is not None and not timeout:
+                alpha = settings.THROTTLE_LATENCY_ALPHA
+                state.latency_ewma = latency if state.latency_ewma is None else (
+                    alpha * latency + (1 - alpha) * state.latency_ewma
+                )
+
+            now = time.monotonic()
+            if throttled or spike:
+                # Um corte por janela: respostas da mesma rajada não reduzem de novo
+                if now - state.last_decrease >= max(state.latency_ewma or 0.0, 1.0 / state.rate):
+                    state.rate = max(state.rate * self.decrease_factor, self.min_rate)
+                    state.last_decrease = now
+                    state.decreases += 1
+                    reason = "timeout" if timeout else status_code if throttled else f"latência {latency:.2f}s"
+                    logger.warning(f"[THROTTLE] {host}: redução para {state.rate:.2f} req/s ({reason})")
+            elif status_code is not None and status_code < 400:
+                # Aumento aditivo por janela: +increase req/s a cada ~rate respostas saudáveis
+                state.rate = min(state.rate + self.increase / state.rate, state.max_rate)
+
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+                logger.warning(f"[THROTTLE] {host}: Retry-After de {retry_after:.0f}s")
+
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, dict]:
+        """Estado atual por host (limite de concorrência, taxa, latência média)."""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                host: {
+                    "concurrency_limit": state.concurrency_limit,
+                    "rate_per_second": round(state.rate, 3),
+                    "latency_ewma_seconds": round(state.latency_ewma, 3) if state.latency_ewma else None,
+                    "in_flight": state.in_flight,
+                    "blocked_seconds": round(max(state.blocked_until - now, 0.0), 1),
+                    "decreases": state.decreases,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+# Instância compartilhada pelo processo (crawler e rota GET /throttle)
+throttle = AdaptiveThrottle()
@@ -0,0 +1,590 @@
+# app/services/work_queue.py
+"""Fila de trabalho com lease para execução distribuída da coleta.
+
+Cada unidade de trabalho (uma fonte de busca) é entregue a um worker com um
+lease de duração limitada. O worker renova o lease via heartbeat enquanto
+processa; se morrer, o lease expira e a unidade é reentregue a outro worker.
+
+Unidades carregam tenant e prioridade. Um lease sem filtro de job escolhe a
+maior prioridade e, dentro dela, o tenant com menos unidades em execução
+(fair share); tenants que atingiram o orçamento de concorrência
+(TENANT_MAX_CONCURRENCY / TENANT_CONCURRENCY_BUDGETS) são pulados.
+
+Unidades com prioridade interativa (>= INTERACTIVE_PRIORITY) ignoram o
+orçamento: os workers locais de uma coleta interativa só pegam unidades do
+próprio job e ficariam parados atrás de um lote do mesmo tenant. Elas ainda
+contam como unidades em execução do tenant.
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+DEFAULT_TENANT = "default"
+
+
+def tenant_budget(tenant: str) -> int:
+    """Máximo de unidades do tenant em execução simultânea (0 = sem limite)."""
+    return settings.TENANT_CONCURRENCY_BUDGETS.get(tenant, settings.TENANT_MAX_CONCURRENCY)
+
+
+def budget_exempt(priority: int) -> bool:
+    """Unidades interativas não esperam pelo orçamento de concorrência do tenant."""
+    return priority >= settings.INTERACTIVE_PRIORITY
+
+
+@dataclass
+class WorkUnit:
+    """Unidade de trabalho entregue a um worker."""
+
+    unit_id: str
+    job_id: str
+    source: str
+    params: dict = field(default_factory=dict)
+    tenant: str = DEFAULT_TENANT
+    priority: int = 0
+    attempts: int = 0
+    status: str = STATUS_PENDING
+    result: dict | None = None
+    error: str | None = None
+
+
+class SQLiteWorkQueue:
+    """Fila com lease sobre SQLite.
+    Serve para vários processos na mesma máquina (ou nós com o arquivo em volume compartilhado).
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        lease_seconds: int | None = None,
+        max_attempts: int | None = None,
+    ):
+        self.path = path or settings.QUEUE_SQLITE_PATH or os.path.join(settings.DATA_DIR, "work_queue.db")
+        self.lease_seconds = lease_seconds or settings.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.QUEUE_MAX_ATTEMPTS
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS work_units (
+                    unit_id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    tenant TEXT NOT NULL DEFAULT 'default',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+            # Filas criadas antes de tenant/prioridade
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(work_units)")}
+            if "tenant" not in columns:
+                conn.execute(f"ALTER TABLE work_units ADD COLUMN tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+                conn.execute("ALTER TABLE work_units ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS batch_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    tenant TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    sources_total INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_work_units_job ON work_units (job_id, status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_work_units_status ON work_units (status, priority)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: controlamos as transações manualmente (BEGIN IMMEDIATE)
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(
+        self,
+        job_id: str,
+        units: list[tuple[str, dict]],
+        tenant: str = DEFAULT_TENANT,
+        priority: int = 0,
+    ) -> list[str]:
+        """Enfileira unidades (source, params) de um job. Retorna os unit_ids na mesma ordem."""
+        unit_ids = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for source, params in units:
+                unit_id = str(uuid.uuid4())
+                conn.execute(
+                    "INSERT INTO work_units (unit_id, job_id, source, params, tenant, priority, status) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (unit_id, job_id, source, json.dumps(params), tenant, priority, STATUS_PENDING),
+                )
+                unit_ids.append(unit_id)
+            conn.execute("COMMIT")
+
+        logger.info(f"[FILA] {len(unit_ids)} unidades enfileiradas para o job {job_id}")
+        return unit_ids
+
+    def lease(self, worker_id: str, job_id: str | None = None) -> WorkUnit | None:
+        """Obtém a próxima unidade disponível (pendente ou com lease expirado).
+        Ordem: maior prioridade, tenant com menos unidades em execução, mais antiga.
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                active = dict(conn.execute(
+                    "SELECT tenant, COUNT(*) FROM work_units WHERE status = ? AND lease_expires >= ? GROUP BY tenant",
+                    (STATUS_LEASED, now),
+                ).fetchall())
+                saturated = [t for t, n in active.items() if 0 < tenant_budget(t) <= n]
+
+                filters = ""
+                args: list = [STATUS_PENDING, STATUS_LEASED, now]
+                if job_id:
+                    filters += " AND job_id = ?"
+                    args.append(job_id)
+                if saturated:
+                    filters += f" AND (priority >= ? OR tenant NOT IN ({', '.join('?' for _ in saturated)}))"
+                    args.extend([settings.INTERACTIVE_PRIORITY, *saturated])
+
+                # Unidades em execução por tenant, para o fair share no ORDER BY
+                active_case = " ".join("WHEN ? THEN ?" for _ in active)
+                active_order = f"CASE tenant {active_case} ELSE 0 END, " if active else ""
+                order_args = [x for item in active.items() for x in item]
+
+                while True:
+                    row = conn.execute(
+                        f"""
+                        SELECT unit_id, job_id, source, params, tenant, priority, attempts, status
+                        FROM work_units
+                        WHERE (status = ? OR (status = ? AND lease_expires < ?)) {filters}
+                        ORDER BY priority DESC, {active_order}rowid
+                        LIMIT 1
+                        """,
+                        (*args, *order_args),
+                    ).fetchone()
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+
+                    unit_id, unit_job_id, source, params, tenant, priority, attempts, status = row
+                    if status == STATUS_LEASED:
+                        logger.warning(f"[FILA] Lease expirado, reentregando unidade {unit_id} ('{source}')")
+
+                    if attempts >= self.max_attempts:
+                        conn.execute(
+                            "UPDATE work_units SET status = ?, error = ? WHERE unit_id = ?",
+                            (STATUS_FAILED, "Número máximo de tentativas excedido", unit_id),
+                        )
+                        continue
+
+                    conn.execute(
+                        "UPDATE work_units SET status = ?, worker_id = ?, lease_expires = ?, attempts = ? "
+                        "WHERE unit_id = ?",
+                        (STATUS_LEASED, worker_id, now + self.lease_seconds, attempts + 1, unit_id),
+                    )
+                    conn.execute("COMMIT")
+                    return WorkUnit(
+                        unit_id=unit_id,
+                        job_id=unit_job_id,
+                        source=source,
+                        params=json.loads(params),
+                        tenant=tenant,
+                        priority=priority,
+                        attempts=attempts + 1,
+                        status=STATUS_LEASED,
+                    )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, unit_id: str, worker_id: str) -> bool:
+        """Renova o lease. Retorna False se o worker perdeu a unidade."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE work_units SET lease_expires = ? WHERE unit_id = ? AND worker_id = ? AND status = ?",
+                (time.time() + self.lease_seconds, unit_id, worker_id, STATUS_LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, unit_id: str, worker_id: str, result: dict) -> bool:
+        """Marca a unidade como concluída e grava o resultado."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE work_units SET status = ?, result = ?, lease_expires = NULL "
+                "WHERE unit_id = ? AND worker_id = ? AND status = ?",
+                (STATUS_DONE, json.dumps(result), unit_id, worker_id, STATUS_LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, unit_id: str, worker_id: str, error: str) -> None:
+        """Devolve a unidade para a fila (ou marca como falha se esgotou as tentativas)."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE work_units
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    error = ?, worker_id = NULL, lease_expires = NULL
+                WHERE unit_id = ? AND worker_id = ? AND status = ?
+                """,
+                (self.max_attempts, STATUS_FAILED, STATUS_PENDING, error, unit_id, worker_id, STATUS_LEASED),
+            )
+
+    def job_status(self, job_id: str) -> dict[str, int]:
+        """Contagem de unidades do job por status."""
+        counts = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        with self._connect() as conn:
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM work_units WHERE job_id = ? GROUP BY status", (job_id,),
+            ):
+                counts[status] = count
+        return counts
+
+    def job_units(self, job_id: str, with_results: bool = True) -> list[WorkUnit]:
+        """Retorna todas as unidades do job (com resultado, se concluídas e with_results=True)."""
+        result_column = "result" if with_results else "NULL"
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT unit_id, job_id, source, params, tenant, priority, attempts, status, {result_column}, error "
+                "FROM work_units WHERE job_id = ? ORDER BY rowid",
+                (job_id,),
+            ).fetchall()
+        return [self._unit_from_row(row) for row in rows]
+
+    def get_unit(self, unit_id: str) -> WorkUnit | None:
+        """Retorna uma unidade com o resultado."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT unit_id, job_id, source, params, tenant, priority, attempts, status, result, error "
+                "FROM work_units WHERE unit_id = ?",
+                (unit_id,),
+            ).fetchone()
+        return self._unit_from_row(row) if row else None
+
+    @staticmethod
+    def _unit_from_row(row: tuple) -> WorkUnit:
+        unit_id, job_id, source, params, tenant, priority, attempts, status, result, error = row
+        return WorkUnit(
+            unit_id=unit_id,
+            job_id=job_id,
+            source=source,
+            params=json.loads(params),
+            tenant=tenant,
+            priority=priority,
+            attempts=attempts,
+            status=status,
+            result=json.loads(result) if result else None,
+            error=error,
+        )
+
+    def purge_job(self, job_id: str) -> None:
+        """Remove as unidades de um job já agregado."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM work_units WHERE job_id = ?", (job_id,))
+
+    def save_batch(self, job_id: str, tenant: str, priority: int, sources_total: int) -> None:
+        """Registra os metadados de um lote (sobrevivem a restarts e ao purge das unidades)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO batch_jobs (job_id, tenant, priority, sources_total, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, tenant, priority, sources_total, now),
+            )
+            conn.execute(
+                "DELETE FROM batch_jobs WHERE created_at < ?",
+                (now - settings.QUEUE_BATCH_RETENTION_HOURS * 3600,),
+            )
+
+    def get_batch(self, job_id: str) -> dict | None:
+        """Metadados do lote ({"tenant", "priority", "sources_total"}) ou None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tenant, priority, sources_total FROM batch_jobs WHERE job_id = ?", (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"tenant": row[0], "priority": row[1], "sources_total": row[2]}
+
+
+# Lease atômico no Redis: percorre os jobs candidatos (já ordenados) e entrega
+# a primeira unidade pendente de um tenant abaixo do orçamento.
+# ARGV: prefixo, worker_id, expiração do lease, depois (job_id, tenant, orçamento)
+# por candidato (orçamento 0 = sem limite)
+_LEASE_SCRIPT = """
+local prefix, worker, expires = ARGV[1], ARGV[2], ARGV[3]
+local active_key = prefix .. ':tenant_active'
+for i = 4, #ARGV, 3 do
+    local job, tenant, budget = ARGV[i], ARGV[i + 1], tonumber(ARGV[i + 2])
+    if budget == 0 or tonumber(redis.call('HGET', active_key, tenant) or '0') < budget then
+        local unit = redis.call('LPOP', prefix .. ':pending:' .. job)
+        if unit then
+            local unit_key = prefix .. ':unit:' .. unit
+            local attempts = redis.call('HINCRBY', unit_key, 'attempts', 1)
+            redis.call('HSET', unit_key, 'status', 'leased', 'worker_id', worker)
+            redis.call('ZADD', prefix .. ':leases', expires, unit)
+            redis.call('HINCRBY', active_key, tenant, 1)
+            return {unit, attempts}
+        end
+    end
+end
+return false
+"""
+
+# Conclusão atômica: só vale se a unidade ainda está em lease com este worker
+# (uma unidade reentregue volta a pending e não pode ser marcada como done).
+# ARGV: prefixo, unit_id, worker_id, resultado (JSON)
+_COMPLETE_SCRIPT = """
+local prefix, unit, worker, result = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+local unit_key = prefix .. ':unit:' .. unit
+if redis.call('HGET', unit_key, 'worker_id') ~= worker or redis.call('HGET', unit_key, 'status') ~= 'leased' then
+    return 0
+end
+if redis.call('ZREM', prefix .. ':leases', unit) == 1 then
+    redis.call('HINCRBY', prefix .. ':tenant_active', redis.call('HGET', unit_key, 'tenant') or 'default', -1)
+end
+redis.call('HSET', unit_key, 'status', 'done', 'result', result)
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """Fila com lease sobre Redis (ou qualquer servidor compatível com o protocolo).
+    Permite workers em vários nós apontando para o mesmo servidor.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        lease_seconds: int | None = None,
+        max_attempts: int | None = None,
+        client=None,
+        prefix: str = "coletor:queue",
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("QUEUE_BACKEND=redis requer o pacote 'redis' instalado") from e
+            client = redis.Redis.from_url(url or settings.QUEUE_REDIS_URL, decode_responses=True)
+
+        self.client = client
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds or settings.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.QUEUE_MAX_ATTEMPTS
+        self._lease_script = client.register_script(_LEASE_SCRIPT)
+        self._complete_script = client.register_script(_COMPLETE_SCRIPT)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def _load(self, unit_id: str) -> WorkUnit | None:
+        data = self.client.hgetall(self._key("unit", unit_id))
+        if not data:
+            return None
+        return WorkUnit(
+            unit_id=unit_id,
+            job_id=data["job_id"],
+            source=data["source"],
+            params=json.loads(data["params"]),
+            tenant=data.get("tenant", DEFAULT_TENANT),
+            priority=int(data.get("priority", 0)),
+            attempts=int(data.get("attempts", 0)),
+            status=data["status"],
+            result=json.loads(data["result"]) if data.get("result") else None,
+            error=data.get("error") or None,
+        )
+
+    def enqueue(
+        self,
+        job_id: str,
+        units: list[tuple[str, dict]],
+        tenant: str = DEFAULT_TENANT,
+        priority: int = 0,
+    ) -> list[str]:
+        """Enfileira unidades (source, params) de um job. Retorna os unit_ids na mesma ordem."""
+        unit_ids = []
+        pipe = self.client.pipeline()
+        pipe.hset(self._key("job", job_id, "meta"), mapping={"tenant": tenant, "priority": priority})
+        for source, params in units:
+            unit_id = str(uuid.uuid4())
+            pipe.hset(self._key("unit", unit_id), mapping={
+                "job_id": job_id,
+                "source": source,
+                "params": json.dumps(params),
+                "tenant": tenant,
+                "priority": priority,
+                "status": STATUS_PENDING,
+                "attempts": 0,
+            })
+            pipe.rpush(self._key("job", job_id, "units"), unit_id)
+            pipe.rpush(self._key("pending", job_id), unit_id)
+            unit_ids.append(unit_id)
+        pipe.sadd(self._key("jobs"), job_id)
+        pipe.execute()
+
+        logger.info(f"[FILA] {len(unit_ids)} unidades enfileiradas para o job {job_id}")
+        return unit_ids
+
+    def _requeue_expired(self) -> None:
+        now = time.time()
+        for unit_id in self.client.zrangebyscore(self._key("leases"), "-inf", now):
+            # ZREM é atômico: só um worker consegue reentregar a unidade
+            if not self.client.zrem(self._key("leases"), unit_id):
+                continue
+            unit = self._load(unit_id)
+            if unit is None or unit.status != STATUS_LEASED:
+                continue
+            self.client.hincrby(self._key("tenant_active"), unit.tenant, -1)
+            logger.warning(f"[FILA] Lease expirado, reentregando unidade {unit_id} ('{unit.source}')")
+            if unit.attempts >= self.max_attempts:
+                self.client.hset(self._key("unit", unit_id), mapping={
+                    "status": STATUS_FAILED,
+                    "error": "Número máximo de tentativas excedido",
+                })
+            else:
+                # Sem worker_id: o worker antigo não pode mais concluir nem falhar a unidade
+                self.client.hset(self._key("unit", unit_id), "status", STATUS_PENDING)
+                self.client.hdel(self._key("unit", unit_id), "worker_id")
+                self.client.rpush(self._key("pending", unit.job_id), unit_id)
+
+    def lease(self, worker_id: str, job_id: str | None = None) -> WorkUnit | None:
+        """Obtém a próxima unidade disponível (pendente ou com lease expirado).
+        Ordem: maior prioridade, tenant com menos unidades em execução, job mais antigo.
+        """
+        self._requeue_expired()
+
+        active = {t: int(n) for t, n in self.client.hgetall(self._key("tenant_active")).items()}
+        job_ids = [job_id] if job_id else sorted(self.client.smembers(self._key("jobs")))
+        candidates = []
+        for candidate in job_ids:
+            meta = self.client.hgetall(self._key("job", candidate, "meta"))
+            tenant = meta.get("tenant", DEFAULT_TENANT)
+            priority = int(meta.get("priority", 0))
+            budget = 0 if budget_exempt(priority) else tenant_budget(tenant)
+            candidates.append((-priority, active.get(tenant, 0), candidate, tenant, budget))
+        if not candidates:
+            return None
+
+        # A ordem vem daqui; orçamento, LPOP e registro do lease rodam atômicos no servidor
+        args = [self.prefix, worker_id, time.time() + self.lease_seconds]
+        for _, _, candidate, tenant, budget in sorted(candidates):
+            args.extend([candidate, tenant, budget])
+        leased = self._lease_script(args=args)
+        if not leased:
+            return None
+
+        unit_id, attempts = leased
+        unit = self._load(unit_id)
+        unit.attempts = int(attempts)
+        return unit
+
+    def heartbeat(self, unit_id: str, worker_id: str) -> bool:
+        """Renova o lease. Retorna False se o worker perdeu a unidade."""
+        unit_key = self._key("unit", unit_id)
+        if self.client.hget(unit_key, "worker_id") != worker_id:
+            return False
+        if self.client.hget(unit_key, "status") != STATUS_LEASED:
+            return False
+        self.client.zadd(self._key("leases"), {unit_id: time.time() + self.lease_seconds})
+        return True
+
+    def complete(self, unit_id: str, worker_id: str, result: dict) -> bool:
+        """Marca a unidade como concluída e grava o resultado."""
+        return bool(self._complete_script(args=[self.prefix, unit_id, worker_id, json.dumps(result)]))
+
+    def fail(self, unit_id: str, worker_id: str, error: str) -> None:
+        """Devolve a unidade para a fila (ou marca como falha se esgotou as tentativas)."""
+        unit = self._load(unit_id)
+        if unit is None or unit.status != STATUS_LEASED:
+            return
+        if self.client.hget(self._key("unit", unit_id), "worker_id") != worker_id:
+            return
+        if self.client.zrem(self._key("leases"), unit_id):
+            self.client.hincrby(self._key("tenant_active"), unit.tenant, -1)
+        if unit.attempts >= self.max_attempts:
+            self.client.hset(self._key("unit", unit_id), mapping={"status": STATUS_FAILED, "error": error})
+        else:
+            self.client.hset(self._key("unit", unit_id), mapping={"status": STATUS_PENDING, "error": error})
+            self.client.rpush(self._key("pending", unit.job_id), unit_id)
+
+    def job_status(self, job_id: str) -> dict[str, int]:
+        """Contagem de unidades do job por status."""
+        counts = {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        for unit_id in self.client.lrange(self._key("job", job_id, "units"), 0, -1):
+            status = self.client.hget(self._key("unit", unit_id), "status")
+            if status in counts:
+                counts[status] += 1
+        return counts
+
+    def job_units(self, job_id: str, with_results: bool = True) -> list[WorkUnit]:
+        """Retorna todas as unidades do job (com resultado, se concluídas e with_results=True)."""
+        units = []
+        for unit_id in self.client.lrange(self._key("job", job_id, "units"), 0, -1):
+            unit = self._load(unit_id)
+            if unit is not None:
+                if not with_results:
+                    unit.result = None
+                units.append(unit)
+        return units
+
+    def get_unit(self, unit_id: str) -> WorkUnit | None:
+        """Retorna uma unidade com o resultado."""
+        return self._load(unit_id)
+
+    def purge_job(self, job_id: str) -> None:
+        """Remove as unidades de um job já agregado."""
+        unit_ids = self.client.lrange(self._key("job", job_id, "units"), 0, -1)
+        for unit_id in unit_ids:
+            # Unidades ainda em lease liberam o orçamento do tenant
+            if self.client.zrem(self._key("leases"), unit_id):
+                tenant = self.client.hget(self._key("unit", unit_id), "tenant") or DEFAULT_TENANT
+                self.client.hincrby(self._key("tenant_active"), tenant, -1)
+        pipe = self.client.pipeline()
+        for unit_id in unit_ids:
+            pipe.delete(self._key("unit", unit_id))
+        pipe.delete(self._key("job", job_id, "units"), self._key("pending", job_id), self._key("job", job_id, "meta"))
+        pipe.srem(self._key("jobs"), job_id)
+        pipe.execute()
+
+    def save_batch(self, job_id: str, tenant: str, priority: int, sources_total: int) -> None:
+        """Registra os metadados de um lote (expiram após QUEUE_BATCH_RETENTION_HOURS)."""
+        key = self._key("batch", job_id)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={"tenant": tenant, "priority": priority, "sources_total": sources_total})
+        pipe.expire(key, settings.QUEUE_BATCH_RETENTION_HOURS * 3600)
+        pipe.execute()
+
+    def get_batch(self, job_id: str) -> dict | None:
+        """Metadados do lote ({"tenant", "priority", "sources_total"}) ou None."""
+        data = self.client.hgetall(self._key("batch", job_id))
+        if not data:
+            return None
+        return {"tenant": data["tenant"], "priority": int(data["priority"]), "sources_total": int(data["sources_total"])}
+
+
+def get_work_queue() -> SQLiteWorkQueue | RedisWorkQueue:
+    """Retorna a fila configurada em QUEUE_BACKEND."""
+    backend = settings.QUEUE_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteWorkQueue()
+    if backend == "redis":
+        return RedisWorkQueue()
+    raise ValueError(f"QUEUE_BACKEND inválido: {settings.QUEUE_BACKEND}")
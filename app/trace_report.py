@@ -0,0 +1,61 @@
+# app/trace_report.py
+"""Relatório de um trace gravado pelo exporter `file` (TRACING_EXPORTER=file).
+
+Uso:
+    python -m app.trace_report TRACE_ID              # árvore de spans + caminho crítico
+    python -m app.trace_report TRACE_ID --path X     # arquivo diferente de TRACING_PATH
+
+O trace_id de uma task aparece em GET /collect/{task_id} e nos logs da task.
+"""
+import argparse
+import os
+
+from app.core.config import settings
+from app.core.tracing import critical_path, load_spans
+
+
+def _duration_ms(span: dict) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def _attributes(span: dict) -> str:
+    values = {a["key"]: next(iter(a["value"].values())) for a in span.get("attributes", [])}
+    return " ".join(f"{k}={v}" for k, v in values.items())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Árvore de spans e caminho crítico de um trace")
+    parser.add_argument("trace_id", help="ID do trace (32 caracteres hexadecimais)")
+    parser.add_argument("--path", default=None, help="Arquivo OTLP/JSON (padrão: TRACING_PATH)")
+    args = parser.parse_args()
+
+    path = args.path or settings.TRACING_PATH or os.path.join(settings.DATA_DIR, "traces.jsonl")
+    spans = load_spans(path, args.trace_id)
+    if not spans:
+        raise SystemExit(f"Trace {args.trace_id} não encontrado em {path}")
+
+    on_path = {s["spanId"] for s in critical_path(spans)}
+    ids = {s["spanId"] for s in spans}
+    children: dict[str | None, list[dict]] = {}
+    for s in spans:
+        parent = s.get("parentSpanId")
+        children.setdefault(parent if parent in ids else None, []).append(s)
+    trace_start = min(int(s["startTimeUnixNano"]) for s in spans)
+
+    def show(span: dict, depth: int) -> None:
+        offset = (int(span["startTimeUnixNano"]) - trace_start) / 1e6
+        marker = "*" if span["spanId"] in on_path else " "
+        error = " ERRO" if span.get("status", {}).get("code") == 2 else ""
+        print(f"{marker} {offset:10.1f}ms {_duration_ms(span):10.1f}ms  {'  ' * depth}{span['name']}{error}  "
+              f"{_attributes(span)}")
+        for child in sorted(children.get(span["spanId"], []), key=lambda s: int(s["startTimeUnixNano"])):
+            show(child, depth + 1)
+
+    print(f"Trace {args.trace_id}: {len(spans)} spans (* = caminho crítico)")
+    print(f"  {'início':>12} {'duração':>12}  span")
+    for root in sorted(children.get(None, []), key=lambda s: int(s["startTimeUnixNano"])):
+        show(root, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# app/worker.py
+"""Processo worker para coleta distribuída.
+
+Uso:
+    python -m app.worker              # processa unidades de qualquer job
+    python -m app.worker --job-id X   # processa apenas o job X
+"""
+import argparse
+
+from app.core.logging import configure_logging, get_logger
+from app.services.distributed import run_worker
+
+logger = get_logger(__name__)
+
+
+def main() -> None:
+    configure_logging(level="INFO")
+    parser = argparse.ArgumentParser(description="Worker da fila de coleta distribuída")
+    parser.add_argument("--job-id", default=None, help="Processa apenas unidades deste job")
+    parser.add_argument("--worker-id", default=None, help="Identificador do worker (padrão: host-pid)")
+    parser.add_argument("--stop-when-idle", action="store_true", help="Encerra quando a fila esvaziar")
+    args = parser.parse_args()
+
+    run_worker(job_id=args.job_id, worker_id=args.worker_id, stop_when_idle=args.stop_when_idle)
+
+
+if __name__ == "__main__":
+    main()
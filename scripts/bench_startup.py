@@ -0,0 +1,142 @@
+"""Benchmark de inicialização da API (cold start).
+
+Mede, em processos novos:
+- import_seconds: tempo de `import app.main`
+- first_response_seconds: do início do `uvicorn app.main:app` até o primeiro
+  200 em GET /health/live
+e verifica que dependências pesadas (google.cloud.bigquery, bs4, pandas,
+pyarrow) não são importadas junto com a API.
+
+Os tempos absolutos dependem da máquina e da versão do Python: o baseline só
+é comparável na máquina em que foi gravado. Por isso `--check` (CI) falha
+apenas pelas dependências pesadas; os tempos são reportados e só reprovam
+com `--fail-on-regression`.
+
+Uso:
+    python scripts/bench_startup.py                       # mede e compara com o baseline
+    python scripts/bench_startup.py --check               # falha se a API importar dependências pesadas (CI)
+    python scripts/bench_startup.py --fail-on-regression  # falha também se os tempos regrediram
+    python scripts/bench_startup.py --update              # grava as medidas como novo baseline
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT_DIR, "scripts", "startup_baseline.json")
+
+# Carregadas sob demanda (primeiro uso ou warm-up após o startup)
+HEAVY_MODULES = ("google.cloud.bigquery", "bs4", "pandas", "pyarrow")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    return {**os.environ, "PYTHONPATH": ROOT_DIR, "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def measure_import() -> tuple[float, list[str]]:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT_DIR, env=_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["heavy"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 60.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/health/live", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except requests.ConnectionError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn encerrou com código {server.returncode}")
+            time.sleep(0.01)
+        raise RuntimeError(f"Sem resposta em {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização da API")
+    parser.add_argument("--runs", type=int, default=5, help="Execuções por medida (usa a mediana)")
+    parser.add_argument("--check", action="store_true", help="Falha se a API importar dependências pesadas")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Falha também se os tempos regrediram (baseline gravado na mesma máquina)")
+    parser.add_argument("--update", action="store_true", help="Grava as medidas como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Folga sobre o baseline antes de acusar regressão (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    import_runs = [measure_import() for _ in range(args.runs)]
+    heavy = sorted({m for _, modules in import_runs for m in modules})
+    results = {
+        "import_seconds": round(statistics.median(s for s, _ in import_runs), 3),
+        "first_response_seconds": round(statistics.median(measure_first_response() for _ in range(args.runs)), 3),
+    }
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    python_version = sys.version.split()[0]
+    if baseline.get("python") and baseline["python"] != python_version:
+        print(f"Aviso: baseline gravado com Python {baseline['python']}, medido com {python_version}")
+
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        limit = reference * (1 + args.tolerance) if reference else None
+        status = "ok"
+        if limit is not None and value > limit:
+            status = "REGREDIU"
+            regressions.append(f"{name} = {value}s (baseline {reference}s, limite {limit:.3f}s)")
+        print(f"{name:<24} {value:>7.3f}s   baseline {reference if reference is not None else '-':>6}   {status}")
+    print(f"{'dependências pesadas':<24} {', '.join(heavy) if heavy else 'nenhuma'}")
+
+    if args.update:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({**results, "python": python_version}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline gravado em {BASELINE_PATH}")
+
+    if regressions:
+        print("\n".join(["", "Regressões na inicialização:", *(f"- {regression}" for regression in regressions)]))
+    if heavy:
+        print(f"\nDependências pesadas importadas com a API: {', '.join(heavy)}")
+
+    if (heavy and (args.check or args.fail_on_regression)) or (regressions and args.fail_on_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Teste local do ProductReader contra um serviço de leitura falso em memória.
+
+`FakeReadClient` implementa a mesma interface usada do BigQueryReadClient
+(`create_read_session` / `read_rows`): um único stream com as linhas em
+memória, entregues em record batches Arrow de `batch_size` linhas a partir do
+offset pedido. Roda sem credenciais nem rede:
+
+    python scripts/bigquery_reader_teste.py
+
+Verifica:
+- paginação de `read_page`: cursor com offset = offset anterior + linhas
+  devolvidas, inclusive quando o limite corta um batch no meio e quando o
+  stream termina exatamente no fim de uma página
+- projeção de colunas e tabela vazia (sem streams)
+- round-trip do export ndjson e parquet (escrita em streaming via `_ChunkSink`),
+  inclusive o parquet vazio (arquivo válido com o schema e 0 linhas)
+"""
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz ao PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(root_dir)
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.logging import configure_logging, get_logger
+from app.services.bigquery_reader import COLUMNS, ProductReader, decode_cursor
+
+configure_logging(level="INFO")
+logger = get_logger(__name__)
+
+
+class _FakePage:
+    def __init__(self, batch: pa.RecordBatch):
+        self._batch = batch
+
+    def to_arrow(self) -> pa.RecordBatch:
+        return self._batch
+
+
+class FakeReadClient:
+    """Serviço de leitura em memória com a interface do BigQueryReadClient."""
+
+    def __init__(self, rows: list[dict], batch_size: int = 7):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.sessions: dict[str, list[dict]] = {}
+        self.read_calls: list[tuple[str, int]] = []
+
+    def create_read_session(self, parent: str, read_session, max_stream_count: int = 0):
+        options = read_session.read_options
+        columns = list(options.selected_fields) or COLUMNS
+        # Filtros (row_restriction) não são interpretados: o fake serve todas as linhas
+        if not self.rows:
+            return SimpleNamespace(streams=[])
+
+        name = f"{parent}/locations/local/sessions/{len(self.sessions)}/streams/0"
+        self.sessions[name] = [{column: row[column] for column in columns} for row in self.rows]
+        return SimpleNamespace(streams=[SimpleNamespace(name=name)])
+
+    def read_rows(self, name: str, offset: int = 0):
+        self.read_calls.append((name, offset))
+        rows = self.sessions[name][offset:]
+        pages = [
+            _FakePage(pa.RecordBatch.from_pylist(rows[start:start + self.batch_size]))
+            for start in range(0, len(rows), self.batch_size)
+        ]
+        return SimpleNamespace(rows=lambda: SimpleNamespace(pages=pages))
+
+
+def make_rows(count: int) -> list[dict]:
+    collected_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "marketplace": "mercado_livre",
+            "item_id": f"MLB{i:06d}",
+            "url": f"https://produto.mercadolivre.com.br/MLB{i:06d}",
+            "title": f"Produto {i}",
+            "price": 100.0 + i,
+            "original_price": 150.0 + i if i % 2 else None,
+            "discount_percent": 33.3 if i % 2 else None,
+            "seller": None,
+            "image_url": None,
+            "source": "ps5",
+            "sources": ["ps5"],
+            "product_cluster_id": None,
+            "dedupe_key": f"key{i}",
+            "execution_id": "fake0001",
+            "collected_at": collected_at + timedelta(minutes=i),
+            "inserted_at": collected_at + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def read_all_pages(reader: ProductReader, limit: int, **kwargs) -> list[list[dict]]:
+    """Percorre read_page até o cursor acabar, conferindo o offset de cada cursor."""
+    pages = []
+    cursor = None
+    expected_offset = 0
+    while True:
+        rows, cursor = reader.read_page(limit, cursor=cursor, **kwargs)
+        pages.append(rows)
+        assert len(rows) <= limit, f"página com {len(rows)} linhas (limite {limit})"
+        expected_offset += len(rows)
+        if cursor is None:
+            return pages
+        _, offset = decode_cursor(cursor)
+        assert offset == expected_offset, f"cursor com offset {offset}, esperado {expected_offset}"
+
+
+def check_pagination() -> None:
+    # Limite 5 com batches de 7: páginas cortam batches no meio
+    rows = make_rows(23)
+    pages = read_all_pages(ProductReader(read_client=FakeReadClient(rows, batch_size=7)), limit=5)
+    assert [len(p) for p in pages] == [5, 5, 5, 5, 3], [len(p) for p in pages]
+    assert [r["item_id"] for p in pages for r in p] == [r["item_id"] for r in rows]
+
+    # Stream termina exatamente no fim de uma página: a última vem vazia
+    rows = make_rows(20)
+    pages = read_all_pages(ProductReader(read_client=FakeReadClient(rows, batch_size=7)), limit=10)
+    assert [len(p) for p in pages] == [10, 10, 0], [len(p) for p in pages]
+    assert [r["item_id"] for p in pages for r in p] == [r["item_id"] for r in rows]
+
+    # Projeção de colunas
+    client = FakeReadClient(make_rows(3))
+    rows, _ = ProductReader(read_client=client).read_page(10, columns=["item_id", "price"])
+    assert all(set(row) == {"item_id", "price"} for row in rows), rows
+
+    # Tabela vazia: sessão sem streams
+    assert ProductReader(read_client=FakeReadClient([])).read_page(10) == ([], None)
+    logger.info("Pagination OK")
+
+
+def check_export() -> None:
+    rows = make_rows(23)
+
+    chunks = list(ProductReader(read_client=FakeReadClient(rows, batch_size=7)).iter_export("ndjson"))
+    exported = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+    assert [r["item_id"] for r in exported] == [r["item_id"] for r in rows]
+    assert len(chunks) == 4, len(chunks)
+
+    chunks = list(ProductReader(read_client=FakeReadClient(rows, batch_size=7)).iter_export("parquet"))
+    # Um chunk por batch (row group) mais o rodapé: o arquivo não é montado inteiro em memória
+    assert len(chunks) == 5, len(chunks)
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == len(rows)
+    assert pq.ParquetFile(io.BytesIO(b"".join(chunks))).num_row_groups == 4
+    assert table.to_pylist() == rows
+
+    # Sem linhas: arquivo Parquet válido, com o schema das colunas e 0 linhas
+    empty = pq.read_table(io.BytesIO(b"".join(ProductReader(read_client=FakeReadClient([])).iter_export("parquet"))))
+    assert empty.num_rows == 0 and empty.column_names == COLUMNS, empty.schema
+    empty = pq.read_table(io.BytesIO(b"".join(
+        ProductReader(read_client=FakeReadClient([])).iter_export("parquet", columns=["item_id", "price"])
+    )))
+    assert empty.num_rows == 0 and empty.column_names == ["item_id", "price"], empty.schema
+    logger.info("Export OK", extra={"parquet_chunks": len(chunks)})
+
+
+def main():
+    check_pagination()
+    check_export()
+    logger.info("ProductReader verified against the fake read service")
+
+
+if __name__ == "__main__":
+    main()